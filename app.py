@@ -2,7 +2,7 @@ import os
 import base64
 from datetime import date, timedelta
 from pathlib import Path
-from typing import Any, BinaryIO
+from typing import Any
 
 import altair as alt
 try:
@@ -15,26 +15,30 @@ try:
     from streamlit_echarts import st_echarts
 except ImportError:  # optional dependency
     st_echarts = None
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 from auth import hash_password, verify_password
 from db import (
     create_user,
-    fetch_campaigns,
-    fetch_creator_rows,
-    fetch_media_rows,
-    fetch_community_rows,
+    fetch_campaign_filter_options,
+    fetch_campaign_page,
+    fetch_campaign_totals,
+    fetch_campaign_breakdown,
+    fetch_campaign_entries,
     get_user_by_email,
-    insert_campaign,
     insert_creator_rows,
-    replace_media_rows,
-    replace_community_rows,
-    replace_creator_rows,
+    save_campaign_bundle,
     update_campaign,
     update_last_login,
 )
-from logic.calculator import calculate_campaign
+from logic.calculator import COMMUNITY_INPUT_COLUMNS, TevLedger, get_rate_lookup
+from logic.optimizer import CANDIDATE_COLUMNS, suggest_creator_mix
+from logic.sweep import SweepAxis, sweep_campaign
+from logic.creator_analytics import upload_efficiency
+from logic.uploads import CREATOR_CONTENT_OPTIONS, get_allowed_content_options, load_creator_upload
+from logic.uncertainty import RateUncertainty, calculate_campaign_bands
 
 # ------------ BASIC CONFIG ------------
 
@@ -221,6 +225,34 @@ st.session_state.setdefault("campaign_info", {})
 st.session_state.setdefault("editing_campaign_id", None)
 
 
+def synced_tev_ledger() -> TevLedger:
+    """
+    The session's TevLedger, in step with the echo cards. It only re-scores
+    rows that changed since the last rerun, and starts over when the rate
+    card changes.
+    """
+    ledger = st.session_state.get("tev_ledger")
+    if ledger is None or ledger.version != get_rate_lookup().version:
+        ledger = TevLedger()
+        st.session_state["tev_ledger"] = ledger
+    ledger.sync("media", st.session_state.get("media_cards", []))
+    ledger.sync("creator", st.session_state.get("creator_cards", []))
+    ledger.sync("community", st.session_state.get("community_cards", []))
+    return ledger
+
+
+def campaign_inputs_key(inv: float, *frames: pd.DataFrame) -> tuple:
+    """
+    Identifies the campaign inputs a stored band or sweep was computed
+    from: the investment, the rate card version and a hash of each frame.
+    """
+    hashes = (
+        int(pd.util.hash_pandas_object(df, index=False).sum()) if df is not None and not df.empty else 0
+        for df in frames
+    )
+    return (float(inv), get_rate_lookup().version, *hashes)
+
+
 def reset_campaign_builder_state() -> None:
     for key in [
         "campaign_info",
@@ -229,6 +261,9 @@ def reset_campaign_builder_state() -> None:
         "creator_cards",
         "creator_editor",
         "creator_upload_summary",
+        "creator_upload_id",
+        "creator_upload_cached_at",
+        "creator_efficiency",
         "community_cards",
         "community_editor",
         "last_result",
@@ -237,6 +272,10 @@ def reset_campaign_builder_state() -> None:
         "last_client",
         "last_market",
         "media_data_editor",
+        "tev_ledger",
+        "creator_mix",
+        "campaign_bands",
+        "campaign_sweep",
     ]:
         st.session_state.pop(key, None)
     st.session_state["editing_campaign_id"] = None
@@ -289,22 +328,40 @@ OBJECTIVE_OPTIONS = [
     "Other",
 ]
 DEFAULT_MAX_INVESTMENT_K = 2000.0  # equals 2M
+LIBRARY_PAGE_SIZE = 25
+LIBRARY_SORT_LABELS = {
+    "newest": "Newest first",
+    "oldest": "Oldest first",
+    "tev": "Highest TEV",
+    "roi": "Highest ROI %",
+    "name": "Campaign name",
+}
+# Clients / markets shown in the library breakdown charts, by TEV.
+BREAKDOWN_TOP_N = 10
 MEDIA_CHANNEL_OPTIONS = ["Online Article", "Social Media"]
 MEDIA_TIER_PRESETS = ["Major", "Industry", "Local/Niche", "Tier 1", "Tier 2", "Tier 3"]
+MEDIA_CELL_KEYS = [
+    ("Online Article", "Major"),
+    ("Online Article", "Industry"),
+    ("Online Article", "Local/Niche"),
+    ("Social Media", "Tier 1"),
+    ("Social Media", "Tier 2"),
+    ("Social Media", "Tier 3"),
+]
 CREATOR_PLATFORM_OPTIONS = ["Facebook", "Instagram", "TikTok", "YouTube", "X (Twitter)", "Other"]
-CREATOR_CONTENT_OPTIONS = ["Static Post", "Video Post"]
-PLATFORMS_DISALLOW_STATIC = {"TikTok", "YouTube"}
 CREATOR_TIER_OPTIONS = ["Mega", "Macro", "Mid-tier", "Micro", "Nano"]
+# Starting cost-per-post assumptions for the mix optimizer (editable in the UI).
+DEFAULT_CREATOR_COST_PER_POST = {
+    "Mega": 250000.0,
+    "Macro": 120000.0,
+    "Mid-tier": 60000.0,
+    "Micro": 20000.0,
+    "Nano": 5000.0,
+}
 COMMUNITY_PLATFORM_OPTIONS = ["Facebook", "Instagram", "TikTok", "YouTube", "X (Twitter)", "Other"]
 WIZARD_STEPS = ["Campaign Brief", "Echo Studio", "Echo Impact Report"]
 
 
-def get_allowed_content_options(platform: str) -> list[str]:
-    if platform in PLATFORMS_DISALLOW_STATIC:
-        return ["Video Post"]
-    return CREATOR_CONTENT_OPTIONS
-
-
 def get_creator_presets(platform: str) -> list[dict[str, Any]]:
     allowed_content = get_allowed_content_options(platform)
     combos = [
@@ -401,95 +458,6 @@ def inject_stylesheet(css_path: Path, replacements: dict[str, str] | None = None
     st.markdown(f"<style>{css_raw}</style>", unsafe_allow_html=True)
 
 
-def _stringify(value: Any) -> str:
-    if value is None or (isinstance(value, float) and pd.isna(value)):
-        return ""
-    return str(value).strip()
-
-
-def _normalize_platform(value: Any) -> str:
-    mapping = {
-        "FACEBOOK": "Facebook",
-        "INSTAGRAM": "Instagram",
-        "TIKTOK": "TikTok",
-        "YOUTUBE": "YouTube",
-        "YOUTUBE SHORTS": "YouTube",
-        "X": "X (Twitter)",
-        "TWITTER": "X (Twitter)",
-        "X (TWITTER)": "X (Twitter)",
-        "LEMON 8": "Lemon 8",
-        "LEMON8": "Lemon 8",
-    }
-    raw = _stringify(value).upper()
-    return mapping.get(raw, _stringify(value))
-
-
-def _normalize_content_type(value: Any) -> str:
-    raw = _stringify(value).lower()
-    if "video" in raw or "reel" in raw or "story" in raw:
-        return "Video Post"
-    return "Static Post"
-
-
-def _normalize_tier(value: Any) -> str:
-    mapping = {
-        "MEGA": "Mega",
-        "MACRO": "Macro",
-        "MIDTIER": "Mid-tier",
-        "MID-TIER": "Mid-tier",
-        "MID TIER": "Mid-tier",
-        "MICRO": "Micro",
-        "NANO": "Nano",
-    }
-    raw = _stringify(value).replace("-", "").replace(" ", "").upper()
-    return mapping.get(raw, "Macro")
-
-
-def parse_creator_upload(uploaded_file: BinaryIO) -> tuple[pd.DataFrame, dict[str, Any]]:
-    if uploaded_file is None:
-        raise ValueError("No file provided.")
-    uploaded_file.seek(0)
-    df = pd.read_excel(uploaded_file, skiprows=4)
-    rename_map = {
-        "Profile": "profile",
-        "Network": "platform",
-        "Creator Tier": "tier",
-        "Content Type": "content_type",
-    }
-    for column in rename_map:
-        if column not in df.columns:
-            raise ValueError(f"Missing column '{column}' in uploaded file.")
-    working = df.rename(columns=rename_map).dropna(subset=list(rename_map.values()))
-    working["profile"] = working["profile"].apply(_stringify)
-    working["platform"] = working["platform"].apply(_normalize_platform)
-    working["tier"] = working["tier"].apply(_normalize_tier)
-    working["content_type"] = working["content_type"].apply(_normalize_content_type)
-    working["content_type"] = working.apply(
-        lambda row: row["content_type"]
-        if row["content_type"] in get_allowed_content_options(row["platform"])
-        else get_allowed_content_options(row["platform"])[0],
-        axis=1,
-    )
-    working = working[working["profile"] != ""]
-
-    grouped = (
-        working.groupby(["platform", "content_type", "tier"])
-        .size()
-        .reset_index(name="num_posts")
-        .sort_values(["platform", "tier"])
-        .reset_index(drop=True)
-    )
-    grouped["num_posts"] = grouped["num_posts"].astype(int)
-    summary = {
-        "total_posts": int(working.shape[0]),
-        "unique_creators": int(working["profile"].nunique()),
-        "platform_breakdown": {
-            platform: int(count) for platform, count in working["platform"].value_counts().items()
-        },
-    }
-    return grouped, summary
-
-
 def _serialize_date(value: Any) -> str | None:
     if value is None:
         return None
@@ -521,11 +489,12 @@ def save_campaign(result: dict[str, float],
                   campaign_name: str,
                   client: str,
                   market: str | None = None,
-                  campaign_id: int | None = None) -> int:
+                  campaign_id: int | None = None) -> tuple[int, dict[str, dict[str, int]]]:
     owner = st.session_state.get("user") if "user" in st.session_state else None
     owner_id = owner.get("id") if isinstance(owner, dict) else None
     info = st.session_state.get("campaign_info", {})
     payload = {
+        "owner_id": owner_id,
         "campaign_name": campaign_name,
         "client": client,
         "market": market or "",
@@ -543,25 +512,8 @@ def save_campaign(result: dict[str, float],
         "tev": result["tev"],
         "roi_m": result["roi_m"],
         "roi_pct": result["roi_pct"],
+        "rate_card_version": result.get("rate_card_version"),
     }
-    if campaign_id:
-        update_campaign(campaign_id, payload)
-    else:
-        campaign_id = insert_campaign(
-            result,
-            inv,
-            campaign_name,
-            client,
-            market or "",
-            owner_id=owner_id,
-            objective=info.get("campaign_objective"),
-            objective_focus=info.get("campaign_objective_choice"),
-            campaign_start=_serialize_date(info.get("campaign_start_date")),
-            campaign_end=_serialize_date(info.get("campaign_end_date")),
-            currency=info.get("campaign_currency"),
-            investment_k=info.get("campaign_investment_k"),
-            custom_budget_flag=info.get("campaign_custom_mode", False),
-        )
     creator_df = st.session_state.get("creator_editor", pd.DataFrame())
     media_df = st.session_state.get("media_editor", pd.DataFrame())
     community_df = st.session_state.get("community_editor", pd.DataFrame())
@@ -617,10 +569,7 @@ def save_campaign(result: dict[str, float],
     if community_rows:
         community_rows = [{**row, "source_campaign_id": None} for row in community_rows]
 
-    replace_creator_rows(campaign_id, creator_rows)
-    replace_media_rows(campaign_id, media_rows)
-    replace_community_rows(campaign_id, community_rows)
-    return campaign_id
+    return save_campaign_bundle(payload, creator_rows, media_rows, community_rows, campaign_id=campaign_id)
 
 
 def render_auth():
@@ -1441,7 +1390,9 @@ if page == PAGE_CAMPAIGN_BUILDER:
 
         elif active_tab == "Creator Echo":
             st.caption("Capture creator activations manually or via Fanpage Karma upload.")
-            tab_upload, tab_manual = st.tabs(["Import Fanpage Karma data", "Manual entry"])
+            tab_upload, tab_manual, tab_suggest = st.tabs(
+                ["Import Fanpage Karma data", "Manual entry", "Suggest mix"]
+            )
             with tab_upload:
                 st.info("Upload your Fanpage Karma data - Top 500 posts export to pre-fill creator data.")
                 uploaded = st.file_uploader("Upload .xlsx file", type=["xlsx"], key="creator_upload_primary")
@@ -1451,10 +1402,14 @@ if page == PAGE_CAMPAIGN_BUILDER:
                         st.error("Attach a file first.")
                     else:
                         try:
-                            creator_df, summary = parse_creator_upload(uploaded)
+                            upload = load_creator_upload(uploaded, uploaded.name, st.session_state["user"]["id"])
+                            creator_df = upload.grouped
                             st.session_state["creator_cards"] = creator_df.to_dict("records")
                             st.session_state["creator_editor"] = creator_df
-                            st.session_state["creator_upload_summary"] = summary
+                            st.session_state["creator_upload_summary"] = upload.summary
+                            st.session_state["creator_upload_id"] = upload.upload_id
+                            st.session_state["creator_upload_cached_at"] = upload.parsed_at if upload.cached else None
+                            st.session_state["creator_efficiency"] = upload_efficiency(upload.upload_id)
                             st.success("Creator upload parsed successfully.")
                             st.rerun()
                         except Exception as exc:
@@ -1465,9 +1420,11 @@ if page == PAGE_CAMPAIGN_BUILDER:
                         f"{platform}: {count}"
                         for platform, count in summary["platform_breakdown"].items()
                     )
+                    cached_at = st.session_state.get("creator_upload_cached_at")
                     st.success(
                         f"Parsed {summary['total_posts']} posts from {summary['unique_creators']} creators. "
                         f"Platform breakdown: {platform_lines or 'N/A'}."
+                        + (f" Same file as your earlier upload; reused the parse from {cached_at}." if cached_at else "")
                     )
                 creator_preview_df = st.session_state.get("creator_editor")
                 if isinstance(creator_preview_df, pd.DataFrame) and not creator_preview_df.empty:
@@ -1504,6 +1461,72 @@ if page == PAGE_CAMPAIGN_BUILDER:
                         st.info("No rows match the selected filters.")
                     else:
                         st.dataframe(filtered, use_container_width=True)
+                efficiency = st.session_state.get("creator_efficiency")
+                if efficiency is not None and efficiency.totals["posts"]:
+                    totals = efficiency.totals
+                    st.markdown("##### Creator cost efficiency")
+                    render_kpi_row(
+                        [
+                            ("Creator fees", _fmt_compact(totals["fee"]), f"{totals['fee']:,.0f} THB"),
+                            ("EMV", _fmt_compact(totals["emv"]), f"{totals['emv']:,.0f} THB"),
+                            ("Cost per engagement", f"{totals['cpe']:,.2f}",
+                             f"{totals['engagements']:,.0f} engagements"),
+                            ("EMV per fee", f"{totals['emv_per_fee']:,.2f}x",
+                             f"{totals['creators']:,} creators, {totals['posts']:,} posts"),
+                        ],
+                        cols_in_row=4,
+                    )
+                    tier_df = efficiency.tiers.dropna(subset=["cpe_p50"])
+                    if not tier_df.empty:
+                        cpe_band = (
+                            alt.Chart(tier_df)
+                            .mark_bar(height=18, color=VERO_ACCENT, opacity=0.5)
+                            .encode(
+                                x=alt.X("cpe_p10:Q", title="Cost per engagement (THB)"),
+                                x2="cpe_p90:Q",
+                                y=alt.Y("tier:N", title=None, sort=tier_df["tier"].tolist()),
+                                tooltip=[
+                                    alt.Tooltip("tier:N", title="Tier"),
+                                    alt.Tooltip("creators:Q", format=",", title="Creators"),
+                                    alt.Tooltip("cpe_p10:Q", format=",.2f", title="P10"),
+                                    alt.Tooltip("cpe_p50:Q", format=",.2f", title="P50"),
+                                    alt.Tooltip("cpe_p90:Q", format=",.2f", title="P90"),
+                                ],
+                            )
+                        )
+                        cpe_median = (
+                            alt.Chart(tier_df)
+                            .mark_tick(color=VERO_PRIMARY, thickness=3, size=26)
+                            .encode(x="cpe_p50:Q", y=alt.Y("tier:N", sort=tier_df["tier"].tolist()))
+                        )
+                        st.caption("Cost per engagement across each tier's creators: P10–P90, tick at P50.")
+                        st.altair_chart(
+                            (cpe_band + cpe_median).properties(height=40 * len(tier_df) + 40),
+                            use_container_width=True,
+                        )
+                    st.dataframe(
+                        efficiency.tiers.rename(
+                            columns={
+                                "tier": "Tier", "creators": "Creators", "posts": "Posts", "fee": "Fee",
+                                "engagements": "Engagements", "emv": "EMV", "cpe": "CPE",
+                                "emv_per_fee": "EMV / fee",
+                            }
+                        ),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+                    st.markdown("Top creators by EMV per fee")
+                    st.dataframe(
+                        efficiency.creators.head(20).rename(
+                            columns={
+                                "tier": "Tier", "profile": "Creator", "posts": "Posts", "fee": "Fee",
+                                "engagements": "Engagements", "emv": "EMV", "cpe": "CPE",
+                                "emv_per_fee": "EMV / fee",
+                            }
+                        ),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
                 col_creator_upload_next = st.columns([3, 1])[1]
                 with col_creator_upload_next:
                     st.button(
@@ -1597,6 +1620,87 @@ if page == PAGE_CAMPAIGN_BUILDER:
                     type="secondary",
                     on_click=lambda: go_next_tab("Creator Echo"),
                 )
+            with tab_suggest:
+                st.caption(
+                    "Recommend the post mix that maximises Creator Echo within a budget. "
+                    "Costs per post are assumptions - edit them to match your quotes."
+                )
+                campaign_inv = float(st.session_state.get("campaign_info", {}).get("campaign_investment", 0.0))
+                mix_cols = st.columns(2)
+                with mix_cols[0]:
+                    mix_budget = st.number_input(
+                        "Investment ceiling",
+                        min_value=0.0,
+                        step=10000.0,
+                        value=campaign_inv,
+                        key="mix_budget",
+                    )
+                with mix_cols[1]:
+                    mix_platforms = st.multiselect(
+                        "Platforms",
+                        CREATOR_PLATFORM_OPTIONS,
+                        default=["Facebook", "Instagram", "TikTok"],
+                        key="mix_platforms",
+                    )
+                mix_candidates = pd.DataFrame(
+                    [
+                        {
+                            "platform": preset["platform"],
+                            "content_type": preset["content_type"],
+                            "tier": preset["tier"],
+                            "cost_per_post": DEFAULT_CREATOR_COST_PER_POST.get(preset["tier"], 0.0),
+                            "min_posts": 0,
+                            "max_posts": 10,
+                        }
+                        for platform in mix_platforms
+                        for preset in get_creator_presets(platform)
+                    ],
+                    columns=CANDIDATE_COLUMNS,
+                )
+                mix_editor = st.data_editor(
+                    mix_candidates,
+                    column_config={
+                        "platform": st.column_config.TextColumn("Platform", disabled=True),
+                        "content_type": st.column_config.TextColumn("Content Type", disabled=True),
+                        "tier": st.column_config.TextColumn("Tier", disabled=True),
+                        "cost_per_post": st.column_config.NumberColumn(
+                            "Cost per post", min_value=0.0, step=1000.0, format="%.0f"
+                        ),
+                        "min_posts": st.column_config.NumberColumn("Min posts", min_value=0, step=1),
+                        "max_posts": st.column_config.NumberColumn("Max posts", min_value=0, step=1),
+                    },
+                    hide_index=True,
+                    use_container_width=True,
+                    key="mix_candidates_editor",
+                )
+                if st.button("Suggest mix", key="btn_suggest_mix", type="primary"):
+                    try:
+                        st.session_state["creator_mix"] = suggest_creator_mix(
+                            mix_budget, pd.DataFrame(mix_editor)
+                        )
+                    except ValueError as exc:
+                        st.session_state.pop("creator_mix", None)
+                        st.error(str(exc))
+                suggested = st.session_state.get("creator_mix")
+                if suggested:
+                    mix_df, mix_summary = suggested
+                    chosen = mix_df[mix_df["num_posts"] > 0]
+                    st.success(
+                        f"Suggested mix: {_fmt_compact(mix_summary['tev'])} Creator Echo for "
+                        f"{_fmt_compact(mix_summary['spend'])} spend "
+                        f"({_fmt_compact(mix_summary['remaining'])} unallocated)."
+                    )
+                    st.dataframe(
+                        chosen[["platform", "content_type", "tier", "num_posts", "spend", "value"]],
+                        hide_index=True,
+                        use_container_width=True,
+                    )
+                    if not chosen.empty and st.button("Use this mix", key="btn_apply_mix"):
+                        applied = chosen[["platform", "content_type", "tier", "num_posts"]].reset_index(drop=True)
+                        st.session_state["creator_cards"] = applied.to_dict("records")
+                        st.session_state["creator_editor"] = applied
+                        st.session_state.pop("creator_mix", None)
+                        st.rerun()
         elif active_tab == "Community Echo":
             st.caption("Quantify owned-community contribution to the echo.")
             community_columns = [
@@ -1662,6 +1766,13 @@ if page == PAGE_CAMPAIGN_BUILDER:
                 on_click=lambda: st.session_state.update(active_wizard_step="Echo Impact Report"),
             )
 
+        ledger = synced_tev_ledger()
+        running_cols = st.columns(4)
+        running_cols[0].metric("Running TEV", _fmt_compact(ledger.tev))
+        running_cols[1].metric("Media Echo", _fmt_compact(ledger.totals["media"]))
+        running_cols[2].metric("Creator Echo", _fmt_compact(ledger.totals["creator"]))
+        running_cols[3].metric("Community Echo", _fmt_compact(ledger.totals["community"]))
+
         st.session_state["wizard_completed"]["Echo Studio"] = True
         if st.button("Next: Echo Impact Report", key="btn_to_impact_report", type="primary"):
             go_to_next_step("Echo Studio")
@@ -1716,7 +1827,7 @@ if page == PAGE_CAMPAIGN_BUILDER:
             if inv <= 0:
                 st.error("Investment (INV) must be greater than 0.")
             else:
-                result = calculate_campaign(inv, media_df, creator_df, comm_df)
+                result = synced_tev_ledger().result(inv)
                 st.session_state["last_result"] = result
                 st.session_state["last_inv"] = inv
                 st.session_state["last_campaign_name"] = campaign_name
@@ -1727,6 +1838,20 @@ if page == PAGE_CAMPAIGN_BUILDER:
             result = st.session_state["last_result"]
 
             st.subheader("Results")
+            if result.get("rate_card_version"):
+                st.caption(f"Computed with rate card v{result['rate_card_version']}.")
+
+            unmatched = result.get("unmatched") or {}
+            unmatched_lines = [
+                f"{echo.title()}: " + ", ".join(" / ".join(key) for key in keys)
+                for echo, keys in unmatched.items()
+                if keys
+            ]
+            if unmatched_lines:
+                st.warning(
+                    "Some inputs have no reference rate and were valued at 0:  \n"
+                    + "  \n".join(unmatched_lines)
+                )
 
             # KPI cards (compact format)
             tev = float(result["tev"])
@@ -1771,6 +1896,150 @@ if page == PAGE_CAMPAIGN_BUILDER:
             )
             st.altair_chart(tev_chart, use_container_width=True)
 
+            with st.expander("Uncertainty bands"):
+                st.caption("Reference rates are point estimates. Draw the rate card many times to see a likely range.")
+                ub1, ub2 = st.columns(2)
+                with ub1:
+                    rate_spread = st.slider(
+                        "Rate spread (± %)", min_value=0, max_value=50, value=20, step=5, key="band_spread"
+                    )
+                with ub2:
+                    band_samples = st.select_slider(
+                        "Samples", options=[1_000, 10_000, 100_000], value=10_000, key="band_samples"
+                    )
+                band_inv = st.session_state.get("last_inv", inv)
+                bands_key = (campaign_inputs_key(band_inv, media_df, creator_df, comm_df), rate_spread, band_samples)
+                if st.button("Draw bands", key="btn_draw_bands"):
+                    st.session_state["campaign_bands"] = (
+                        bands_key,
+                        calculate_campaign_bands(
+                            band_inv,
+                            media_df,
+                            creator_df,
+                            comm_df,
+                            RateUncertainty(relative_min=1 - rate_spread / 100, relative_max=1 + rate_spread / 100),
+                            n_samples=band_samples,
+                        ),
+                    )
+                drawn_key, bands = st.session_state.get("campaign_bands", (None, None))
+                if drawn_key != bands_key:
+                    st.caption("Click Draw bands for the current inputs and settings.")
+                else:
+                    render_kpi_row(
+                        [
+                            ("TEV P10", _fmt_compact(bands["tev"]["p10"]), f"{bands['tev']['p10']:,.0f} THB"),
+                            ("TEV P50", _fmt_compact(bands["tev"]["p50"]), f"{bands['tev']['p50']:,.0f} THB"),
+                            ("TEV P90", _fmt_compact(bands["tev"]["p90"]), f"{bands['tev']['p90']:,.0f} THB"),
+                            ("ROI % P10-P90", f"{bands['roi_pct']['p10']:.0f}–{bands['roi_pct']['p90']:.0f}%",
+                             f"P50 {bands['roi_pct']['p50']:.1f}%"),
+                        ],
+                        cols_in_row=4,
+                    )
+                    band_df = pd.DataFrame([{"Metric": "TEV (THB)", **bands["tev"]}])
+                    band_chart = (
+                        alt.Chart(band_df)
+                        .mark_bar(height=18, color=VERO_ACCENT, opacity=0.5)
+                        .encode(
+                            x=alt.X("p10:Q", title="TEV (THB)", axis=alt.Axis(format="~s")),
+                            x2="p90:Q",
+                            y=alt.Y("Metric:N", title=None),
+                            tooltip=[
+                                alt.Tooltip("p10:Q", format=",.0f", title="P10"),
+                                alt.Tooltip("p50:Q", format=",.0f", title="P50"),
+                                alt.Tooltip("p90:Q", format=",.0f", title="P90"),
+                            ],
+                        )
+                    )
+                    band_median = (
+                        alt.Chart(band_df)
+                        .mark_tick(color=VERO_PRIMARY, thickness=3, size=26)
+                        .encode(x="p50:Q", y="Metric:N")
+                    )
+                    st.altair_chart((band_chart + band_median).properties(height=90), use_container_width=True)
+
+            with st.expander("What-if sweep"):
+                st.caption("Vary one input against investment and see where TEV and ROI land.")
+                sweep_cells: dict[str, SweepAxis] = {}
+                for channel_type, tier_name in MEDIA_CELL_KEYS:
+                    sweep_cells[f"Media · {channel_type} / {tier_name} (mentions)"] = SweepAxis(
+                        "media", (), (channel_type, tier_name), mode="add"
+                    )
+                for platform in CREATOR_PLATFORM_OPTIONS:
+                    for content_type in get_allowed_content_options(platform):
+                        for tier in CREATOR_TIER_OPTIONS:
+                            sweep_cells[f"Creator · {platform} / {content_type} / {tier} (posts)"] = SweepAxis(
+                                "creator", (), (platform, content_type, tier), mode="add"
+                            )
+                for platform in COMMUNITY_PLATFORM_OPTIONS:
+                    for field in COMMUNITY_INPUT_COLUMNS:
+                        label = field.replace("_", " ").title()
+                        sweep_cells[f"Community · {platform} ({label})"] = SweepAxis(
+                            "community", (), (platform,), field=field, mode="add"
+                        )
+                sw1, sw2, sw3 = st.columns(3)
+                with sw1:
+                    sweep_cell_label = st.selectbox("Input to vary", list(sweep_cells), key="sweep_cell")
+                with sw2:
+                    sweep_extra = st.number_input(
+                        "Add up to", min_value=1, value=20, step=1, key="sweep_extra"
+                    )
+                with sw3:
+                    sweep_metric = st.selectbox("Metric", ["ROI %", "TEV"], key="sweep_metric")
+                base_inv_k = max(float(st.session_state.get("last_inv", inv)) / 1000, 1.0)
+                sweep_inv_range = st.slider(
+                    "Investment range (K)",
+                    min_value=0.0,
+                    max_value=base_inv_k * 3,
+                    value=(base_inv_k * 0.5, base_inv_k * 1.5),
+                    key="sweep_inv_range",
+                )
+                cell = sweep_cells[sweep_cell_label]
+                steps = min(int(sweep_extra), 40) + 1
+                sweep_inv = st.session_state.get("last_inv", inv)
+                sweep_key = (
+                    campaign_inputs_key(sweep_inv, media_df, creator_df, comm_df),
+                    sweep_cell_label,
+                    sweep_extra,
+                    sweep_inv_range,
+                )
+                if st.button("Run sweep", key="btn_run_sweep"):
+                    sweep_axes = [
+                        SweepAxis(cell.echo, np.linspace(0, sweep_extra, steps), cell.key, field=cell.field, mode="add"),
+                        SweepAxis(
+                            "investment",
+                            np.linspace(max(sweep_inv_range[0], 1.0), max(sweep_inv_range[1], 1.0), 25) * 1000,
+                        ),
+                    ]
+                    st.session_state["campaign_sweep"] = (
+                        sweep_key,
+                        sweep_campaign(sweep_inv, media_df, creator_df, comm_df, sweep_axes),
+                    )
+                swept_key, sweep = st.session_state.get("campaign_sweep", (None, None))
+                if swept_key != sweep_key:
+                    st.caption("Click Run sweep for the current inputs and settings.")
+                else:
+                    sweep_df = sweep.to_frame()
+                    sweep_df.columns = ["Added", "Investment", "TEV", "ROIM", "ROI %"]
+                    sweep_df["Added"] = sweep_df["Added"].round(1)
+                    sweep_df["Investment (K)"] = (sweep_df["Investment"] / 1000).round(0)
+                    heatmap = (
+                        alt.Chart(sweep_df)
+                        .mark_rect()
+                        .encode(
+                            x=alt.X("Investment (K):O", axis=alt.Axis(labelOverlap=True)),
+                            y=alt.Y("Added:O", sort="descending", title="Added to input"),
+                            color=alt.Color(f"{sweep_metric}:Q", scale=alt.Scale(scheme="blues")),
+                            tooltip=[
+                                alt.Tooltip("Added:Q"),
+                                alt.Tooltip("Investment (K):Q", format=",.0f"),
+                                alt.Tooltip("TEV:Q", format=",.0f"),
+                                alt.Tooltip("ROI %:Q", format=",.1f"),
+                            ],
+                        )
+                        .properties(height=320)
+                    )
+                    st.altair_chart(heatmap, use_container_width=True)
+
             st.markdown("### Save Campaign")
             if not campaign_name or not client:
                 st.info("Enter *Campaign name* and *Client / Brand* above to enable saving.")
@@ -1779,7 +2048,7 @@ if page == PAGE_CAMPAIGN_BUILDER:
                 save_label = "Update saved campaign" if editing_id else "Save this campaign to local database"
                 if st.button(save_label):
                     try:
-                        save_campaign(
+                        _, touched = save_campaign(
                             result,
                             st.session_state.get("last_inv", inv),
                             campaign_name,
@@ -1787,7 +2056,13 @@ if page == PAGE_CAMPAIGN_BUILDER:
                             market,
                             campaign_id=editing_id,
                         )
+                        changed = sum(
+                            counts["inserted"] + counts["updated"] + counts["deleted"]
+                            for counts in touched.values()
+                        )
                         st.success("Campaign saved! View it anytime in the Campaign Performance.")
+                        if editing_id:
+                            st.caption(f"{changed} entry row(s) changed.")
                     except Exception as e:
                         st.error(f"Failed to save campaign: {e}")
 
@@ -1808,39 +2083,65 @@ if page == PAGE_CAMPAIGN_BUILDER:
 elif page == PAGE_CAMPAIGN_LIBRARY:
     render_app_header("Campaign Performance", "Benchmarks across saved TEV analyses")
 
+    owner_id = st.session_state["user"]["id"]
     try:
-        df = fetch_campaigns(owner_id=st.session_state["user"]["id"])
+        owner_totals = fetch_campaign_totals(owner_id=owner_id)
     except Exception as e:
         st.error(f"Failed to load campaigns: {e}")
         st.stop()
 
-    if df.empty:
+    if not owner_totals["campaigns"]:
         st.info(
             "No campaigns saved yet. Use **Create New Campaign** in the Campaign Lab to model a campaign "
             "and save it to see it here."
         )
     else:
         st.subheader("Filters")
-        col1, col2, col3 = st.columns(3)
+        filter_options = fetch_campaign_filter_options(owner_id=owner_id)
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            clients = ["All"] + sorted(df["client"].dropna().unique().tolist())
+            clients = ["All"] + filter_options["client"]
             client_filter = st.selectbox("Client", clients, index=0)
         with col2:
-            markets = ["All"] + sorted(df["market"].dropna().unique().tolist())
+            markets = ["All"] + filter_options["market"]
             market_filter = st.selectbox("Market", markets, index=0)
         with col3:
-            campaigns = ["All"] + sorted(df["campaign_name"].dropna().unique().tolist())
+            campaign_options = filter_options["campaign_name"]
+            if client_filter != "All" or market_filter != "All":
+                campaign_options = fetch_campaign_filter_options(
+                    client=None if client_filter == "All" else client_filter,
+                    market=None if market_filter == "All" else market_filter,
+                    owner_id=owner_id,
+                )["campaign_name"]
+            campaigns = ["All"] + campaign_options
             campaign_filter = st.selectbox("Campaign", campaigns, index=0)
+        with col4:
+            sort_key = st.selectbox(
+                "Sort by",
+                list(LIBRARY_SORT_LABELS),
+                format_func=LIBRARY_SORT_LABELS.get,
+                index=0,
+            )
 
-        filtered_df = df.copy()
-        if client_filter != "All":
-            filtered_df = filtered_df[filtered_df["client"] == client_filter]
-        if market_filter != "All":
-            filtered_df = filtered_df[filtered_df["market"] == market_filter]
-        if campaign_filter != "All":
-            filtered_df = filtered_df[filtered_df["campaign_name"] == campaign_filter]
+        filters = {
+            "client": None if client_filter == "All" else client_filter,
+            "market": None if market_filter == "All" else market_filter,
+            "campaign_name": None if campaign_filter == "All" else campaign_filter,
+            "owner_id": owner_id,
+        }
+        # Keyset cursors of the pages before the current one; reset on any filter/sort change.
+        page_key = (tuple(filters.values()), sort_key)
+        if st.session_state.get("library_page_key") != page_key:
+            st.session_state["library_page_key"] = page_key
+            st.session_state["library_cursors"] = [None]
+        cursors = st.session_state["library_cursors"]
+        filtered = any(filters[key] for key in ("client", "market", "campaign_name"))
+        totals = fetch_campaign_totals(**filters) if filtered else owner_totals
+        page_df, next_cursor = fetch_campaign_page(
+            **filters, sort=sort_key, limit=LIBRARY_PAGE_SIZE, after=cursors[-1]
+        )
 
-        display_df = filtered_df.copy()
+        display_df = page_df.copy()
         if "objective_focus" in display_df.columns:
             focus_series = display_df["objective_focus"]
             if "objective" in display_df.columns:
@@ -1905,13 +2206,13 @@ elif page == PAGE_CAMPAIGN_LIBRARY:
                 return f"{val/1_000:.1f} K"
             return f"{val:,.0f}"
 
-        total_tev_val = filtered_df["tev"].sum()
-        total_media_val = filtered_df["media_echo"].sum()
-        total_creator_val = filtered_df["creator_echo"].sum()
-        total_comm_val = filtered_df["community_echo"].sum()
-        total_inv_val = filtered_df["investment"].sum() if "investment" in filtered_df else 0.0
-        avg_roi = filtered_df["roi_pct"].mean()
-        total_campaigns = len(filtered_df)
+        total_tev_val = totals["tev"]
+        total_media_val = totals["media_echo"]
+        total_creator_val = totals["creator_echo"]
+        total_comm_val = totals["community_echo"]
+        total_inv_val = totals["investment"]
+        avg_roi = totals["avg_roi_pct"]
+        total_campaigns = totals["campaigns"]
 
         row1_cards = [
             ("Total TEV", _fmt_compact(total_tev_val), f"{total_tev_val:,.0f} THB"),
@@ -1922,7 +2223,7 @@ elif page == PAGE_CAMPAIGN_LIBRARY:
         row2_cards = [
             ("# Campaigns", _fmt_value(total_campaigns), f"{total_campaigns}"),
             ("AVG ROI %", f"{avg_roi:.1f}%", ""),
-            ("ROIM (TEV / INV)", f"{(total_tev_val / total_inv_val):.2f}x" if total_inv_val else "0.00x", "TEV ÷ Investment"),
+            ("ROIM (TEV / INV)", f"{totals['roi_m']:.2f}x", "TEV ÷ Investment"),
             ("Investment", _fmt_compact(total_inv_val), f"{total_inv_val:,.0f} THB"),
         ]
         render_kpi_row(row1_cards, cols_in_row=4)
@@ -1935,9 +2236,9 @@ elif page == PAGE_CAMPAIGN_LIBRARY:
             "community": "#4bb7e5",
             "muted": "#d9dce3",
         }
-        total_media = float(filtered_df["media_echo"].sum()) if "media_echo" in filtered_df else 0.0
-        total_creator = float(filtered_df["creator_echo"].sum()) if "creator_echo" in filtered_df else 0.0
-        total_comm = float(filtered_df["community_echo"].sum()) if "community_echo" in filtered_df else 0.0
+        total_media = float(totals["media_echo"])
+        total_creator = float(totals["creator_echo"])
+        total_comm = float(totals["community_echo"])
         total_tev = total_media + total_creator + total_comm if (total_media + total_creator + total_comm) > 0 else 1.0
 
         col_d1, col_d2, col_d3, col_d4 = st.columns(4)
@@ -1959,11 +2260,11 @@ elif page == PAGE_CAMPAIGN_LIBRARY:
             chart_campaigns = sorted_campaigns_df["campaign_name"].unique().tolist()
             default_selection = chart_campaigns[:2]  # two newest/top campaigns by default
         selected_campaigns = st.multiselect(
-            "Select campaigns to display in charts",
+            "Select campaigns from this page to display in charts",
             chart_campaigns,
             default=default_selection,
         )
-        chart_df = filtered_df[filtered_df["campaign_name"].isin(selected_campaigns)] if selected_campaigns else filtered_df.iloc[0:0]
+        chart_df = page_df[page_df["campaign_name"].isin(selected_campaigns)] if selected_campaigns else page_df.iloc[0:0]
 
         c_chart1, c_chart2 = st.columns(2)
         with c_chart1:
@@ -2052,11 +2353,61 @@ elif page == PAGE_CAMPAIGN_LIBRARY:
 
                 st.altair_chart(roi_chart, use_container_width=True)
 
+        if not filters["campaign_name"]:
+            st.subheader("Portfolio breakdown")
+            breakdown_cols = st.columns(2)
+            for breakdown_col, group_by in zip(breakdown_cols, ("client", "market")):
+                with breakdown_col:
+                    breakdown_df = (
+                        fetch_campaign_breakdown(group_by, **filters)
+                        .sort_values("tev", ascending=False)
+                        .head(BREAKDOWN_TOP_N)
+                    )
+                    breakdown_chart = (
+                        alt.Chart(breakdown_df)
+                        .mark_bar(color="#0b6ac8")
+                        .encode(
+                            y=alt.Y(f"{group_by}:N", title=group_by.title(), sort=breakdown_df[group_by].tolist()),
+                            x=alt.X("tev:Q", title="TEV (THB)", axis=alt.Axis(format="~s")),
+                            tooltip=[
+                                alt.Tooltip(f"{group_by}:N", title=group_by.title()),
+                                alt.Tooltip("campaigns:Q", title="# Campaigns"),
+                                alt.Tooltip("investment:Q", title="Investment", format=",.0f"),
+                                alt.Tooltip("tev:Q", title="Total TEV", format=",.0f"),
+                                alt.Tooltip("avg_roi_pct:Q", title="AVG ROI %", format=",.1f"),
+                                alt.Tooltip("roi_m:Q", title="ROIM", format=".2f"),
+                            ],
+                        )
+                        .properties(
+                            title=f"TEV by {group_by} (top {BREAKDOWN_TOP_N})",
+                            height=320,
+                            background=VERO_CARD_BG,
+                        )
+                    )
+                    st.altair_chart(breakdown_chart, use_container_width=True)
+
         st.subheader("Campaign Table")
         st.dataframe(display_df[existing_columns], width="stretch")
+        page_number = len(cursors)
+        first_row = (page_number - 1) * LIBRARY_PAGE_SIZE + 1
+        nav_prev, nav_info, nav_next = st.columns([1, 3, 1])
+        with nav_prev:
+            if st.button("← Previous", key="library_prev", disabled=page_number == 1):
+                cursors.pop()
+                st.rerun()
+        with nav_info:
+            st.caption(
+                f"Showing {first_row:,}–{first_row + len(page_df) - 1:,} of {total_campaigns:,} campaigns"
+                if len(page_df)
+                else "No campaigns match these filters."
+            )
+        with nav_next:
+            if st.button("Next →", key="library_next", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
 
         st.subheader("Edit saved campaign")
-        id_map = {int(row["id"]): row for _, row in filtered_df.iterrows() if pd.notna(row.get("id"))}
+        id_map = {int(row["id"]): row for row in page_df.to_dict("records")}
         if not id_map:
             st.info("No editable campaigns found.")
         else:
@@ -2226,9 +2577,10 @@ elif page == PAGE_CAMPAIGN_LIBRARY:
                         "campaign_investment": inv_k_existing * 1000,
                     }
                     try:
-                        creator_rows_df = fetch_creator_rows(selected_id)
+                        entries = fetch_campaign_entries(selected_id)
                     except Exception:
-                        creator_rows_df = pd.DataFrame()
+                        entries = {}
+                    creator_rows_df = entries.get("creator_echo_entries", pd.DataFrame())
                     if not creator_rows_df.empty:
                         creator_rows_df["content_type"] = creator_rows_df.apply(
                             lambda row: row["content_type"]
@@ -2238,17 +2590,11 @@ elif page == PAGE_CAMPAIGN_LIBRARY:
                         )
                         st.session_state["creator_cards"] = creator_rows_df.to_dict("records")
                         st.session_state["creator_editor"] = creator_rows_df
-                    try:
-                        media_rows_df = fetch_media_rows(selected_id)
-                    except Exception:
-                        media_rows_df = pd.DataFrame()
+                    media_rows_df = entries.get("media_echo_entries", pd.DataFrame())
                     if not media_rows_df.empty:
                         st.session_state["media_cards"] = media_rows_df.to_dict("records")
                         st.session_state["media_editor"] = media_rows_df
-                    try:
-                        community_rows_df = fetch_community_rows(selected_id)
-                    except Exception:
-                        community_rows_df = pd.DataFrame()
+                    community_rows_df = entries.get("community_echo_entries", pd.DataFrame())
                     if not community_rows_df.empty:
                         st.session_state["community_cards"] = community_rows_df.to_dict("records")
                         st.session_state["community_editor"] = community_rows_df
@@ -0,0 +1,156 @@
+"""
+Benchmark plumbing: a throwaway SQLite database, timing/peak-memory
+measurement and the JSON baseline comparison.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import db
+from logic import calculator
+
+REFERENCE_TABLES = {
+    "media_rate_reference": ["category", "type", "tier_value"],
+    "creator_rate_reference": ["platform", "content_type", "tier", "rate"],
+    "community_rate_reference": [
+        "platform",
+        "weight_content",
+        "weight_passive",
+        "weight_active",
+        "weight_amplification",
+    ],
+}
+# Differences below these are noise, whatever the relative change.
+MIN_SECONDS_DELTA = 0.005
+MIN_PEAK_MB_DELTA = 1.0
+
+
+def _reset_caches() -> None:
+    calculator._load_reference_tables.cache_clear()
+    calculator._compile_rate_lookup.cache_clear()
+
+
+def seed_reference_tables(source: Path = db.DB_PATH) -> None:
+    """
+    Copy the rate reference tables from `source` (opened read-only) into the
+    current database.
+    """
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    try:
+        with db.get_conn() as conn:
+            for table, columns in REFERENCE_TABLES.items():
+                rows = src.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall()
+                placeholders = ", ".join("?" for _ in columns)
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                    rows,
+                )
+    finally:
+        src.close()
+
+
+@contextmanager
+def use_database(path: Path) -> Iterator[Path]:
+    """
+    Point the db module (and the calculator caches) at `path` for the block.
+    """
+    saved = (db.DB_PATH, db.DATA_DIR, db._SCHEMA_CURRENT)
+    db.DB_PATH, db.DATA_DIR, db._SCHEMA_CURRENT = path, path.parent, False
+    _reset_caches()
+    try:
+        yield path
+    finally:
+        db.close_connections()
+        db.DB_PATH, db.DATA_DIR, db._SCHEMA_CURRENT = saved
+        _reset_caches()
+
+
+@contextmanager
+def temporary_database(seed_from: Path = db.DB_PATH) -> Iterator[Path]:
+    """
+    A fresh SQLite file for the duration of the block, with the rate
+    reference tables copied from `seed_from`.
+    """
+    with tempfile.TemporaryDirectory(prefix="vero-bench-") as tmp:
+        with use_database(Path(tmp) / "bench.db") as path:
+            seed_reference_tables(seed_from)
+            yield path
+
+
+def measure(fn: Callable[[], Any], repeat: int = 3) -> dict[str, float]:
+    """
+    Best wall time over `repeat` runs, then one traced run for peak memory.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(timings), "peak_mb": peak / 2**20}
+
+
+def environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "sqlite": sqlite3.sqlite_version,
+    }
+
+
+def load_baseline(path: Path) -> dict[str, Any] | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_results(path: Path, results: dict[str, dict[str, float]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def find_regressions(results: dict[str, dict[str, float]],
+                     baseline: dict[str, Any],
+                     threshold: float) -> list[str]:
+    """
+    Benchmarks whose time or peak memory grew by more than `threshold`
+    (0.25 = 25%) against the baseline.
+    """
+    regressions = []
+    floors = {"seconds": MIN_SECONDS_DELTA, "peak_mb": MIN_PEAK_MB_DELTA}
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for metric, floor in floors.items():
+            before, after = previous.get(metric), current.get(metric)
+            if before is None or after is None:
+                continue
+            if after - before > floor and after > before * (1 + threshold):
+                regressions.append(
+                    f"{name} {metric}: {before:.4f} -> {after:.4f} (+{(after / before - 1) * 100:.0f}%)"
+                    if before
+                    else f"{name} {metric}: {before:.4f} -> {after:.4f}"
+                )
+    return regressions
@@ -0,0 +1,210 @@
+"""
+EXPLAIN QUERY PLAN checks for every query db.py runs.
+
+Calls each public db function against a synthetic database, captures the SQL
+it actually executes (with bound values) through the connection's trace
+callback, and fails when a statement on a growing table does a full scan or
+sorts in a temp B-tree. Also checks that every foreign key column has an
+index, so ON DELETE CASCADE does not scan the child table:
+
+    python -m benchmarks.query_plans
+    python -m benchmarks.query_plans --verbose
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from typing import Any, Callable
+
+import pandas as pd
+
+import db
+from benchmarks.harness import temporary_database
+from benchmarks.synthetic import generate
+
+SEED_CAMPAIGNS = 2_000
+# Tables that grow with usage; small lookup tables may be scanned.
+GROWING_TABLES = {
+    "users",
+    "campaigns",
+    "campaign_rollups",
+    "campaign_user_access",
+    "creator_uploads",
+    "creator_upload_rows",
+    "creator_echo_entries",
+    "media_echo_entries",
+    "community_echo_entries",
+}
+_RESULT = {"media": 1.0, "creator": 1.0, "community": 1.0, "tev": 3.0, "roi_m": 0.03, "roi_pct": -97.0}
+_CREATOR_ROW = {"platform": "Instagram", "content_type": "Video Post", "tier": "Micro", "num_posts": 2}
+_MEDIA_ROW = {"channel_type": "Online Article", "tier_name": "Major", "mentions": 3}
+_NARROW = {"client": "Client 00001", "market": "Thailand"}
+_COMMUNITY_ROW = {"platform": "TikTok", "content_creation": 1, "passive_engagement": 100}
+
+
+def _calls() -> dict[str, Callable[[], Any]]:
+    """
+    One entry per query shape db.py can issue.
+    """
+    state: dict[str, Any] = {}
+
+    def _insert() -> None:
+        state["campaign_id"] = db.insert_campaign(_RESULT, 100.0, "Plan check", "Client 00001", "Thailand", owner_id=1)
+
+    def _create_user() -> None:
+        db.create_user("plan-check@synthetic.vero.test", "!", "Plan Check", "Vero", "IQ", "internal")
+
+    def _upload() -> None:
+        state["upload_id"] = db.start_creator_upload("0" * 64, "plan-check.xlsx", 1, 1)
+        db.finish_creator_upload(state["upload_id"], {"total_posts": 1}, [])
+
+    cid = lambda: state["campaign_id"]
+    return {
+        "create_user": _create_user,
+        "get_user_by_email": lambda: db.get_user_by_email("user1@synthetic.vero.test"),
+        "update_last_login": lambda: db.update_last_login(1),
+        "insert_campaign": _insert,
+        "update_campaign": lambda: db.update_campaign(cid(), {"campaign_name": "Plan check 2", "investment": 200.0}),
+        "fetch_campaigns": lambda: db.fetch_campaigns(),
+        "fetch_campaigns(owner_id)": lambda: db.fetch_campaigns(owner_id=1),
+        "fetch_campaigns(client)": lambda: db.fetch_campaigns(client="Client 00001"),
+        "fetch_campaigns(market)": lambda: db.fetch_campaigns(market="Vietnam"),
+        "fetch_campaigns(campaign_name)": lambda: db.fetch_campaigns(campaign_name="Campaign 7"),
+        "fetch_campaigns(owner_id, client, market)": lambda: db.fetch_campaigns(
+            client="Client 00001", market="Thailand", owner_id=1
+        ),
+        **{
+            f"fetch_campaign_page(sort={sort})": (
+                lambda sort=sort: db.fetch_campaign_page(owner_id=1, sort=sort, limit=5)
+            )
+            for sort in db.CAMPAIGN_SORTS
+        },
+        "fetch_campaign_page(after)": lambda: db.fetch_campaign_page(
+            owner_id=1, limit=5, after=db.fetch_campaign_page(owner_id=1, limit=5)[1]
+        ),
+        "fetch_campaign_page(client, market)": lambda: db.fetch_campaign_page(
+            client="Client 00001", market="Thailand", owner_id=1, sort="tev", limit=5
+        ),
+        "fetch_campaign_totals(owner_id)": lambda: db.fetch_campaign_totals(owner_id=1),
+        "fetch_campaign_totals(owner_id, client)": lambda: db.fetch_campaign_totals(client="Client 00001", owner_id=1),
+        "fetch_campaign_totals(owner_id, campaign_name)": lambda: db.fetch_campaign_totals(
+            campaign_name="Campaign 7", owner_id=1
+        ),
+        **{
+            f"fetch_campaign_breakdown({group_by}{', ' + narrow if narrow else ''})": (
+                lambda group_by=group_by, narrow=narrow: db.fetch_campaign_breakdown(
+                    group_by, owner_id=1, **({narrow: _NARROW[narrow]} if narrow else {})
+                )
+            )
+            for group_by in db.CAMPAIGN_BREAKDOWNS
+            for narrow in (None, *_NARROW)
+        },
+        "fetch_campaign_filter_options": lambda: db.fetch_campaign_filter_options(owner_id=1),
+        "fetch_campaign_filter_options(client)": lambda: db.fetch_campaign_filter_options(
+            client="Client 00001", owner_id=1
+        ),
+        "insert_creator_rows": lambda: db.insert_creator_rows(cid(), [_CREATOR_ROW]),
+        "replace_creator_rows": lambda: db.replace_creator_rows(cid(), [_CREATOR_ROW]),
+        "replace_media_rows": lambda: db.replace_media_rows(cid(), [_MEDIA_ROW]),
+        "replace_community_rows": lambda: db.replace_community_rows(cid(), [_COMMUNITY_ROW]),
+        "save_campaign_bundle": lambda: db.save_campaign_bundle(
+            {"campaign_name": "Plan check 3"}, [_CREATOR_ROW], [_MEDIA_ROW], [_COMMUNITY_ROW], campaign_id=cid()
+        ),
+        "fetch_creator_rows": lambda: db.fetch_creator_rows(cid()),
+        "fetch_media_rows": lambda: db.fetch_media_rows(cid()),
+        "fetch_community_rows": lambda: db.fetch_community_rows(cid()),
+        "fetch_entry_rows": lambda: db.fetch_entry_rows([cid(), 1, 2, 3]),
+        "fetch_campaign_entries": lambda: db.fetch_campaign_entries(cid()),
+        "fetch_rate_card_version": db.fetch_rate_card_version,
+        "start_creator_upload + finish_creator_upload": _upload,
+        "find_creator_upload": lambda: db.find_creator_upload("0" * 64, 1, 1),
+        "insert_creator_upload_rows": lambda: db.insert_creator_upload_rows(
+            state["upload_id"], pd.DataFrame([{**_CREATOR_ROW, "profile": "plan-check", "emv": 1.0}])
+        ),
+        "creator_upload_totals": lambda: db.creator_upload_totals(state["upload_id"]),
+        "fail_creator_upload": lambda: db.fail_creator_upload(state["upload_id"]),
+    }
+
+
+def _capture(fn: Callable[[], Any]) -> list[str]:
+    statements: list[str] = []
+    conn = db.get_conn()
+    conn.set_trace_callback(statements.append)
+    try:
+        fn()
+    finally:
+        conn.set_trace_callback(None)
+    queries = [
+        sql.strip()
+        for sql in statements
+        if re.match(r"\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", sql, re.IGNORECASE)
+    ]
+    return list(dict.fromkeys(queries))
+
+
+def _plan_problems(plan: list[str]) -> list[str]:
+    problems = []
+    for detail in plan:
+        if "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+        match = re.match(r"SCAN (\w+)", detail)
+        if match and match.group(1) in GROWING_TABLES and "INDEX" not in detail:
+            problems.append(detail)
+    return problems
+
+
+def _unindexed_foreign_keys(conn: Any) -> list[str]:
+    missing = []
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    for table in tables:
+        leading = {
+            conn.execute(f"PRAGMA index_info({index[1]})").fetchone()[2]
+            for index in conn.execute(f"PRAGMA index_list({table})")
+        }
+        for fk in conn.execute(f"PRAGMA foreign_key_list({table})"):
+            column = fk[3]
+            if column not in leading:
+                missing.append(f"{table}.{column} -> {fk[2]}")
+    return missing
+
+
+def check_query_plans(verbose: bool = False) -> list[str]:
+    """
+    Returns one line per problem; an empty list means every query is indexed.
+    """
+    failures = []
+    with temporary_database() as path:
+        generate(path, SEED_CAMPAIGNS, seed=0)
+        conn = db.get_conn()
+        for name, fn in _calls().items():
+            for sql in _capture(fn):
+                plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+                problems = _plan_problems(plan)
+                if verbose or problems:
+                    print(f"{'FAIL' if problems else 'ok  '} {name}: {' '.join(sql.split())[:100]}")
+                    for detail in plan:
+                        print(f"       {detail}")
+                failures.extend(f"{name}: {problem}" for problem in problems)
+        failures.extend(f"unindexed foreign key {fk}" for fk in _unindexed_foreign_keys(conn))
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the query plans of every db.py query.")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan, not only failures.")
+    args = parser.parse_args(argv)
+
+    failures = check_query_plans(args.verbose)
+    if failures:
+        print("Query plan problems:")
+        for line in failures:
+            print(f"  {line}")
+        return 1
+    print("Every db.py query uses an index.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
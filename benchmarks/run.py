@@ -0,0 +1,322 @@
+"""
+Performance benchmarks for the calculator and the DB layer.
+
+Runs offline against a temporary SQLite file seeded with the rate card from
+data/vero-echo-tool.db, records best-of-N wall time and peak traced memory
+per benchmark, and compares them with a JSON baseline:
+
+    python -m benchmarks.run                       # small + medium
+    python -m benchmarks.run --scale large         # 100k campaigns, 1M upload rows
+    python -m benchmarks.run --update-baseline     # accept the current numbers
+
+Exits with status 1 when any benchmark regresses by more than --threshold.
+When the baseline file does not exist yet, it is written and the run passes.
+Timings only compare on the machine that recorded them, so the default
+baseline, benchmarks/baseline.json, is gitignored; pass --baseline to keep
+one elsewhere.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import itertools
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+import db
+from benchmarks.harness import (
+    find_regressions,
+    load_baseline,
+    measure,
+    temporary_database,
+    write_results,
+)
+from benchmarks.workloads import campaign_entries, populate_campaigns, upload_frame, upload_workbook
+from logic.calculator import TevLedger, calculate_campaign, calculate_campaigns, get_rate_lookup
+from logic.creator_analytics import upload_efficiency
+from logic.uploads import (
+    normalize_upload_posts,
+    parse_creator_upload,
+    scan_creator_upload,
+    summarize_creator_upload,
+)
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+SCALES = {
+    "small": {"campaigns": 10, "upload_rows": 100},
+    "medium": {"campaigns": 1_000, "upload_rows": 10_000},
+    "large": {"campaigns": 100_000, "upload_rows": 1_000_000},
+}
+# Per-campaign calls are timed on at most this many campaigns per scale.
+SINGLE_CALL_SAMPLE = 1_000
+SAVES_PER_RUN = 20
+UPLOAD_BATCH = 50_000
+# Simulated Streamlit sessions, each a fresh thread making small DB calls.
+SESSIONS = 8
+CALLS_PER_SESSION = 50
+
+
+def _save_frames(entries: dict[str, Any], campaign_id: int) -> tuple[dict[str, Any], dict[str, list[dict]]]:
+    frames = {
+        name: entries[name][entries[name]["campaign_id"] == campaign_id].drop(columns="campaign_id")
+        for name in ("media", "creator", "community")
+    }
+    result = calculate_campaign(
+        float(entries["investment"][campaign_id]), frames["media"], frames["creator"], frames["community"]
+    )
+    return result, {name: frame.to_dict("records") for name, frame in frames.items()}
+
+
+def _save_campaign(prepared: tuple[dict[str, Any], dict[str, list[dict]]], investment: float) -> None:
+    """
+    The DB side of app.save_campaign for one new campaign: one
+    save_campaign_bundle transaction.
+    """
+    result, rows = prepared
+    payload = {
+        "campaign_name": "Bench",
+        "client": "Bench",
+        "market": "Thailand",
+        "investment": investment,
+        "media_echo": result["media"],
+        "creator_echo": result["creator"],
+        "community_echo": result["community"],
+        "tev": result["tev"],
+        "roi_m": result["roi_m"],
+        "roi_pct": result["roi_pct"],
+        "rate_card_version": result["rate_card_version"],
+    }
+    db.save_campaign_bundle(payload, rows["creator"], rows["media"], rows["community"])
+
+
+def _save_campaign_separate(prepared: tuple[dict[str, Any], dict[str, list[dict]]], investment: float) -> None:
+    """
+    The same save as four transactions (insert_campaign + replace_*_rows),
+    as app.save_campaign did before save_campaign_bundle.
+    """
+    result, rows = prepared
+    new_id = db.insert_campaign(result, investment, "Bench", "Bench", "Thailand")
+    db.replace_creator_rows(new_id, rows["creator"])
+    db.replace_media_rows(new_id, rows["media"])
+    db.replace_community_rows(new_id, rows["community"])
+
+
+def _resave_campaign(prepared: tuple[dict[str, Any], dict[str, list[dict]]], campaign_id: int, bump: int) -> None:
+    """
+    Re-save an existing campaign with one creator cell edited.
+    """
+    result, rows = prepared
+    creator = [dict(row) for row in rows["creator"]]
+    creator[0]["num_posts"] = float(creator[0]["num_posts"]) + bump
+    db.save_campaign_bundle({"tev": result["tev"]}, creator, rows["media"], rows["community"], campaign_id=campaign_id)
+
+
+def _ledger_rerun(ledger: TevLedger, cards: dict[str, list[dict]], inv: float, bump: int) -> dict:
+    """
+    What an app rerun after one edit costs: the rate card version check,
+    syncing the echo cards into the session's TevLedger (one creator row
+    changed) and reading the result.
+    """
+    if ledger.version != get_rate_lookup().version:
+        raise RuntimeError("The rate card changed during the benchmark.")
+    cards["creator"][0]["num_posts"] = bump
+    for echo in ("media", "creator", "community"):
+        ledger.sync(echo, cards[echo])
+    return ledger.result(inv)
+
+
+def _store_upload_rows(posts: Any) -> int:
+    """
+    The DB side of ingest_creator_upload: one upload's normalized posts
+    written in UPLOAD_BATCH-row transactions.
+    """
+    upload_id = db.start_creator_upload("0" * 64, "bench.xlsx", 1, 0)
+    for start in range(0, len(posts), UPLOAD_BATCH):
+        db.insert_creator_upload_rows(upload_id, posts.iloc[start:start + UPLOAD_BATCH])
+    return upload_id
+
+
+def _concurrent_sessions(campaign_ids: list[int]) -> None:
+    """
+    SESSIONS threads at once, each making the small reads a page render does.
+    """
+    def _session(offset: int) -> None:
+        for i in range(CALLS_PER_SESSION):
+            cid = campaign_ids[(offset + i) % len(campaign_ids)]
+            db.fetch_rate_card_version()
+            db.fetch_creator_rows(cid)
+            db.get_user_by_email("bench1@example.com")
+
+    threads = [threading.Thread(target=_session, args=(n,)) for n in range(SESSIONS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _unpooled(fn: Callable[[], Any]) -> Callable[[], Any]:
+    def _run() -> Any:
+        db.CONNECTION_POOL = False
+        try:
+            return fn()
+        finally:
+            db.CONNECTION_POOL = True
+    return _run
+
+
+def run_scale(scale: str, repeat: int) -> dict[str, dict[str, float]]:
+    params = SCALES[scale]
+    entries = campaign_entries(params["campaigns"])
+    results: dict[str, dict[str, float]] = {}
+
+    def record(name: str, fn: Callable[[], Any], items: int, times: int = repeat) -> None:
+        stats = measure(fn, repeat=times)
+        stats["items"] = items
+        stats["per_item_us"] = stats["seconds"] / items * 1e6 if items else 0.0
+        results[f"{scale}/{name}"] = stats
+        print(f"  {name:<28} {stats['seconds'] * 1000:>10.2f} ms  {stats['peak_mb']:>8.1f} MB  "
+              f"({stats['per_item_us']:,.1f} us/item)")
+
+    with temporary_database():
+        sample_ids = list(entries["investment"].index[:SINGLE_CALL_SAMPLE])
+        grouped = {
+            name: dict(tuple(entries[name][entries[name]["campaign_id"].isin(sample_ids)].groupby("campaign_id")))
+            for name in ("media", "creator", "community")
+        }
+
+        def _score_each() -> None:
+            for cid in sample_ids:
+                calculate_campaign(
+                    entries["investment"][cid],
+                    grouped["media"][cid],
+                    grouped["creator"][cid],
+                    grouped["community"][cid],
+                )
+
+        record("calculate_campaign", _score_each, len(sample_ids))
+        first = sample_ids[0]
+        single = [entries["investment"][first]] + [grouped[name][first] for name in ("media", "creator", "community")]
+        record("calculate_campaign_call", lambda: calculate_campaign(*single), 1)
+        cards = {name: grouped[name][first].to_dict("records") for name in ("media", "creator", "community")}
+        ledger, edits = TevLedger(), itertools.count(1)
+        record("tev_ledger_rerun", lambda: _ledger_rerun(ledger, cards, single[0], next(edits)), 1)
+        record(
+            "calculate_campaigns",
+            lambda: calculate_campaigns(
+                entries["investment"], entries["media"], entries["creator"], entries["community"]
+            ),
+            params["campaigns"],
+        )
+
+        populate_campaigns(entries, owner_id=1)
+        record("fetch_campaigns", lambda: db.fetch_campaigns(owner_id=1), params["campaigns"])
+        record(
+            "library_page",
+            lambda: (
+                db.fetch_campaign_filter_options(owner_id=1),
+                db.fetch_campaign_page(owner_id=1, sort="tev", limit=25),
+            ),
+            1,
+        )
+        record(
+            "campaign_kpis",
+            lambda: [db.fetch_campaign_totals(owner_id=1)]
+            + [db.fetch_campaign_breakdown(group_by, owner_id=1) for group_by in db.CAMPAIGN_BREAKDOWNS],
+            params["campaigns"],
+        )
+
+        def _fetch_entries_each() -> None:
+            for cid in sample_ids:
+                db.fetch_creator_rows(cid)
+                db.fetch_media_rows(cid)
+                db.fetch_community_rows(cid)
+
+        record("fetch_entries_each", _fetch_entries_each, len(sample_ids))
+        record("fetch_entry_rows", lambda: db.fetch_entry_rows(sample_ids), len(sample_ids))
+        record("fetch_campaign_entries", lambda: db.fetch_campaign_entries(sample_ids[0]), 1)
+
+        upload_posts = upload_frame(params["upload_rows"])
+        record("normalize_upload_posts", lambda: normalize_upload_posts(upload_posts), params["upload_rows"])
+        normalized = normalize_upload_posts(upload_posts)
+        record("store_upload_rows", lambda: _store_upload_rows(normalized), params["upload_rows"])
+        stored_id = _store_upload_rows(normalized)
+        record("upload_efficiency", lambda: upload_efficiency(stored_id), params["upload_rows"])
+
+        calls = SESSIONS * CALLS_PER_SESSION * 3
+        sessions = lambda: _concurrent_sessions(sample_ids)
+        record("concurrent_db_calls", sessions, calls)
+        record("concurrent_db_calls_unpooled", _unpooled(sessions), calls)
+
+        save_ids = sample_ids[:SAVES_PER_RUN]
+        prepared = {cid: _save_frames(entries, cid) for cid in save_ids}
+        record(
+            "save_campaign",
+            lambda: [_save_campaign(prepared[cid], entries["investment"][cid]) for cid in save_ids],
+            len(save_ids),
+        )
+        record(
+            "save_campaign_separate",
+            lambda: [_save_campaign_separate(prepared[cid], entries["investment"][cid]) for cid in save_ids],
+            len(save_ids),
+        )
+        bumps = itertools.count(1)
+        record(
+            "resave_campaign",
+            lambda: [_resave_campaign(prepared[cid], cid, next(bumps)) for cid in save_ids],
+            len(save_ids),
+        )
+
+    posts = upload_frame(params["upload_rows"])
+    record("summarize_creator_upload", lambda: summarize_creator_upload(posts), params["upload_rows"])
+    workbook = upload_workbook(params["upload_rows"]).getvalue()
+    record(
+        "parse_creator_upload",
+        lambda: parse_creator_upload(io.BytesIO(workbook)),
+        params["upload_rows"],
+        times=1 if params["upload_rows"] >= 100_000 else repeat,
+    )
+    record(
+        "scan_creator_upload",
+        lambda: scan_creator_upload(io.BytesIO(workbook)),
+        params["upload_rows"],
+        times=1 if params["upload_rows"] >= 100_000 else repeat,
+    )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the Vero Echo performance benchmarks.")
+    parser.add_argument("--scale", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown, 0.25 = 25%%.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results: dict[str, dict[str, float]] = {}
+    for scale in args.scale:
+        print(f"[{scale}] {SCALES[scale]}")
+        results.update(run_scale(scale, args.repeat))
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None or args.update_baseline:
+        write_results(args.baseline, results)
+        print(f"Baseline written to {args.baseline}.")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    if regressions:
+        print("Regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Concurrency stress test for the SQLite layer.
+
+N reader threads (library page reads) and M writer threads (campaign saves)
+hammer one synthetic database for a fixed time under each pragma profile,
+and report throughput, latency and calls that still failed after the busy
+retries:
+
+    python -m benchmarks.stress                                   # wal vs rollback
+    python -m benchmarks.stress --readers 16 --writers 4 --seconds 10 --profile wal
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+import db
+from benchmarks.harness import temporary_database
+from benchmarks.synthetic import generate
+
+SEED_CAMPAIGNS = 2_000
+
+
+def _worker(op: Callable[[np.random.Generator], None],
+            seed: int,
+            stop: threading.Event,
+            latencies: list[float],
+            errors: list[str]) -> None:
+    rng = np.random.default_rng(seed)
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            op(rng)
+        except sqlite3.OperationalError as exc:
+            errors.append(str(exc))
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+def _read(n_users: int, n_campaigns: int) -> Callable[[np.random.Generator], None]:
+    def _op(rng: np.random.Generator) -> None:
+        owner = int(rng.integers(1, n_users + 1))
+        db.fetch_campaign_totals(owner_id=owner)
+        db.fetch_campaign_page(owner_id=owner)
+        cid = int(rng.integers(1, n_campaigns + 1))
+        db.fetch_creator_rows(cid)
+        db.fetch_media_rows(cid)
+
+    return _op
+
+
+def _write(n_users: int) -> Callable[[np.random.Generator], None]:
+    result = {"media": 0.0, "creator": 0.0, "community": 0.0, "tev": 0.0, "roi_m": 0.0, "roi_pct": 0.0}
+
+    def _op(rng: np.random.Generator) -> None:
+        owner = int(rng.integers(1, n_users + 1))
+        cid = db.insert_campaign(result, 100_000.0, "Stress", "Stress Client", "Thailand", owner_id=owner)
+        db.replace_creator_rows(
+            cid,
+            [{"platform": "Instagram", "content_type": "Video Post", "tier": "Micro", "num_posts": 3}] * 6,
+        )
+        db.replace_media_rows(cid, [{"channel_type": "Online Article", "tier_name": "Major", "mentions": 2}] * 6)
+
+    return _op
+
+
+def _summary(latencies: list[float], seconds: float) -> dict[str, float]:
+    values = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": len(latencies) / seconds,
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+    }
+
+
+def run_profile(profile: str, readers: int, writers: int, seconds: float) -> dict[str, Any]:
+    saved = db.PRAGMA_PROFILE
+    db.PRAGMA_PROFILE = profile
+    try:
+        with temporary_database() as path:
+            stats = generate(path, SEED_CAMPAIGNS, seed=0)
+            n_users = stats["counts"]["users"]
+            stop = threading.Event()
+            read_latencies: list[float] = []
+            write_latencies: list[float] = []
+            errors: list[str] = []
+            threads = [
+                threading.Thread(
+                    target=_worker, args=(_read(n_users, SEED_CAMPAIGNS), n, stop, read_latencies, errors)
+                )
+                for n in range(readers)
+            ] + [
+                threading.Thread(
+                    target=_worker, args=(_write(n_users), 1_000 + n, stop, write_latencies, errors)
+                )
+                for n in range(writers)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(seconds)
+            stop.set()
+            for thread in threads:
+                thread.join()
+    finally:
+        db.PRAGMA_PROFILE = saved
+    return {
+        "reads": _summary(read_latencies, seconds),
+        "writes": _summary(write_latencies, seconds),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Stress the SQLite layer with concurrent readers and writers.")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--profile", nargs="+", choices=list(db.PRAGMA_PROFILES), default=["wal", "rollback"])
+    args = parser.parse_args(argv)
+
+    for profile in args.profile:
+        result = run_profile(profile, args.readers, args.writers, args.seconds)
+        print(f"[{profile}] {args.readers} readers, {args.writers} writers, {args.seconds:g}s")
+        for kind in ("reads", "writes"):
+            stats = result[kind]
+            print(f"  {kind:<7} {stats['ops']:>8,} ops  {stats['ops_per_sec']:>9,.1f}/s  "
+                  f"p50 {stats['p50_ms']:>7.2f} ms  p95 {stats['p95_ms']:>8.2f} ms")
+        print(f"  errors  {result['errors']:>8,}" + (f"  ({result['first_error']})" if result["errors"] else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,468 @@
+"""
+Seeded synthetic data for load-testing the SQLite schema.
+
+Fills users, campaigns, campaign_user_access, the three *_echo_entries
+tables and creator_uploads / creator_upload_rows with production-shaped
+distributions: a few busy planners and big clients (Zipf), Thailand-heavy
+markets, Instagram/TikTok-heavy creator mixes and overdispersed counts.
+Campaign echo values are scored with calculate_campaigns, so the stored
+totals agree with the entries.
+
+    python -m benchmarks.synthetic --db /tmp/load.db --campaigns 100000
+    python -m benchmarks.synthetic --db /tmp/load.db --campaigns 1000000 --seed 7
+
+Campaigns are written CHUNK_SIZE at a time, one transaction per chunk.
+The same --seed and sizes always give the same rows. Writing into the
+bundled data/vero-echo-tool.db is refused.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+import db
+from benchmarks.harness import seed_reference_tables, use_database
+from benchmarks.workloads import COMMUNITY_PLATFORMS, CREATOR_KEYS, MEDIA_KEYS
+from logic.calculator import calculate_campaigns, get_rate_lookup
+
+BUNDLED_DB = db.DB_PATH
+CHUNK_SIZE = 10_000
+MARKETS = {
+    "Thailand": 0.45,
+    "Vietnam": 0.18,
+    "Philippines": 0.12,
+    "Malaysia": 0.10,
+    "Singapore": 0.10,
+    "Myanmar": 0.05,
+}
+OBJECTIVES = {
+    "Brand Awareness": 0.35,
+    "Product Launch": 0.20,
+    "Perception Shift": 0.15,
+    "Community Growth": 0.12,
+    "Advocacy & UGC": 0.12,
+    "Other": 0.06,
+}
+PLATFORM_WEIGHTS = {"Instagram": 0.32, "TikTok": 0.30, "Facebook": 0.20, "YouTube": 0.10, "X (Twitter)": 0.08}
+TIER_WEIGHTS = {"Nano": 0.30, "Micro": 0.30, "Mid-tier": 0.20, "Macro": 0.15, "Mega": 0.05}
+CONTENT_WEIGHTS = {"Video Post": 0.6, "Static Post": 0.4}
+# Typical fee (THB) and reach per post by creator tier.
+TIER_FEE = {"Nano": 3_000, "Micro": 12_000, "Mid-tier": 40_000, "Macro": 120_000, "Mega": 400_000}
+TIER_IMPRESSIONS = {"Nano": 5_000, "Micro": 25_000, "Mid-tier": 90_000, "Macro": 300_000, "Mega": 1_500_000}
+TEAMS = ["Planning", "IQ", "Sales", "Strategy", "Creative"]
+CAMPAIGNS_PER_USER = 25
+CAMPAIGNS_PER_CLIENT = 40
+UPLOAD_SHARE = 0.15
+# Simulated "now" so the seed alone fixes every timestamp.
+EPOCH = np.datetime64("2026-01-01T00:00:00")
+HISTORY_DAYS = 3 * 365
+
+
+def _weights(mapping: dict[str, float]) -> tuple[list[str], np.ndarray]:
+    labels = list(mapping)
+    weights = np.array([mapping[label] for label in labels], dtype=float)
+    return labels, weights / weights.sum()
+
+
+def _zipf_weights(n: int, exponent: float = 1.1) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _creator_key_weights() -> np.ndarray:
+    weights = np.array(
+        [PLATFORM_WEIGHTS[p] * CONTENT_WEIGHTS[c] * TIER_WEIGHTS[t] for p, c, t in CREATOR_KEYS]
+    )
+    return weights / weights.sum()
+
+
+def _timestamps(values: np.ndarray, unit: str = "s") -> list[str]:
+    text = np.datetime_as_string(values, unit=unit)
+    return np.char.replace(text, "T", " ").tolist()
+
+
+def _rows(*columns: Iterable[Any]) -> Iterable[tuple]:
+    return zip(*(column.tolist() if isinstance(column, np.ndarray) else column for column in columns))
+
+
+def _next_id(conn: sqlite3.Connection, table: str) -> int:
+    return int(conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]) + 1
+
+
+def _insert_users(conn: sqlite3.Connection,
+                  rng: np.random.Generator,
+                  n_users: int,
+                  clients: list[str]) -> np.ndarray:
+    first_id = _next_id(conn, "users")
+    ids = np.arange(first_id, first_id + n_users)
+    is_client = rng.random(n_users) < 0.1
+    company = np.where(is_client, np.array(clients, dtype=object)[rng.integers(0, len(clients), n_users)], "Vero")
+    created = EPOCH - rng.integers(HISTORY_DAYS, HISTORY_DAYS + 365, n_users).astype("timedelta64[D]")
+    conn.executemany(
+        """
+        INSERT INTO users (id, email, password_hash, name, company, team, role, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        _rows(
+            ids,
+            [f"user{i}@synthetic.vero.test" for i in ids.tolist()],
+            ["!synthetic"] * n_users,
+            [f"Synthetic User {i}" for i in ids.tolist()],
+            company,
+            np.array(TEAMS)[rng.integers(0, len(TEAMS), n_users)],
+            np.where(is_client, "client", "internal"),
+            _timestamps(created),
+        ),
+    )
+    return ids
+
+
+def _campaign_frame(rng: np.random.Generator,
+                    ids: np.ndarray,
+                    users: np.ndarray,
+                    clients: list[str],
+                    client_markets: np.ndarray) -> pd.DataFrame:
+    n = ids.size
+    objectives, objective_weights = _weights(OBJECTIVES)
+    client = rng.choice(len(clients), n, p=_zipf_weights(len(clients)))
+    investment = np.clip(np.round(rng.lognormal(13.2, 0.9, n), -3), 50_000, 30_000_000)
+    created = EPOCH - rng.integers(0, HISTORY_DAYS * 86_400, n).astype("timedelta64[s]")
+    start = created.astype("datetime64[D]") + rng.integers(0, 60, n).astype("timedelta64[D]")
+    end = start + rng.integers(14, 120, n).astype("timedelta64[D]")
+    return pd.DataFrame(
+        {
+            "id": ids,
+            "owner_id": users[rng.choice(users.size, n, p=_zipf_weights(users.size, 0.8))],
+            "campaign_name": [f"Campaign {i}" for i in ids.tolist()],
+            "client": np.array(clients, dtype=object)[client],
+            "market": client_markets[client],
+            "objective_focus": np.array(objectives, dtype=object)[rng.choice(len(objectives), n, p=objective_weights)],
+            "investment": investment,
+            "created_at": _timestamps(created),
+            "campaign_start": _timestamps(start, "D"),
+            "campaign_end": _timestamps(end, "D"),
+            "currency": np.where(rng.random(n) < 0.9, "THB", "USD"),
+        }
+    )
+
+
+def _media_frame(rng: np.random.Generator, ids: np.ndarray) -> pd.DataFrame:
+    keys = np.tile(np.arange(len(MEDIA_KEYS)), ids.size)
+    keep = rng.random(keys.size) < 0.6
+    keys = keys[keep]
+    return pd.DataFrame(
+        {
+            "campaign_id": np.repeat(ids, len(MEDIA_KEYS))[keep],
+            "channel_type": [MEDIA_KEYS[i][0] for i in keys.tolist()],
+            "tier_name": [MEDIA_KEYS[i][1] for i in keys.tolist()],
+            "mentions": rng.negative_binomial(2, 0.3, keys.size).astype(float),
+        }
+    )
+
+
+def _creator_frame(rng: np.random.Generator, ids: np.ndarray) -> pd.DataFrame:
+    per_campaign = 1 + rng.poisson(5, ids.size)
+    keys = rng.choice(len(CREATOR_KEYS), int(per_campaign.sum()), p=_creator_key_weights())
+    frame = pd.DataFrame(
+        {
+            "campaign_id": np.repeat(ids, per_campaign),
+            "platform": [CREATOR_KEYS[i][0] for i in keys.tolist()],
+            "content_type": [CREATOR_KEYS[i][1] for i in keys.tolist()],
+            "tier": [CREATOR_KEYS[i][2] for i in keys.tolist()],
+            "num_posts": (1 + rng.poisson(2.5, keys.size)).astype(float),
+        }
+    )
+    rates = get_rate_lookup().creator_rate(
+        frame["platform"].to_numpy(), frame["content_type"].to_numpy(), frame["tier"].to_numpy()
+    )
+    frame["rate"] = np.nan_to_num(rates, nan=0.0)
+    return frame
+
+
+def _community_frame(rng: np.random.Generator, ids: np.ndarray, investment: np.ndarray) -> pd.DataFrame:
+    keep = rng.random(ids.size * len(COMMUNITY_PLATFORMS)) < 0.7
+    scale = np.repeat(investment / 100_000, len(COMMUNITY_PLATFORMS))[keep]
+    rows = int(keep.sum())
+    passive = np.round(scale * rng.lognormal(7.5, 1.0, rows))
+    return pd.DataFrame(
+        {
+            "campaign_id": np.repeat(ids, len(COMMUNITY_PLATFORMS))[keep],
+            "platform": np.tile(COMMUNITY_PLATFORMS, ids.size)[keep],
+            "content_creation": rng.poisson(np.maximum(scale, 0.5)).astype(float),
+            "passive_engagement": passive,
+            "active_engagement": np.round(passive * rng.uniform(0.02, 0.12, rows)),
+            "amplification": np.round(passive * rng.uniform(0.002, 0.02, rows)),
+        }
+    )
+
+
+def _insert_uploads(conn: sqlite3.Connection,
+                    rng: np.random.Generator,
+                    campaigns: pd.DataFrame,
+                    first_upload_id: int) -> tuple[int, int]:
+    chosen = campaigns[rng.random(len(campaigns)) < UPLOAD_SHARE]
+    n = len(chosen)
+    if not n:
+        return 0, 0
+    upload_ids = np.arange(first_upload_id, first_upload_id + n)
+    sizes = np.clip(rng.lognormal(5.0, 1.0, n).astype(int), 1, 5_000)
+    total = int(sizes.sum())
+
+    keys = rng.choice(len(CREATOR_KEYS), total, p=_creator_key_weights())
+    tiers = [CREATOR_KEYS[i][2] for i in keys.tolist()]
+    impressions = np.round(np.array([TIER_IMPRESSIONS[t] for t in tiers]) * rng.lognormal(0.0, 0.7, total))
+    engagements = np.round(impressions * rng.uniform(0.005, 0.08, total))
+    emv = np.round(engagements * rng.uniform(2, 12, total), 2)
+    fee = np.round(np.array([TIER_FEE[t] for t in tiers]) * rng.lognormal(0.0, 0.4, total), -2)
+    start = pd.to_datetime(chosen["campaign_start"]).to_numpy().astype("datetime64[D]")
+    end = pd.to_datetime(chosen["campaign_end"]).to_numpy().astype("datetime64[D]")
+    span = np.repeat((end - start).astype(int), sizes)
+    post_date = np.repeat(start, sizes) + (rng.random(total) * span).astype("timedelta64[D]")
+    parsed_at = pd.to_datetime(chosen["created_at"]).to_numpy() + rng.integers(60, 3_600, n).astype("timedelta64[s]")
+    totals = np.bincount(np.repeat(np.arange(n), sizes), weights=emv, minlength=n)
+
+    conn.executemany(
+        """
+        INSERT INTO creator_uploads (
+            id, campaign_id, uploaded_by, filename, source, status, sha256,
+            uploaded_at, parsed_at, total_posts, total_value
+        ) VALUES (?, ?, ?, ?, 'creatoriq', 'parsed', ?, ?, ?, ?, ?)
+        """,
+        _rows(
+            upload_ids,
+            chosen["id"].to_numpy(),
+            chosen["owner_id"].to_numpy(),
+            [f"creatoriq_export_{cid}.xlsx" for cid in chosen["id"].tolist()],
+            [rng.bytes(32).hex() for _ in range(n)],
+            chosen["created_at"].to_numpy(),
+            _timestamps(parsed_at),
+            sizes,
+            np.round(totals, 2),
+        ),
+    )
+    conn.executemany(
+        """
+        INSERT INTO creator_upload_rows (
+            upload_id, platform, content_type, tier, post_date,
+            impressions, engagements, emv, fee, currency
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        _rows(
+            np.repeat(upload_ids, sizes),
+            [CREATOR_KEYS[i][0] for i in keys.tolist()],
+            [CREATOR_KEYS[i][1] for i in keys.tolist()],
+            tiers,
+            _timestamps(post_date, "D"),
+            impressions,
+            engagements,
+            emv,
+            fee,
+            np.repeat(chosen["currency"].to_numpy(), sizes),
+        ),
+    )
+    return n, total
+
+
+def _access_rows(rng: np.random.Generator, campaigns: pd.DataFrame, users: np.ndarray) -> pd.DataFrame:
+    owners = pd.DataFrame(
+        {"campaign_id": campaigns["id"].to_numpy(), "user_id": campaigns["owner_id"].to_numpy(), "access_level": "owner"}
+    )
+    shares_per = rng.poisson(0.6, len(campaigns))
+    total = int(shares_per.sum())
+    shared = pd.DataFrame(
+        {
+            "campaign_id": np.repeat(campaigns["id"].to_numpy(), shares_per),
+            "user_id": users[rng.integers(0, users.size, total)],
+            "access_level": np.where(rng.random(total) < 0.3, "edit", "view"),
+        }
+    )
+    # The owner row wins over any share that drew the owner again.
+    return pd.concat([owners, shared]).drop_duplicates(["campaign_id", "user_id"], keep="first")
+
+
+def generate(path: Path,
+             n_campaigns: int,
+             seed: int = 0,
+             n_users: int | None = None,
+             n_clients: int | None = None,
+             progress: Any = None) -> dict[str, Any]:
+    """
+    Append `n_campaigns` synthetic campaigns (and their users, entries,
+    access rows and uploads) to the SQLite file at `path`, creating it and
+    copying the bundled rate card into it when needed. Returns row counts
+    per table and the elapsed seconds.
+    """
+    path = Path(path).resolve()
+    if path == BUNDLED_DB.resolve():
+        raise ValueError("Refusing to generate synthetic data into the bundled database.")
+    rng = np.random.default_rng(seed)
+    n_users = n_users or max(n_campaigns // CAMPAIGNS_PER_USER, 5)
+    n_clients = n_clients or max(n_campaigns // CAMPAIGNS_PER_CLIENT, 10)
+    markets, market_weights = _weights(MARKETS)
+    clients = [f"Client {i:05d}" for i in range(1, n_clients + 1)]
+    client_markets = np.array(markets, dtype=object)[rng.choice(len(markets), n_clients, p=market_weights)]
+    counts = dict.fromkeys(
+        [
+            "users",
+            "campaigns",
+            "campaign_user_access",
+            "media_echo_entries",
+            "creator_echo_entries",
+            "community_echo_entries",
+            "creator_uploads",
+            "creator_upload_rows",
+        ],
+        0,
+    )
+    started = time.perf_counter()
+
+    with use_database(path):
+        conn = db.get_conn()
+        try:
+            if not conn.execute("SELECT 1 FROM creator_rate_reference LIMIT 1").fetchone():
+                seed_reference_tables()
+            rate_card_version = db.fetch_rate_card_version()
+            # Bulk-load settings: this is a scratch file, durability does not matter.
+            conn.execute("PRAGMA foreign_keys = OFF;")
+            conn.execute("PRAGMA synchronous = OFF;")
+            conn.execute("PRAGMA journal_mode = MEMORY;")
+
+            with conn:
+                users = _insert_users(conn, rng, n_users, clients)
+            counts["users"] = n_users
+            first_campaign = _next_id(conn, "campaigns")
+            next_upload = _next_id(conn, "creator_uploads")
+
+            for offset in range(0, n_campaigns, CHUNK_SIZE):
+                ids = np.arange(first_campaign + offset, first_campaign + min(offset + CHUNK_SIZE, n_campaigns))
+                campaigns = _campaign_frame(rng, ids, users, clients, client_markets)
+                media = _media_frame(rng, ids)
+                creator = _creator_frame(rng, ids)
+                community = _community_frame(rng, ids, campaigns["investment"].to_numpy())
+                investment = pd.Series(campaigns["investment"].to_numpy(), index=ids)
+                scored = calculate_campaigns(investment, media, creator, community).set_index("campaign_id")
+                scored = scored.reindex(ids, fill_value=0.0)
+                access = _access_rows(rng, campaigns, users)
+
+                with conn:
+                    conn.executemany(
+                        """
+                        INSERT INTO campaigns (
+                            id, owner_id, campaign_name, client, market, objective_focus,
+                            investment, media_echo, creator_echo, community_echo, tev,
+                            roi_m, roi_pct, source, created_at, campaign_start,
+                            campaign_end, currency, investment_k, custom_budget_flag,
+                            rate_card_version
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'manual', ?, ?, ?, ?, ?, 0, ?)
+                        """,
+                        _rows(
+                            ids,
+                            campaigns["owner_id"].to_numpy(),
+                            campaigns["campaign_name"],
+                            campaigns["client"],
+                            campaigns["market"],
+                            campaigns["objective_focus"],
+                            campaigns["investment"].to_numpy(),
+                            scored["media"].to_numpy(),
+                            scored["creator"].to_numpy(),
+                            scored["community"].to_numpy(),
+                            scored["tev"].to_numpy(),
+                            scored["roi_m"].to_numpy(),
+                            scored["roi_pct"].to_numpy(),
+                            campaigns["created_at"],
+                            campaigns["campaign_start"],
+                            campaigns["campaign_end"],
+                            campaigns["currency"].to_numpy(),
+                            campaigns["investment"].to_numpy() / 1000,
+                            [rate_card_version] * ids.size,
+                        ),
+                    )
+                    conn.executemany(
+                        "INSERT INTO campaign_user_access (campaign_id, user_id, access_level) VALUES (?, ?, ?)",
+                        access.itertuples(index=False, name=None),
+                    )
+                    conn.executemany(
+                        """
+                        INSERT INTO media_echo_entries (campaign_id, channel_type, tier_name, mentions)
+                        VALUES (?, ?, ?, ?)
+                        """,
+                        media.itertuples(index=False, name=None),
+                    )
+                    conn.executemany(
+                        """
+                        INSERT INTO creator_echo_entries (campaign_id, platform, content_type, tier, num_posts, rate)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        creator.itertuples(index=False, name=None),
+                    )
+                    conn.executemany(
+                        """
+                        INSERT INTO community_echo_entries (
+                            campaign_id, platform, content_creation, passive_engagement,
+                            active_engagement, amplification
+                        ) VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        community.itertuples(index=False, name=None),
+                    )
+                    uploads, upload_rows = _insert_uploads(conn, rng, campaigns, next_upload)
+                next_upload += uploads
+
+                counts["campaigns"] += ids.size
+                counts["campaign_user_access"] += len(access)
+                counts["media_echo_entries"] += len(media)
+                counts["creator_echo_entries"] += len(creator)
+                counts["community_echo_entries"] += len(community)
+                counts["creator_uploads"] += uploads
+                counts["creator_upload_rows"] += upload_rows
+                if progress is not None:
+                    progress(counts["campaigns"], n_campaigns)
+        finally:
+            # Drop the connection with the bulk-load pragmas rather than pool it.
+            db.close_connections()
+
+    seconds = time.perf_counter() - started
+    rows = sum(counts.values())
+    return {
+        "path": str(path),
+        "seed": seed,
+        "counts": counts,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds else 0.0,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Fill a SQLite file with seeded synthetic campaigns.")
+    parser.add_argument("--db", type=Path, required=True, help="Target SQLite file (created if missing).")
+    parser.add_argument("--campaigns", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=None, help=f"Default: campaigns / {CAMPAIGNS_PER_USER}.")
+    parser.add_argument("--clients", type=int, default=None, help=f"Default: campaigns / {CAMPAIGNS_PER_CLIENT}.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    def _progress(done: int, total: int) -> None:
+        print(f"  {done:,}/{total:,} campaigns", end="\r", flush=True)
+
+    try:
+        stats = generate(args.db, args.campaigns, args.seed, args.users, args.clients, progress=_progress)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print()
+    for table, count in stats["counts"].items():
+        print(f"  {table:<24} {count:>12,}")
+    print(f"{stats['rows']:,} rows in {stats['seconds']:.1f}s ({stats['rows_per_sec']:,.0f} rows/s) -> {stats['path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Synthetic, seeded workloads for the benchmark suite.
+"""
+
+from __future__ import annotations
+
+import io
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+import db
+
+MEDIA_KEYS = [
+    ("Online Article", "Major"),
+    ("Online Article", "Industry"),
+    ("Online Article", "Local/Niche"),
+    ("Social Media", "Tier 1"),
+    ("Social Media", "Tier 2"),
+    ("Social Media", "Tier 3"),
+]
+CREATOR_KEYS = [
+    (platform, content_type, tier)
+    for platform in ["Facebook", "Instagram", "TikTok", "YouTube", "X (Twitter)"]
+    for content_type in ["Static Post", "Video Post"]
+    for tier in ["Mega", "Macro", "Mid-tier", "Micro", "Nano"]
+    if not (platform in {"TikTok", "YouTube"} and content_type == "Static Post")
+]
+COMMUNITY_PLATFORMS = ["Facebook", "Instagram", "TikTok", "YouTube", "X (Twitter)", "Other"]
+CREATOR_ROWS_PER_CAMPAIGN = 8
+UPLOAD_COLUMNS = [
+    "Date",
+    "Profile",
+    "Network",
+    "Creator Tier",
+    "Content Type",
+    "Impressions",
+    "Engagement",
+    "EMV",
+    "Fee",
+    "Currency",
+    "Message",
+]
+
+
+def campaign_entries(n_campaigns: int, seed: int = 0) -> dict[str, pd.DataFrame | pd.Series]:
+    """
+    Long-format entries for campaign ids 1..n_campaigns, the shape
+    calculate_campaigns() and the *_echo_entries tables use.
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n_campaigns + 1)
+
+    media_keys = np.tile(np.arange(len(MEDIA_KEYS)), n_campaigns)
+    media = pd.DataFrame(
+        {
+            "campaign_id": np.repeat(ids, len(MEDIA_KEYS)),
+            "channel_type": [MEDIA_KEYS[i][0] for i in media_keys],
+            "tier_name": [MEDIA_KEYS[i][1] for i in media_keys],
+            "mentions": rng.poisson(3, media_keys.size).astype(float),
+        }
+    )
+
+    creator_keys = rng.integers(0, len(CREATOR_KEYS), n_campaigns * CREATOR_ROWS_PER_CAMPAIGN)
+    creator = pd.DataFrame(
+        {
+            "campaign_id": np.repeat(ids, CREATOR_ROWS_PER_CAMPAIGN),
+            "platform": [CREATOR_KEYS[i][0] for i in creator_keys],
+            "content_type": [CREATOR_KEYS[i][1] for i in creator_keys],
+            "tier": [CREATOR_KEYS[i][2] for i in creator_keys],
+            "num_posts": rng.poisson(2, creator_keys.size).astype(float),
+        }
+    )
+
+    rows = n_campaigns * len(COMMUNITY_PLATFORMS)
+    community = pd.DataFrame(
+        {
+            "campaign_id": np.repeat(ids, len(COMMUNITY_PLATFORMS)),
+            "platform": np.tile(COMMUNITY_PLATFORMS, n_campaigns),
+            "content_creation": rng.poisson(5, rows).astype(float),
+            "passive_engagement": rng.poisson(5_000, rows).astype(float),
+            "active_engagement": rng.poisson(400, rows).astype(float),
+            "amplification": rng.poisson(60, rows).astype(float),
+        }
+    )
+
+    investment = pd.Series(rng.integers(100, 3_000, n_campaigns) * 1000.0, index=ids)
+    return {"investment": investment, "media": media, "creator": creator, "community": community}
+
+
+def populate_campaigns(entries: dict[str, pd.DataFrame | pd.Series], owner_id: int = 1) -> None:
+    """
+    Bulk-load `entries` into the current database under one owner.
+    """
+    investment = entries["investment"]
+    with db.get_conn() as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO users (id, email, password_hash, name) VALUES (?, ?, 'x', 'Bench')",
+            (owner_id, f"bench{owner_id}@example.com"),
+        )
+        conn.executemany(
+            """
+            INSERT INTO campaigns (
+                id, owner_id, campaign_name, client, market, investment,
+                media_echo, creator_echo, community_echo, tev, roi_m, roi_pct
+            ) VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0, 0, 0, 0)
+            """,
+            (
+                (int(cid), owner_id, f"Campaign {cid}", f"Client {cid % 50}", "Thailand", float(inv))
+                for cid, inv in investment.items()
+            ),
+        )
+        conn.executemany(
+            """
+            INSERT INTO media_echo_entries (campaign_id, channel_type, tier_name, mentions)
+            VALUES (?, ?, ?, ?)
+            """,
+            entries["media"].itertuples(index=False, name=None),
+        )
+        conn.executemany(
+            """
+            INSERT INTO creator_echo_entries (campaign_id, platform, content_type, tier, num_posts)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            entries["creator"].itertuples(index=False, name=None),
+        )
+        conn.executemany(
+            """
+            INSERT INTO community_echo_entries (
+                campaign_id, platform, content_creation, passive_engagement,
+                active_engagement, amplification
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            entries["community"].itertuples(index=False, name=None),
+        )
+
+
+def upload_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    The posts of a Fanpage Karma style export, as pd.read_excel returns them
+    below the banner rows.
+    """
+    rng = np.random.default_rng(seed)
+    networks = np.array(["FACEBOOK", "INSTAGRAM", "TIKTOK", "YOUTUBE", "X", "LEMON8"])
+    tiers = np.array(["Mega", "Macro", "Mid-tier", "MICRO", "Nano", "mid tier"])
+    contents = np.array(["Video", "Photo", "Reel", "Story", "Album", "Link"])
+    n_profiles = max(n_rows // 20, 1)
+
+    impressions = rng.integers(1_000, 500_000, n_rows)
+    engagement = (impressions * rng.uniform(0.005, 0.08, n_rows)).astype(int)
+    days = rng.integers(0, 365, n_rows)
+    return pd.DataFrame(
+        {
+            "Date": [f"2025-{1 + day // 31:02d}-{1 + day % 28:02d}" for day in days.tolist()],
+            "Profile": np.char.add("creator_", rng.integers(0, n_profiles, n_rows).astype(str)),
+            "Network": networks[rng.integers(0, len(networks), n_rows)],
+            "Creator Tier": tiers[rng.integers(0, len(tiers), n_rows)],
+            "Content Type": contents[rng.integers(0, len(contents), n_rows)],
+            "Impressions": impressions,
+            "Engagement": engagement,
+            "EMV": np.round(engagement * rng.uniform(2, 12, n_rows), 2),
+            "Fee": rng.integers(1, 200, n_rows) * 1000,
+            "Currency": "THB",
+            "Message": "post caption",
+        },
+        columns=UPLOAD_COLUMNS,
+    )
+
+
+def upload_workbook(n_rows: int, seed: int = 0) -> io.BytesIO:
+    """
+    A Fanpage Karma style export: four banner rows, a header row, then posts.
+    """
+    posts = upload_frame(n_rows, seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Posts")
+    sheet.append(["Fanpage Karma export"])
+    sheet.append(["Top posts"])
+    sheet.append([])
+    sheet.append([])
+    sheet.append(UPLOAD_COLUMNS)
+    for row in zip(*(posts[column].tolist() for column in UPLOAD_COLUMNS)):
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
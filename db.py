@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import functools
+import json
+import os
 import sqlite3
+import threading
+import weakref
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TypeVar
 
 import pandas as pd
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
 
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
@@ -12,39 +19,379 @@ DB_PATH = DATA_DIR / "vero-echo-tool.db"
 
 __all__ = [
     "get_conn",
+    "close_connections",
     "insert_campaign",
     "fetch_campaigns",
+    "fetch_campaign_page",
+    "fetch_campaign_totals",
+    "fetch_campaign_breakdown",
+    "rebuild_campaign_rollups",
+    "schema_version",
+    "migrate_schema",
+    "fetch_campaign_filter_options",
     "fetch_creator_rows",
     "replace_creator_rows",
     "fetch_media_rows",
     "replace_media_rows",
     "fetch_community_rows",
     "replace_community_rows",
+    "fetch_entry_rows",
+    "fetch_campaign_entries",
     "update_campaign",
+    "save_campaign_bundle",
     "insert_creator_rows",
     "create_user",
     "get_user_by_email",
     "update_last_login",
+    "fetch_rate_card_version",
+    "find_creator_upload",
+    "start_creator_upload",
+    "finish_creator_upload",
+    "fail_creator_upload",
+    "insert_creator_upload_rows",
+    "creator_upload_totals",
 ]
 
-_TABLES_INITIALIZED = False
+RATE_REFERENCE_TABLES = (
+    "media_rate_reference",
+    "creator_rate_reference",
+    "community_rate_reference",
+)
 
+# Reuse connections across calls (False opens one per call, the old behaviour).
+CONNECTION_POOL = True
+# Idle connections kept for threads that have finished, e.g. past Streamlit reruns.
+POOL_MAX_IDLE = 8
 
-def get_conn() -> sqlite3.Connection:
+# Per-connection PRAGMAs. "wal" lets readers proceed while one session writes;
+# "rollback" is SQLite's stock journal. PRAGMA_PROFILE may also be a dict.
+PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+    "rollback": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+}
+PRAGMA_PROFILE: str | Dict[str, Any] = os.environ.get("VERO_DB_PRAGMAS", "wal")
+_PRAGMA_NAMES = {"journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size", "temp_store"}
+# Attempts for a call that keeps failing with "database is locked" after busy_timeout.
+BUSY_RETRY_ATTEMPTS = 5
+
+# Set once this process has seen the database at SCHEMA_VERSION.
+_SCHEMA_CURRENT = False
+
+T = TypeVar("T")
+
+
+def _pragma_settings() -> Dict[str, Any]:
+    if isinstance(PRAGMA_PROFILE, dict):
+        settings = PRAGMA_PROFILE
+    elif PRAGMA_PROFILE in PRAGMA_PROFILES:
+        settings = PRAGMA_PROFILES[PRAGMA_PROFILE]
+    else:
+        raise ValueError(f"Unknown pragma profile {PRAGMA_PROFILE!r}; expected one of {sorted(PRAGMA_PROFILES)}.")
+    unknown = set(settings) - _PRAGMA_NAMES
+    if unknown:
+        raise ValueError(f"Unsupported pragmas: {sorted(unknown)}.")
+    return settings
+
+
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    for name, value in _pragma_settings().items():
+        if not isinstance(value, int) and not str(value).isalnum():
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value!r}")
+        conn.execute(f"PRAGMA {name} = {value};")
+
+
+def _is_busy(exc: BaseException) -> bool:
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+def _retry_on_busy(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Retry a db function with jittered exponential backoff while it fails with
+    "database is locked". Each function runs in one `with get_conn()`
+    transaction, which has been rolled back by the time the error surfaces,
+    so the whole call is re-run. Iterator arguments (row generators) are
+    materialised first so a retry sees the same rows.
+    """
+    retrying = retry(
+        retry=retry_if_exception(_is_busy),
+        wait=wait_random_exponential(multiplier=0.05, max=2),
+        stop=stop_after_attempt(BUSY_RETRY_ATTEMPTS),
+        reraise=True,
+    )(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        args = tuple(list(arg) if isinstance(arg, Iterator) else arg for arg in args)
+        kwargs = {key: list(value) if isinstance(value, Iterator) else value for key, value in kwargs.items()}
+        return retrying(*args, **kwargs)
+
+    return wrapper
+
+
+class _Connection(sqlite3.Connection):
+    """
+    A connection whose `with` blocks nest. Only the outermost block commits
+    (or rolls back on error). An inner block entered mid-transaction runs in
+    a SAVEPOINT, so its error undoes just its own writes; one entered with
+    nothing pending rolls back on error, which also undoes only its own.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # One entry per open inner block: its savepoint name, or None.
+        self.savepoints: list[Optional[str]] = []
+        self.depth = 0
+
+    def __enter__(self) -> "_Connection":
+        if self.depth:
+            savepoint = f"nested_{self.depth}" if self.in_transaction else None
+            if savepoint:
+                self.execute(f"SAVEPOINT {savepoint}")
+            self.savepoints.append(savepoint)
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> Any:
+        self.depth -= 1
+        if not self.depth:
+            return super().__exit__(exc_type, exc, tb)
+        savepoint = self.savepoints.pop()
+        if exc_type is None:
+            if savepoint:
+                self.execute(f"RELEASE {savepoint}")
+        elif savepoint:
+            self.execute(f"ROLLBACK TO {savepoint}")
+            self.execute(f"RELEASE {savepoint}")
+        elif self.in_transaction:
+            self.rollback()
+        return False
+
+    def reset(self) -> None:
+        """
+        Forget open blocks, e.g. of a thread that died inside one.
+        """
+        self.savepoints.clear()
+        self.depth = 0
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    """
+    Open a connection and apply the per-connection settings once.
+    """
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(path, check_same_thread=False, factory=_Connection)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
-    _ensure_tables(conn)
+    _apply_pragmas(conn)
+    _ensure_schema(conn)
     return conn
 
 
-def _ensure_tables(conn: sqlite3.Connection) -> None:
-    global _TABLES_INITIALIZED
-    if _TABLES_INITIALIZED:
-        return
-    conn.executescript(
+def _is_open(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.total_changes
+    except sqlite3.ProgrammingError:
+        return False
+    return True
+
+
+class _Lease:
+    """
+    A thread's hold on one pooled connection. When the thread ends, its
+    thread-local lease is dropped and the finalizer hands the connection back.
+    """
+
+    def __init__(self, pool: "_ConnectionPool", path: Path, conn: sqlite3.Connection) -> None:
+        self.path = path
+        self.conn = conn
+        self._finalizer = weakref.finalize(self, pool.release, path, conn)
+
+    def release(self) -> None:
+        self._finalizer()
+
+
+class _ConnectionPool:
+    """
+    Thread-affine SQLite connections.
+
+    Each thread keeps using the same connection until it exits, then the
+    connection goes back to a bounded idle list for the next thread, so a
+    Streamlit rerun (a new script thread) does not reconnect. A connection is
+    only ever used by one thread at a time.
+    """
+
+    def __init__(self) -> None:
+        self._idle: dict[Path, list[sqlite3.Connection]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def acquire(self, path: Path) -> sqlite3.Connection:
+        lease = getattr(self._local, "lease", None)
+        if lease is not None:
+            if lease.path == path and _is_open(lease.conn):
+                return lease.conn
+            lease.release()
+        conn = None
+        with self._lock:
+            idle = self._idle.get(path, [])
+            while idle and conn is None:
+                candidate = idle.pop()
+                conn = candidate if _is_open(candidate) else None
+        if conn is None:
+            conn = _connect(path)
+        self._local.lease = _Lease(self, path, conn)
+        return conn
+
+    def release(self, path: Path, conn: sqlite3.Connection) -> None:
+        if not _is_open(conn):
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        conn.reset()
+        with self._lock:
+            idle = self._idle.setdefault(path, [])
+            if len(idle) < POOL_MAX_IDLE:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self) -> None:
+        lease = getattr(self._local, "lease", None)
+        self._local.lease = None
+        if lease is not None:
+            lease.release()
+        with self._lock:
+            idle = [conn for conns in self._idle.values() for conn in conns]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+
+_POOL = _ConnectionPool()
+
+
+def get_conn() -> sqlite3.Connection:
+    """
+    The calling thread's connection to DB_PATH.
+
+    Use it as `with get_conn() as conn:` (commit on success, rollback on
+    error) and do not close it. Nested blocks in one thread share the
+    connection; only the outermost one commits (see _Connection).
+    """
+    if not CONNECTION_POOL:
+        return _connect(DB_PATH)
+    return _POOL.acquire(DB_PATH)
+
+
+def close_connections() -> None:
+    """
+    Close the calling thread's connection and every idle pooled connection,
+    e.g. before replacing or deleting the database file.
+    """
+    _POOL.close_all()
+
+
+def _execute_script(conn: sqlite3.Connection, script: str) -> None:
+    """
+    Run a multi-statement script inside the caller's transaction;
+    executescript would COMMIT first.
+    """
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ""
+    if statement.strip():
+        raise ValueError(f"Incomplete SQL statement: {statement.strip()[:80]!r}")
+
+
+def _create_base_tables(conn: sqlite3.Connection) -> None:
+    _execute_script(
+        conn,
         """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            name TEXT,
+            company TEXT,
+            team TEXT,
+            role TEXT CHECK(role IN ('internal', 'client')) DEFAULT 'internal',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            last_login TEXT
+        );
+        CREATE TABLE IF NOT EXISTS campaigns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            owner_id INTEGER REFERENCES users(id),
+            campaign_name TEXT NOT NULL,
+            client TEXT NOT NULL,
+            market TEXT,
+            objective TEXT,
+            investment REAL NOT NULL,
+            media_echo REAL NOT NULL,
+            creator_echo REAL NOT NULL,
+            community_echo REAL NOT NULL,
+            tev REAL NOT NULL,
+            roi_m REAL NOT NULL,
+            roi_pct REAL NOT NULL,
+            source TEXT DEFAULT 'manual',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            objective_focus TEXT,
+            campaign_start TEXT,
+            campaign_end TEXT,
+            currency TEXT DEFAULT 'THB',
+            investment_k REAL,
+            custom_budget_flag INTEGER DEFAULT 0,
+            created_ts INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS campaign_user_access (
+            campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            access_level TEXT CHECK(access_level IN ('owner','edit','view')) NOT NULL,
+            PRIMARY KEY (campaign_id, user_id)
+        );
+        CREATE TABLE IF NOT EXISTS creator_uploads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+            uploaded_by INTEGER NOT NULL REFERENCES users(id),
+            filename TEXT NOT NULL,
+            source TEXT DEFAULT 'creatoriq',
+            status TEXT CHECK(status IN ('uploaded','parsed','error')) DEFAULT 'uploaded',
+            sha256 TEXT,
+            uploaded_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            parsed_at TEXT,
+            total_posts INTEGER,
+            total_value REAL
+        );
+        CREATE TABLE IF NOT EXISTS creator_upload_rows (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            upload_id INTEGER NOT NULL REFERENCES creator_uploads(id) ON DELETE CASCADE,
+            platform TEXT,
+            content_type TEXT,
+            tier TEXT,
+            post_date TEXT,
+            impressions REAL,
+            engagements REAL,
+            emv REAL,
+            fee REAL,
+            currency TEXT,
+            raw_json TEXT
+        );
         CREATE TABLE IF NOT EXISTS creator_echo_entries (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             campaign_id INTEGER NOT NULL,
@@ -76,12 +423,275 @@ def _ensure_tables(conn: sqlite3.Connection) -> None:
             source_campaign_id INTEGER,
             FOREIGN KEY (campaign_id) REFERENCES campaigns(id) ON DELETE CASCADE
         );
+        CREATE TABLE IF NOT EXISTS media_rate_reference (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT NOT NULL,
+            type TEXT NOT NULL,
+            tier_value REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS creator_rate_reference (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            platform TEXT NOT NULL,
+            content_type TEXT NOT NULL,
+            tier TEXT NOT NULL,
+            rate REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS community_rate_reference (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            platform TEXT NOT NULL,
+            weight_content REAL NOT NULL,
+            weight_passive REAL NOT NULL,
+            weight_active REAL NOT NULL,
+            weight_amplification REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS rate_card_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT OR IGNORE INTO rate_card_version (id, version) VALUES (1, 1);
+        CREATE TABLE IF NOT EXISTS rescore_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rate_card_version INTEGER NOT NULL,
+            last_campaign_id INTEGER NOT NULL DEFAULT 0,
+            campaigns_processed INTEGER NOT NULL DEFAULT 0,
+            started_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            finished_at TEXT
+        );
         """
     )
+    _ensure_rate_card_triggers(conn)
+    _ensure_column(conn, "campaigns", "rate_card_version", "INTEGER")
     _ensure_column(conn, "media_echo_entries", "source_campaign_id", "INTEGER")
     _ensure_column(conn, "community_echo_entries", "source_campaign_id", "INTEGER")
     _ensure_column(conn, "creator_echo_entries", "source_campaign_id", "INTEGER")
-    _TABLES_INITIALIZED = True
+    _ensure_column(conn, "campaigns", "created_ts", "INTEGER")
+
+
+def _ensure_rate_card_triggers(conn: sqlite3.Connection) -> None:
+    """
+    Bump rate_card_version on every write to a rate reference table, so
+    cached rate lookups can tell when they are stale.
+    """
+    statements = []
+    for table in RATE_REFERENCE_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            statements.append(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE rate_card_version
+                    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = 1;
+                END;
+                """
+            )
+    _execute_script(conn, "".join(statements))
+
+
+# Indexes of the base schema (migration 1), behind every lookup in this
+# module at the time; check_query_plans in benchmarks/query_plans.py fails
+# when a query stops using an index. Frozen: later migrations create and
+# drop indexes with their own statements.
+_BASE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_campaigns_created ON campaigns (created_ts);
+CREATE INDEX IF NOT EXISTS idx_campaigns_owner_created ON campaigns (owner_id, created_ts);
+CREATE INDEX IF NOT EXISTS idx_campaigns_owner_client_created ON campaigns (owner_id, client, created_ts);
+CREATE INDEX IF NOT EXISTS idx_campaigns_owner_market_created ON campaigns (owner_id, market, created_ts);
+CREATE INDEX IF NOT EXISTS idx_campaigns_owner_name ON campaigns (owner_id, campaign_name);
+CREATE INDEX IF NOT EXISTS idx_campaigns_owner_tev ON campaigns (owner_id, tev);
+CREATE INDEX IF NOT EXISTS idx_campaigns_owner_roi ON campaigns (owner_id, roi_pct);
+CREATE INDEX IF NOT EXISTS idx_campaigns_client_created ON campaigns (client, created_ts);
+CREATE INDEX IF NOT EXISTS idx_campaigns_market_created ON campaigns (market, created_ts);
+CREATE INDEX IF NOT EXISTS idx_campaigns_name_created ON campaigns (campaign_name, created_ts);
+CREATE INDEX IF NOT EXISTS idx_campaign_user_access_user ON campaign_user_access (user_id);
+CREATE INDEX IF NOT EXISTS idx_creator_uploads_campaign ON creator_uploads (campaign_id);
+CREATE INDEX IF NOT EXISTS idx_creator_uploads_uploaded_by ON creator_uploads (uploaded_by);
+CREATE INDEX IF NOT EXISTS idx_creator_upload_rows_upload ON creator_upload_rows (upload_id);
+CREATE INDEX IF NOT EXISTS idx_creator_echo_entries_campaign ON creator_echo_entries (campaign_id);
+CREATE INDEX IF NOT EXISTS idx_media_echo_entries_campaign ON media_echo_entries (campaign_id);
+CREATE INDEX IF NOT EXISTS idx_community_echo_entries_campaign ON community_echo_entries (campaign_id);
+"""
+_CREATED_TS = "COALESCE(CAST(strftime('%s', NEW.created_at) AS INTEGER), 0)"
+
+
+def _ensure_created_ts(conn: sqlite3.Connection) -> None:
+    """
+    campaigns.created_ts is created_at as Unix seconds, so the library can
+    order by an indexed integer instead of datetime(created_at). Triggers keep
+    it in step with created_at; rows from before the column are backfilled.
+    A missing or unparsable created_at gives 0, so the column is never NULL.
+    """
+    _execute_script(
+        conn,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_campaigns_created_ts_insert
+        AFTER INSERT ON campaigns
+        WHEN NEW.created_ts IS NULL
+        BEGIN
+            UPDATE campaigns SET created_ts = {_CREATED_TS} WHERE id = NEW.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_campaigns_created_ts_update
+        AFTER UPDATE OF created_at ON campaigns
+        BEGIN
+            UPDATE campaigns SET created_ts = {_CREATED_TS} WHERE id = NEW.id;
+        END;
+        """
+    )
+    conn.execute(
+        """
+        UPDATE campaigns
+        SET created_ts = COALESCE(CAST(strftime('%s', created_at) AS INTEGER), 0)
+        WHERE created_ts IS NULL
+        """
+    )
+
+
+# campaign_rollups holds CAMPAIGN_KPIS inputs per owner at every combination
+# of client / market / month. `grain` is the bitmask of ROLLUP_GRAINS a row is
+# keyed on; the other key columns are ''. Grain 0 is the owner total, grain 3
+# one client in one market, grain 4 one month across clients and markets.
+ROLLUP_GRAINS = {"client": 1, "market": 2, "month": 4}
+ROLLUP_VALUES = ("investment", "media_echo", "creator_echo", "community_echo", "tev")
+# Month of created_at; an unparsable one counts as 1970-01, as created_ts = 0.
+_ROLLUP_KEYS = {
+    "client": "COALESCE({row}client, '')",
+    "market": "COALESCE({row}market, '')",
+    "month": "COALESCE(strftime('%Y-%m', {row}created_at), '1970-01')",
+}
+_ROLLUP_GRAIN_IDS = range(2 ** len(ROLLUP_GRAINS))
+_ROLLUP_GRAIN_SOURCE = "(" + " UNION ALL ".join(f"SELECT {grain} AS grain" for grain in _ROLLUP_GRAIN_IDS) + ") AS g"
+
+
+def _rollup_keys(row: str) -> list[str]:
+    """
+    grain / client / market / month of each rollup row a campaign counts in,
+    selected from _ROLLUP_GRAIN_SOURCE; `row` is "NEW.", "OLD." or "".
+    """
+    return ["g.grain AS grain"] + [
+        f"CASE WHEN g.grain & {bit} THEN {_ROLLUP_KEYS[key].format(row=row)} ELSE '' END AS {key}"
+        for key, bit in ROLLUP_GRAINS.items()
+    ]
+
+
+def _rollup_trigger_upsert(row: str, sign: str) -> str:
+    values = ["1"] + [f"{row}{column}" for column in ROLLUP_VALUES + ("roi_pct",)]
+    # WHERE true: an upsert's SELECT needs a WHERE before ON CONFLICT to parse.
+    return f"""
+            INSERT INTO campaign_rollups (
+                owner_id, grain, client, market, month,
+                campaigns, {", ".join(ROLLUP_VALUES)}, roi_pct_sum
+            )
+            SELECT COALESCE({row}owner_id, 0), {", ".join(_rollup_keys(row))},
+                   {", ".join(sign + value for value in values)}
+            FROM {_ROLLUP_GRAIN_SOURCE}
+            WHERE true
+            ON CONFLICT (owner_id, grain, client, market, month) DO UPDATE SET
+                campaigns = campaigns + excluded.campaigns,
+                {", ".join(f"{column} = {column} + excluded.{column}" for column in ROLLUP_VALUES)},
+                roi_pct_sum = roi_pct_sum + excluded.roi_pct_sum;"""
+
+
+def _rollup_row(row: str, grain: int) -> str:
+    """
+    WHERE terms matching the one rollup row of `grain` that `row` counts in.
+    """
+    keys = " AND ".join(
+        f"{key} = {_ROLLUP_KEYS[key].format(row=row) if grain & bit else repr('')}"
+        for key, bit in ROLLUP_GRAINS.items()
+    )
+    return f"owner_id = COALESCE({row}owner_id, 0) AND grain = {grain} AND {keys}"
+
+
+def _rollup_trigger_prune(row: str) -> str:
+    """
+    Drop the now-empty rollup rows `row` counted in, one primary-key
+    lookup per grain.
+    """
+    return "".join(
+        f"""
+            DELETE FROM campaign_rollups WHERE {_rollup_row(row, grain)} AND campaigns = 0;"""
+        for grain in _ROLLUP_GRAIN_IDS
+    )
+
+
+def _rollup_trigger_shift() -> str:
+    """
+    Add NEW - OLD to the rollup rows of a campaign whose keys did not change.
+    """
+    deltas = ", ".join(
+        [f"{column} = {column} + (NEW.{column} - OLD.{column})" for column in ROLLUP_VALUES]
+        + ["roi_pct_sum = roi_pct_sum + (NEW.roi_pct - OLD.roi_pct)"]
+    )
+    return "".join(
+        f"""
+            UPDATE campaign_rollups SET {deltas} WHERE {_rollup_row("NEW.", grain)};"""
+        for grain in _ROLLUP_GRAIN_IDS
+    )
+
+
+# Rollup rows as they should be for the current campaigns table.
+CAMPAIGN_ROLLUP_QUERY = f"""
+    SELECT
+        COALESCE(owner_id, 0) AS owner_id,
+        {", ".join(_rollup_keys(""))},
+        COUNT(*) AS campaigns,
+        {", ".join(f"SUM({column}) AS {column}" for column in ROLLUP_VALUES)},
+        SUM(roi_pct) AS roi_pct_sum
+    FROM campaigns, {_ROLLUP_GRAIN_SOURCE}
+    GROUP BY 1, 2, 3, 4, 5
+"""
+
+
+def _ensure_campaign_rollups(conn: sqlite3.Connection) -> None:
+    """
+    Create campaign_rollups and the triggers that keep it in step with
+    every campaign insert, update and delete. A new rollup table is filled
+    from the existing campaigns.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'campaign_rollups'"
+    ).fetchone()
+    rollup_columns = "".join(f"            {column} REAL NOT NULL,\n" for column in ROLLUP_VALUES)
+    keys = ("owner_id", "client", "market", "created_at")
+    values = ROLLUP_VALUES + ("roi_pct",)
+    moved = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in keys)
+    _execute_script(
+        conn,
+        f"""
+        CREATE TABLE IF NOT EXISTS campaign_rollups (
+            owner_id INTEGER NOT NULL,
+            grain INTEGER NOT NULL,
+            client TEXT NOT NULL,
+            market TEXT NOT NULL,
+            month TEXT NOT NULL,
+            campaigns INTEGER NOT NULL,
+{rollup_columns}            roi_pct_sum REAL NOT NULL,
+            PRIMARY KEY (owner_id, grain, client, market, month)
+        ) WITHOUT ROWID;
+        CREATE TRIGGER IF NOT EXISTS trg_campaigns_rollup_insert
+        AFTER INSERT ON campaigns
+        BEGIN{_rollup_trigger_upsert("NEW.", "")}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_campaigns_rollup_delete
+        AFTER DELETE ON campaigns
+        BEGIN{_rollup_trigger_upsert("OLD.", "-")}{_rollup_trigger_prune("OLD.")}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_campaigns_rollup_update
+        AFTER UPDATE OF {", ".join(values)} ON campaigns
+        WHEN NOT ({moved})
+        BEGIN{_rollup_trigger_shift()}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_campaigns_rollup_move
+        AFTER UPDATE OF {", ".join(keys + values)} ON campaigns
+        WHEN {moved}
+        BEGIN{_rollup_trigger_upsert("OLD.", "-")}{_rollup_trigger_upsert("NEW.", "")}{_rollup_trigger_prune("OLD.")}
+        END;
+        """
+    )
+    if not exists:
+        conn.execute(f"INSERT INTO campaign_rollups {CAMPAIGN_ROLLUP_QUERY}")
 
 
 def _ensure_column(conn: sqlite3.Connection, table: str, column: str, definition: str) -> None:
@@ -93,6 +703,507 @@ def _ensure_column(conn: sqlite3.Connection, table: str, column: str, definition
             pass
 
 
+def _migrate_base_schema(conn: sqlite3.Connection) -> None:
+    """
+    The schema every earlier build created on each start: tables, the
+    columns added since, created_ts, indexes and rollups.
+    """
+    _create_base_tables(conn)
+    _ensure_created_ts(conn)
+    _execute_script(conn, _BASE_INDEXES)
+    _ensure_campaign_rollups(conn)
+
+
+def _migrate_entry_snapshot_columns(conn: sqlite3.Connection) -> None:
+    """
+    Databases created by older builds store the rate used for each entry
+    row; give fresh databases the same columns so both schemas agree.
+    """
+    _ensure_column(conn, "media_echo_entries", "tier_value", "REAL")
+    for column in ("weight_content", "weight_passive", "weight_active", "weight_amplification"):
+        _ensure_column(conn, "community_echo_entries", column, "REAL")
+
+
+# Rows copied per transaction by an online table rewrite.
+MIGRATION_CHUNK_SIZE = 5000
+
+
+def _column_type(conn: sqlite3.Connection, table: str, column: str) -> Optional[str]:
+    for row in conn.execute(f"PRAGMA table_info({table})"):
+        if row[1] == column:
+            return str(row[2]).upper()
+    return None
+
+
+def _carry_sequence(conn: sqlite3.Connection, old: str, new: str) -> None:
+    """
+    Keep AUTOINCREMENT on `new` from reusing ids deleted from `old`.
+    """
+    old_seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (old,)).fetchone()
+    if old_seq:
+        updated = conn.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (old_seq[0], new)
+        ).rowcount
+        if not updated:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (new, old_seq[0]))
+
+
+def _rebuild_table(conn: sqlite3.Connection, table: str, definition: str, indexes: str) -> None:
+    """
+    Recreate a small table with a new definition in the current transaction,
+    keeping the columns both versions share, then run `indexes` (the table's
+    CREATE INDEX statements; dropping it dropped its indexes). Dropping a
+    parent table deletes its children's rows through ON DELETE CASCADE, so a
+    migration using this on one must set foreign_keys=False.
+    """
+    new = f"{table}__rebuild"
+    conn.execute(f"CREATE TABLE {new} ({definition})")
+    old = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    names = ", ".join(row[1] for row in conn.execute(f"PRAGMA table_info({new})") if row[1] in old)
+    conn.execute(f"INSERT INTO {new} ({names}) SELECT {names} FROM {table}")
+    _carry_sequence(conn, table, new)
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {new} RENAME TO {table}")
+    _execute_script(conn, indexes)
+
+
+def _migrate_creator_upload_cache(conn: sqlite3.Connection) -> None:
+    """
+    Let an upload be recorded before its campaign exists (campaign_id was
+    NOT NULL) and give it room for the parsed result, so creator_uploads can
+    serve as the content-addressed parse cache.
+    """
+    if _column_type(conn, "creator_uploads", "grouped_json"):
+        return
+    _rebuild_table(
+        conn,
+        "creator_uploads",
+        """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        campaign_id INTEGER REFERENCES campaigns(id) ON DELETE CASCADE,
+        uploaded_by INTEGER NOT NULL REFERENCES users(id),
+        filename TEXT NOT NULL,
+        source TEXT DEFAULT 'creatoriq',
+        status TEXT CHECK(status IN ('uploaded','parsed','error')) DEFAULT 'uploaded',
+        sha256 TEXT,
+        uploaded_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        parsed_at TEXT,
+        total_posts INTEGER,
+        total_value REAL,
+        parser_version INTEGER,
+        summary_json TEXT,
+        grouped_json TEXT
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_creator_uploads_campaign ON creator_uploads (campaign_id);
+        CREATE INDEX IF NOT EXISTS idx_creator_uploads_uploaded_by ON creator_uploads (uploaded_by);
+        CREATE INDEX IF NOT EXISTS idx_creator_uploads_sha256 ON creator_uploads (sha256, status);
+        """,
+    )
+
+
+def _migrate_upload_row_profile(conn: sqlite3.Connection) -> None:
+    """
+    Keep the creator of each stored upload row, for per-creator analytics.
+    """
+    _ensure_column(conn, "creator_upload_rows", "profile", "TEXT")
+
+
+def _migrate_upload_row_creator_index(conn: sqlite3.Connection) -> None:
+    """
+    Total an upload's rows per creator from the index alone. It leads with
+    upload_id, so it also serves the lookups the upload_id index did.
+    """
+    _execute_script(
+        conn,
+        """
+        CREATE INDEX IF NOT EXISTS idx_creator_upload_rows_creator
+            ON creator_upload_rows (upload_id, tier, profile, fee, engagements, emv);
+        DROP INDEX IF EXISTS idx_creator_upload_rows_upload;
+        """,
+    )
+
+
+def _migrate_drop_campaign_kpi_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Library KPIs are read from the per-owner rollups, so the covering
+    client / market KPI indexes on campaigns only slow down writes.
+    """
+    _execute_script(
+        conn,
+        """
+        DROP INDEX IF EXISTS idx_campaigns_owner_client_kpis;
+        DROP INDEX IF EXISTS idx_campaigns_owner_market_kpis;
+        """,
+    )
+
+
+class _OnlineRewrite:
+    """
+    Rebuild `table` with a new definition without holding the write lock for
+    the whole copy. copy() creates `<table>__rewrite`, installs triggers that
+    mirror every write on the old table into it, then copies existing rows
+    in id order, MIGRATION_CHUNK_SIZE per transaction, recording the cursor in
+    schema_migration_progress so an interrupted copy resumes. swap() (run in
+    the migration's transaction) drops the old table and renames the new one
+    into place and runs `indexes`, the table's CREATE INDEX statements.
+    INSERT OR REPLACE by id makes copies and mirrored writes commute, so rows
+    written during the copy are never lost.
+    """
+
+    def __init__(
+        self, table: str, definition: str, needed: Callable[[sqlite3.Connection], bool], indexes: str
+    ) -> None:
+        self.table = table
+        self.new = f"{table}__rewrite"
+        self.definition = definition
+        self.needed = needed
+        self.indexes = indexes
+
+    def _columns(self, conn: sqlite3.Connection) -> list[str]:
+        old = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+        return [row[1] for row in conn.execute(f"PRAGMA table_info({self.new})") if row[1] in old]
+
+    def _copy_rows(
+        self, conn: sqlite3.Connection, columns: list[str], after: int, until: int, limit: int
+    ) -> Optional[int]:
+        names = ", ".join(columns)
+        last = conn.execute(
+            f"""
+            INSERT OR REPLACE INTO {self.new} ({names})
+            SELECT {names} FROM {self.table} WHERE id > ? AND id <= ? ORDER BY id LIMIT ?
+            RETURNING id
+            """,
+            (after, until, limit),
+        ).fetchall()
+        return max(row[0] for row in last) if last else None
+
+    def copy(self, conn: sqlite3.Connection, progress: Optional[Callable[[dict], None]] = None) -> None:
+        if not self.needed(conn):
+            return
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {self.new} ({self.definition})")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_migration_progress (
+                    name TEXT PRIMARY KEY,
+                    last_id INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute("INSERT OR IGNORE INTO schema_migration_progress (name, last_id) VALUES (?, 0)", (self.new,))
+            columns = self._columns(conn)
+            names = ", ".join(columns)
+            for event in ("INSERT", "UPDATE"):
+                conn.execute(
+                    f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{self.new}_{event.lower()}
+                    AFTER {event} ON {self.table}
+                    BEGIN
+                        INSERT OR REPLACE INTO {self.new} ({names})
+                        VALUES ({", ".join(f"NEW.{column}" for column in columns)});
+                    END
+                    """
+                )
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{self.new}_delete
+                AFTER DELETE ON {self.table}
+                BEGIN
+                    DELETE FROM {self.new} WHERE id = OLD.id;
+                END
+                """
+            )
+            # Rows inserted from here on reach the new table through the triggers.
+            (until,) = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {self.table}").fetchone()
+
+        while True:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                (cursor,) = conn.execute(
+                    "SELECT last_id FROM schema_migration_progress WHERE name = ?", (self.new,)
+                ).fetchone()
+                last = self._copy_rows(conn, columns, cursor, until, MIGRATION_CHUNK_SIZE)
+                if last is None:
+                    break
+                conn.execute("UPDATE schema_migration_progress SET last_id = ? WHERE name = ?", (last, self.new))
+            if progress:
+                progress({"table": self.table, "last_id": last, "until": until})
+
+    def swap(self, conn: sqlite3.Connection) -> None:
+        if not self.needed(conn):
+            return
+        columns = self._columns(conn)
+        (cursor,) = conn.execute(
+            "SELECT last_id FROM schema_migration_progress WHERE name = ?", (self.new,)
+        ).fetchone()
+        # Normally nothing is left past the cursor; take any rest under the lock.
+        self._copy_rows(conn, columns, cursor, 2**63 - 1, -1)
+        for event in ("insert", "update", "delete"):
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_{self.new}_{event}")
+        _carry_sequence(conn, self.table, self.new)
+        conn.execute(f"DROP TABLE {self.table}")
+        conn.execute(f"ALTER TABLE {self.new} RENAME TO {self.table}")
+        conn.execute("DELETE FROM schema_migration_progress WHERE name = ?", (self.new,))
+        _execute_script(conn, self.indexes)
+
+
+_CREATOR_ENTRIES_REWRITE = _OnlineRewrite(
+    "creator_echo_entries",
+    """
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    platform TEXT,
+    content_type TEXT,
+    tier TEXT,
+    num_posts REAL DEFAULT 0,
+    rate REAL DEFAULT 0,
+    source_campaign_id INTEGER
+    """,
+    # Older builds declared source_campaign_id TEXT; every other table uses INTEGER.
+    lambda conn: _column_type(conn, "creator_echo_entries", "source_campaign_id") != "INTEGER",
+    "CREATE INDEX IF NOT EXISTS idx_creator_echo_entries_campaign ON creator_echo_entries (campaign_id);",
+)
+
+
+@dataclass(frozen=True)
+class _Migration:
+    """
+    One schema step. `apply` runs inside a BEGIN IMMEDIATE transaction that
+    also bumps PRAGMA user_version to `version`. An optional `online` step
+    runs first, outside that transaction, for work too large for one lock
+    (it must be resumable). Both must be idempotent. Steps that rebuild a
+    parent table set foreign_keys=False: enforcement is off for the
+    transaction, which must leave PRAGMA foreign_key_check clean.
+    """
+
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+    online: Optional[Callable[..., None]] = None
+    foreign_keys: bool = True
+
+
+MIGRATIONS = (
+    _Migration(1, "base schema", _migrate_base_schema),
+    _Migration(2, "entry rate snapshot columns", _migrate_entry_snapshot_columns),
+    _Migration(
+        3,
+        "creator_echo_entries.source_campaign_id as INTEGER",
+        _CREATOR_ENTRIES_REWRITE.swap,
+        online=_CREATOR_ENTRIES_REWRITE.copy,
+    ),
+    _Migration(4, "creator upload parse cache", _migrate_creator_upload_cache, foreign_keys=False),
+    _Migration(5, "creator_upload_rows.profile", _migrate_upload_row_profile),
+    _Migration(6, "covering per-creator index on creator_upload_rows", _migrate_upload_row_creator_index),
+    _Migration(7, "drop campaign KPI covering indexes", _migrate_drop_campaign_kpi_indexes),
+)
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def _migrate(conn: sqlite3.Connection, progress: Optional[Callable[[dict], None]] = None) -> list[int]:
+    applied = []
+    for migration in MIGRATIONS:
+        if _schema_version(conn) >= migration.version:
+            continue
+        if migration.online:
+            migration.online(conn, progress)
+        if not migration.foreign_keys:
+            # A no-op inside a transaction, so it is set before BEGIN.
+            conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                # Another process may have applied it while this one waited for the lock.
+                if _schema_version(conn) >= migration.version:
+                    continue
+                migration.apply(conn)
+                if not migration.foreign_keys and conn.execute("PRAGMA foreign_key_check").fetchone():
+                    raise sqlite3.IntegrityError(f"Migration {migration.version} left foreign key violations.")
+                conn.execute(f"PRAGMA user_version = {migration.version}")
+        finally:
+            if not migration.foreign_keys:
+                conn.execute("PRAGMA foreign_keys = ON")
+        applied.append(migration.version)
+        if progress:
+            progress({"version": migration.version, "description": migration.description})
+    return applied
+
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+    """
+    Bring the database up to SCHEMA_VERSION. Once current, a process start
+    costs one PRAGMA user_version read, and later connections nothing.
+    """
+    global _SCHEMA_CURRENT
+    if _SCHEMA_CURRENT:
+        return
+    if _schema_version(conn) < SCHEMA_VERSION:
+        _migrate(conn)
+    _SCHEMA_CURRENT = True
+
+
+CAMPAIGN_INSERT_COLUMNS = [
+    "owner_id",
+    "campaign_name",
+    "client",
+    "market",
+    "objective",
+    "objective_focus",
+    "campaign_start",
+    "campaign_end",
+    "currency",
+    "investment",
+    "investment_k",
+    "custom_budget_flag",
+    "media_echo",
+    "creator_echo",
+    "community_echo",
+    "tev",
+    "roi_m",
+    "roi_pct",
+    "source",
+    "rate_card_version",
+]
+CAMPAIGN_UPDATE_COLUMNS = set(CAMPAIGN_INSERT_COLUMNS) - {"owner_id", "source"}
+# Columns written per entry table, with the value used when a row lacks the key.
+ENTRY_COLUMNS: Dict[str, Dict[str, Any]] = {
+    "creator_echo_entries": {
+        "platform": None,
+        "content_type": None,
+        "tier": None,
+        "num_posts": 0,
+        "rate": 0,
+        "source_campaign_id": None,
+    },
+    "media_echo_entries": {
+        "channel_type": None,
+        "tier_name": None,
+        "mentions": 0,
+        "source_campaign_id": None,
+    },
+    "community_echo_entries": {
+        "platform": None,
+        "content_creation": 0,
+        "passive_engagement": 0,
+        "active_engagement": 0,
+        "amplification": 0,
+        "source_campaign_id": None,
+    },
+}
+
+
+def _insert_campaign_row(conn: sqlite3.Connection, payload: Dict[str, Any]) -> int:
+    values = {column: payload.get(column) for column in CAMPAIGN_INSERT_COLUMNS}
+    values["market"] = values["market"] or None
+    values["currency"] = values["currency"] or "THB"
+    values["custom_budget_flag"] = 1 if values["custom_budget_flag"] else 0
+    values["source"] = values["source"] or "manual"
+    cur = conn.execute(
+        f"""
+        INSERT INTO campaigns ({", ".join(CAMPAIGN_INSERT_COLUMNS)})
+        VALUES ({", ".join(f":{column}" for column in CAMPAIGN_INSERT_COLUMNS)})
+        """,
+        values,
+    )
+    return cur.lastrowid
+
+
+def _update_campaign_row(conn: sqlite3.Connection, campaign_id: int, payload: Dict[str, Any]) -> None:
+    filtered = {k: v for k, v in payload.items() if k in CAMPAIGN_UPDATE_COLUMNS}
+    if not filtered:
+        return
+    set_clause = ", ".join(f"{key} = :{key}" for key in filtered)
+    filtered["id"] = campaign_id
+    conn.execute(f"UPDATE campaigns SET {set_clause} WHERE id = :id", filtered)
+
+
+def _insert_entry_rows(conn: sqlite3.Connection,
+                       table: str,
+                       campaign_id: int,
+                       rows: list[Dict[str, Any]]) -> None:
+    if not rows:
+        return
+    columns = ENTRY_COLUMNS[table]
+    conn.executemany(
+        f"""
+        INSERT INTO {table} (campaign_id, {", ".join(columns)})
+        VALUES ({", ".join("?" for _ in range(len(columns) + 1))})
+        """,
+        [(campaign_id, *_entry_values(table, row)) for row in rows],
+    )
+
+
+# Natural key of each entry table: rows are matched on it when syncing.
+ENTRY_KEYS: Dict[str, tuple[str, ...]] = {
+    "creator_echo_entries": ("platform", "content_type", "tier"),
+    "media_echo_entries": ("channel_type", "tier_name"),
+    "community_echo_entries": ("platform",),
+}
+
+
+def _entry_values(table: str, row: Dict[str, Any]) -> tuple:
+    values = []
+    for column, default in ENTRY_COLUMNS[table].items():
+        value = row.get(column, default)
+        # NaN from DataFrame rows is stored as NULL; compare it as NULL too.
+        values.append(None if isinstance(value, float) and value != value else value)
+    return tuple(values)
+
+
+def _sync_entry_rows(conn: sqlite3.Connection,
+                     table: str,
+                     campaign_id: int,
+                     rows: list[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Make a campaign's rows in `table` equal `rows`, touching only what
+    changed. Rows are matched on ENTRY_KEYS[table]; when a key repeats, its
+    rows pair up in order. Matched rows whose values differ are updated,
+    extra incoming rows inserted and leftover stored rows deleted.
+    Returns inserted / updated / deleted / unchanged counts.
+    """
+    columns = list(ENTRY_COLUMNS[table])
+    key_positions = [columns.index(column) for column in ENTRY_KEYS[table]]
+    stored: Dict[tuple, list[tuple[int, tuple]]] = {}
+    for row in conn.execute(
+        f"SELECT id, {', '.join(columns)} FROM {table} WHERE campaign_id = ? ORDER BY id",
+        (campaign_id,),
+    ):
+        values = tuple(row[1:])
+        stored.setdefault(tuple(values[i] for i in key_positions), []).append((row[0], values))
+
+    inserts, updates = [], []
+    unchanged = 0
+    for row in rows:
+        values = _entry_values(table, row)
+        matches = stored.get(tuple(values[i] for i in key_positions))
+        if not matches:
+            inserts.append(row)
+            continue
+        row_id, current = matches.pop(0)
+        if current == values:
+            unchanged += 1
+        else:
+            updates.append((*values, row_id))
+    deletes = [(row_id,) for matches in stored.values() for row_id, _ in matches]
+
+    if deletes:
+        conn.executemany(f"DELETE FROM {table} WHERE id = ?", deletes)
+    if updates:
+        conn.executemany(
+            f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+            updates,
+        )
+    _insert_entry_rows(conn, table, campaign_id, inserts)
+    return {"inserted": len(inserts), "updated": len(updates), "deleted": len(deletes), "unchanged": unchanged}
+
+
+@_retry_on_busy
 def insert_campaign(
     result: Dict[str, float],
     inv: float,
@@ -109,6 +1220,7 @@ def insert_campaign(
     investment_k: Optional[float] = None,
     custom_budget_flag: bool | int = False,
     source: str = "manual",
+    rate_card_version: Optional[int] = None,
 ) -> int:
     """
     Persist a campaign summary row and return its ID.
@@ -134,36 +1246,72 @@ def insert_campaign(
         "roi_m": result["roi_m"],
         "roi_pct": result["roi_pct"],
         "source": source,
+        "rate_card_version": rate_card_version,
     }
 
     with get_conn() as conn:
-        cur = conn.execute(
-            """
-            INSERT INTO campaigns (
-                owner_id, campaign_name, client, market, objective,
-                objective_focus, campaign_start, campaign_end,
-                currency, investment, investment_k, custom_budget_flag,
-                media_echo, creator_echo, community_echo,
-                tev, roi_m, roi_pct, source
-            ) VALUES (
-                :owner_id, :campaign_name, :client, :market, :objective,
-                :objective_focus, :campaign_start, :campaign_end,
-                :currency, :investment, :investment_k, :custom_budget_flag,
-                :media_echo, :creator_echo, :community_echo,
-                :tev, :roi_m, :roi_pct, :source
-            )
-            """,
-            payload,
-        )
-        return cur.lastrowid
+        return _insert_campaign_row(conn, payload)
 
 
-def fetch_campaigns(
-    client: Optional[str] = None,
-    market: Optional[str] = None,
-    campaign_name: Optional[str] = None,
-    owner_id: Optional[int] = None,
-) -> pd.DataFrame:
+CAMPAIGN_LIST_COLUMNS = [
+    "owner_id",
+    "id",
+    "created_at",
+    "campaign_name",
+    "client",
+    "market",
+    "objective",
+    "objective_focus",
+    "campaign_start",
+    "campaign_end",
+    "currency",
+    "investment",
+    "investment_k",
+    "custom_budget_flag",
+    "media_echo",
+    "creator_echo",
+    "community_echo",
+    "tev",
+    "roi_m",
+    "roi_pct",
+    "rate_card_version",
+]
+# Library sort orders: name -> (column, direction). Every column is NOT NULL
+# and ties break on id, which the keyset cursor relies on.
+CAMPAIGN_SORTS = {
+    "newest": ("created_ts", "DESC"),
+    "oldest": ("created_ts", "ASC"),
+    "tev": ("tev", "DESC"),
+    "roi": ("roi_pct", "DESC"),
+    "name": ("campaign_name", "ASC"),
+}
+CAMPAIGN_FILTER_COLUMNS = ("client", "market", "campaign_name")
+# Portfolio KPIs: name -> aggregate over campaigns. ROIM is total TEV over
+# total investment, not the mean of per-campaign ROIM.
+CAMPAIGN_KPIS = {
+    "campaigns": "COUNT(*)",
+    "investment": "COALESCE(SUM(investment), 0)",
+    "media_echo": "COALESCE(SUM(media_echo), 0)",
+    "creator_echo": "COALESCE(SUM(creator_echo), 0)",
+    "community_echo": "COALESCE(SUM(community_echo), 0)",
+    "tev": "COALESCE(SUM(tev), 0)",
+    "avg_roi_pct": "COALESCE(AVG(roi_pct), 0)",
+    "roi_m": "COALESCE(SUM(tev) / NULLIF(SUM(investment), 0), 0)",
+}
+# The same KPIs over campaign_rollups rows.
+ROLLUP_KPIS = {
+    "campaigns": "COALESCE(SUM(campaigns), 0)",
+    **{column: f"COALESCE(SUM({column}), 0)" for column in ROLLUP_VALUES},
+    "avg_roi_pct": "COALESCE(SUM(roi_pct_sum) / NULLIF(SUM(campaigns), 0), 0)",
+    "roi_m": "COALESCE(SUM(tev) / NULLIF(SUM(investment), 0), 0)",
+}
+CAMPAIGN_BREAKDOWNS = tuple(ROLLUP_GRAINS)
+
+
+def _campaign_filters(client: Optional[str] = None,
+                      market: Optional[str] = None,
+                      campaign_name: Optional[str] = None,
+                      owner_id: Optional[int] = None) -> tuple[list[str], Dict[str, Any]]:
     where = []
     params: Dict[str, Any] = {}
 
@@ -179,72 +1327,200 @@ def fetch_campaigns(
     if owner_id:
         where.append("owner_id = :owner_id")
         params["owner_id"] = owner_id
+    return where, params
+
+
+@_retry_on_busy
+def fetch_campaigns(
+    client: Optional[str] = None,
+    market: Optional[str] = None,
+    campaign_name: Optional[str] = None,
+    owner_id: Optional[int] = None,
+) -> pd.DataFrame:
+    where, params = _campaign_filters(client, market, campaign_name, owner_id)
+    clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+    query = f"""
+        SELECT {", ".join(CAMPAIGN_LIST_COLUMNS)}
+        FROM campaigns
+        {clause}
+        ORDER BY created_ts DESC, id DESC
+    """
+
+    with get_conn() as conn:
+        return pd.read_sql_query(query, conn, params=params)
+
+
+@_retry_on_busy
+def fetch_campaign_page(
+    client: Optional[str] = None,
+    market: Optional[str] = None,
+    campaign_name: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    *,
+    sort: str = "newest",
+    limit: int = 25,
+    after: Optional[tuple[Any, int]] = None,
+) -> tuple[pd.DataFrame, Optional[tuple[Any, int]]]:
+    """
+    One page of campaigns, filtered and sorted in SQL (see CAMPAIGN_SORTS).
 
+    Keyset pagination: pass the returned cursor as `after` to get the next
+    page; it is None on the last page. The cost of a page depends on
+    `limit`, not on how many campaigns match.
+    """
+    if sort not in CAMPAIGN_SORTS:
+        raise ValueError(f"Unknown sort {sort!r}; expected one of {sorted(CAMPAIGN_SORTS)}.")
+    column, direction = CAMPAIGN_SORTS[sort]
+    where, params = _campaign_filters(client, market, campaign_name, owner_id)
+    if after is not None:
+        where.append(f"({column}, id) {'<' if direction == 'DESC' else '>'} (:after_value, :after_id)")
+        params["after_value"], params["after_id"] = after
     clause = f"WHERE {' AND '.join(where)}" if where else ""
+    params["limit"] = limit + 1
 
     query = f"""
-        SELECT
-            owner_id,
-            id,
-            created_at,
-            campaign_name,
-            client,
-            market,
-            objective,
-            objective_focus,
-            campaign_start,
-            campaign_end,
-            currency,
-            investment,
-            investment_k,
-            custom_budget_flag,
-            media_echo,
-            creator_echo,
-            community_echo,
-            tev,
-            roi_m,
-            roi_pct
+        SELECT {", ".join(CAMPAIGN_LIST_COLUMNS)}, {column} AS sort_value
         FROM campaigns
         {clause}
-        ORDER BY datetime(created_at) DESC
+        ORDER BY {column} {direction}, id {direction}
+        LIMIT :limit
+    """
+    with get_conn() as conn:
+        page = pd.read_sql_query(query, conn, params=params)
+
+    cursor = None
+    if len(page) > limit:
+        page = page.iloc[:limit]
+        last = page.iloc[-1]
+        value = last["sort_value"]
+        cursor = (value.item() if hasattr(value, "item") else value, int(last["id"]))
+    return page.drop(columns="sort_value"), cursor
+
+
+def _kpi_columns(kpis: Dict[str, str]) -> str:
+    return ",\n            ".join(f"{expr} AS {name}" for name, expr in kpis.items())
+
+
+def _rollup_filters(group_by: Optional[str],
+                    client: Optional[str],
+                    market: Optional[str],
+                    owner_id: int) -> tuple[list[str], Dict[str, Any]]:
+    """
+    WHERE terms picking the campaign_rollups rows for one owner, the
+    client / market filters and an optional breakdown key.
+    """
+    chosen = {"client": client, "market": market, "month": None}
+    grain = sum(bit for key, bit in ROLLUP_GRAINS.items() if chosen[key] or key == group_by)
+    where = ["owner_id = :owner_id", "grain = :grain"]
+    params: Dict[str, Any] = {"owner_id": owner_id, "grain": grain}
+    for key in ROLLUP_GRAINS:
+        if key == group_by and not chosen[key]:
+            continue
+        where.append(f"{key} = :{key}")
+        params[key] = chosen[key] or ""
+    return where, params
+
+
+@_retry_on_busy
+def fetch_campaign_totals(
+    client: Optional[str] = None,
+    market: Optional[str] = None,
+    campaign_name: Optional[str] = None,
+    owner_id: Optional[int] = None,
+) -> Dict[str, float]:
+    """
+    CAMPAIGN_KPIS over every campaign matching the filters. For one owner
+    without a campaign name this is a single campaign_rollups row.
     """
+    if owner_id and not campaign_name:
+        where, params = _rollup_filters(None, client, market, owner_id)
+        query = f"SELECT {_kpi_columns(ROLLUP_KPIS)} FROM campaign_rollups WHERE {' AND '.join(where)}"
+    else:
+        where, params = _campaign_filters(client, market, campaign_name, owner_id)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        query = f"SELECT {_kpi_columns(CAMPAIGN_KPIS)} FROM campaigns {clause}"
+    with get_conn() as conn:
+        row = conn.execute(query, params).fetchone()
+    return dict(row)
+
 
+@_retry_on_busy
+def fetch_campaign_breakdown(
+    group_by: str,
+    client: Optional[str] = None,
+    market: Optional[str] = None,
+    campaign_name: Optional[str] = None,
+    owner_id: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    CAMPAIGN_KPIS per client, market or created month ("YYYY-MM") over the
+    campaigns matching the filters, one row per group ordered by the group
+    value. A missing client / market is grouped as "".
+    """
+    if group_by not in CAMPAIGN_BREAKDOWNS:
+        raise ValueError(f"Unknown breakdown {group_by!r}; expected one of {', '.join(CAMPAIGN_BREAKDOWNS)}.")
+    if owner_id and not campaign_name:
+        where, params = _rollup_filters(group_by, client, market, owner_id)
+        query = f"""
+            SELECT
+                {group_by},
+                {_kpi_columns(ROLLUP_KPIS)}
+            FROM campaign_rollups
+            WHERE {' AND '.join(where)}
+            GROUP BY {group_by}
+            ORDER BY {group_by}
+        """
+    else:
+        where, params = _campaign_filters(client, market, campaign_name, owner_id)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        query = f"""
+            SELECT
+                {_ROLLUP_KEYS[group_by].format(row="")} AS {group_by},
+                {_kpi_columns(CAMPAIGN_KPIS)}
+            FROM campaigns
+            {clause}
+            GROUP BY 1
+            ORDER BY 1
+        """
     with get_conn() as conn:
         return pd.read_sql_query(query, conn, params=params)
 
 
+@_retry_on_busy
+def fetch_campaign_filter_options(
+    client: Optional[str] = None,
+    market: Optional[str] = None,
+    owner_id: Optional[int] = None,
+) -> Dict[str, list[str]]:
+    """
+    Sorted distinct clients, markets and campaign names for the library
+    dropdowns. Campaign names are narrowed by the chosen client / market.
+    """
+    options: Dict[str, list[str]] = {}
+    with get_conn() as conn:
+        for column in CAMPAIGN_FILTER_COLUMNS:
+            narrowing = (client, market) if column == "campaign_name" else (None, None)
+            where, params = _campaign_filters(*narrowing, owner_id=owner_id)
+            where.append(f"{column} IS NOT NULL AND {column} != ''")
+            rows = conn.execute(
+                f"SELECT DISTINCT {column} FROM campaigns WHERE {' AND '.join(where)} ORDER BY {column}",
+                params,
+            ).fetchall()
+            options[column] = [row[0] for row in rows]
+    return options
+
+
+@_retry_on_busy
 def insert_creator_rows(campaign_id: int, rows: Iterable[Dict[str, Any]]) -> None:
     rows = list(rows)
     if not rows:
         return
-
-    normalized = [
-        {
-            "campaign_id": campaign_id,
-            "platform": row.get("platform"),
-            "content_type": row.get("content_type"),
-            "tier": row.get("tier"),
-            "num_posts": row.get("num_posts", 0),
-            "rate": row.get("rate", 0),
-            "source_campaign_id": row.get("source_campaign_id"),
-        }
-        for row in rows
-    ]
-
     with get_conn() as conn:
-        conn.executemany(
-            """
-            INSERT INTO creator_echo_entries (
-                campaign_id, platform, content_type, tier, num_posts, rate, source_campaign_id
-            )
-            VALUES (
-                :campaign_id, :platform, :content_type, :tier, :num_posts, :rate, :source_campaign_id
-            )
-            """,
-            normalized,
-        )
+        _insert_entry_rows(conn, "creator_echo_entries", campaign_id, rows)
 
 
+@_retry_on_busy
 def create_user(email: str,
                 password_hash: str,
                 name: Optional[str] = None,
@@ -262,6 +1538,7 @@ def create_user(email: str,
         return cur.lastrowid
 
 
+@_retry_on_busy
 def update_campaign(campaign_id: int, payload: Dict[str, Any]) -> None:
     """
     Update a campaign row with the provided fields.
@@ -269,38 +1546,11 @@ def update_campaign(campaign_id: int, payload: Dict[str, Any]) -> None:
     """
     if not payload:
         return
-
-    allowed_keys = {
-        "campaign_name",
-        "client",
-        "market",
-        "objective",
-        "objective_focus",
-        "campaign_start",
-        "campaign_end",
-        "currency",
-        "investment",
-        "investment_k",
-        "custom_budget_flag",
-        "media_echo",
-        "creator_echo",
-        "community_echo",
-        "tev",
-        "roi_m",
-        "roi_pct",
-    }
-    filtered = {k: v for k, v in payload.items() if k in allowed_keys}
-    if not filtered:
-        return
-
-    set_clause = ", ".join(f"{key} = :{key}" for key in filtered)
-    filtered["id"] = campaign_id
-    query = f"UPDATE campaigns SET {set_clause} WHERE id = :id"
-
     with get_conn() as conn:
-        conn.execute(query, filtered)
+        _update_campaign_row(conn, campaign_id, payload)
 
 
+@_retry_on_busy
 def fetch_creator_rows(campaign_id: int) -> pd.DataFrame:
     query = """
         SELECT platform, content_type, tier, num_posts, rate, source_campaign_id
@@ -311,35 +1561,18 @@ def fetch_creator_rows(campaign_id: int) -> pd.DataFrame:
         return pd.read_sql_query(query, conn, params=(campaign_id,))
 
 
-def replace_creator_rows(campaign_id: int, rows: Iterable[Dict[str, Any]]) -> None:
+@_retry_on_busy
+def replace_creator_rows(campaign_id: int, rows: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Make the campaign's creator entries equal `rows`, writing only changed rows.
+    Returns inserted / updated / deleted / unchanged counts.
+    """
     rows = list(rows)
     with get_conn() as conn:
-        conn.execute("DELETE FROM creator_echo_entries WHERE campaign_id = ?", (campaign_id,))
-        if not rows:
-            return
-        conn.executemany(
-            """
-            INSERT INTO creator_echo_entries (
-                campaign_id, platform, content_type, tier, num_posts, rate, source_campaign_id
-            ) VALUES (
-                :campaign_id, :platform, :content_type, :tier, :num_posts, :rate, :source_campaign_id
-            )
-            """,
-            [
-                {
-                    "campaign_id": campaign_id,
-                    "platform": row.get("platform"),
-                    "content_type": row.get("content_type"),
-                    "tier": row.get("tier"),
-                    "num_posts": row.get("num_posts", 0),
-                    "rate": row.get("rate", 0),
-                    "source_campaign_id": row.get("source_campaign_id"),
-                }
-                for row in rows
-            ],
-        )
+        return _sync_entry_rows(conn, "creator_echo_entries", campaign_id, rows)
 
 
+@_retry_on_busy
 def fetch_media_rows(campaign_id: int) -> pd.DataFrame:
     query = """
         SELECT channel_type, tier_name, mentions, source_campaign_id
@@ -350,33 +1583,18 @@ def fetch_media_rows(campaign_id: int) -> pd.DataFrame:
         return pd.read_sql_query(query, conn, params=(campaign_id,))
 
 
-def replace_media_rows(campaign_id: int, rows: Iterable[Dict[str, Any]]) -> None:
+@_retry_on_busy
+def replace_media_rows(campaign_id: int, rows: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Make the campaign's media entries equal `rows`, writing only changed rows.
+    Returns inserted / updated / deleted / unchanged counts.
+    """
     rows = list(rows)
     with get_conn() as conn:
-        conn.execute("DELETE FROM media_echo_entries WHERE campaign_id = ?", (campaign_id,))
-        if not rows:
-            return
-        conn.executemany(
-            """
-            INSERT INTO media_echo_entries (
-                campaign_id, channel_type, tier_name, mentions, source_campaign_id
-            ) VALUES (
-                :campaign_id, :channel_type, :tier_name, :mentions, :source_campaign_id
-            )
-            """,
-            [
-                {
-                    "campaign_id": campaign_id,
-                    "channel_type": row.get("channel_type"),
-                    "tier_name": row.get("tier_name"),
-                    "mentions": row.get("mentions", 0),
-                    "source_campaign_id": row.get("source_campaign_id"),
-                }
-                for row in rows
-            ],
-        )
+        return _sync_entry_rows(conn, "media_echo_entries", campaign_id, rows)
 
 
+@_retry_on_busy
 def fetch_community_rows(campaign_id: int) -> pd.DataFrame:
     query = """
         SELECT platform, content_creation, passive_engagement, active_engagement, amplification, source_campaign_id
@@ -387,37 +1605,115 @@ def fetch_community_rows(campaign_id: int) -> pd.DataFrame:
         return pd.read_sql_query(query, conn, params=(campaign_id,))
 
 
-def replace_community_rows(campaign_id: int, rows: Iterable[Dict[str, Any]]) -> None:
+@_retry_on_busy
+def replace_community_rows(campaign_id: int, rows: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Make the campaign's community entries equal `rows`, writing only changed rows.
+    Returns inserted / updated / deleted / unchanged counts.
+    """
     rows = list(rows)
     with get_conn() as conn:
-        conn.execute("DELETE FROM community_echo_entries WHERE campaign_id = ?", (campaign_id,))
-        if not rows:
-            return
-        conn.executemany(
-            """
-            INSERT INTO community_echo_entries (
-                campaign_id, platform, content_creation, passive_engagement,
-                active_engagement, amplification, source_campaign_id
-            ) VALUES (
-                :campaign_id, :platform, :content_creation, :passive_engagement,
-                :active_engagement, :amplification, :source_campaign_id
+        return _sync_entry_rows(conn, "community_echo_entries", campaign_id, rows)
+
+
+# Campaign IDs per IN (...) list in fetch_entry_rows; below SQLite's old
+# 999 host-parameter limit.
+ENTRY_FETCH_CHUNK = 900
+
+
+@_retry_on_busy
+def fetch_entry_rows(campaign_ids: Iterable[int]) -> Dict[str, pd.DataFrame]:
+    """
+    Entry rows of many campaigns at once, one long-format frame per entry
+    table with a leading campaign_id column, ordered by campaign and then
+    insertion. IDs are queried in chunks of ENTRY_FETCH_CHUNK, so N campaigns
+    cost 3 x ceil(N / chunk) queries instead of 3 x N.
+    """
+    ids = sorted({int(campaign_id) for campaign_id in campaign_ids})
+    frames: Dict[str, pd.DataFrame] = {}
+    with get_conn() as conn:
+        for table, columns in ENTRY_COLUMNS.items():
+            names = ["campaign_id", *columns]
+            records: list[tuple] = []
+            for start in range(0, len(ids), ENTRY_FETCH_CHUNK):
+                chunk = ids[start:start + ENTRY_FETCH_CHUNK]
+                records.extend(
+                    conn.execute(
+                        f"""
+                        SELECT {", ".join(names)}
+                        FROM {table}
+                        WHERE campaign_id IN ({", ".join("?" for _ in chunk)})
+                        ORDER BY campaign_id, id
+                        """,
+                        chunk,
+                    )
+                )
+            frames[table] = pd.DataFrame.from_records(
+                [tuple(row) for row in records], columns=names, coerce_float=True
             )
-            """,
-            [
-                {
-                    "campaign_id": campaign_id,
-                    "platform": row.get("platform"),
-                    "content_creation": row.get("content_creation", 0),
-                    "passive_engagement": row.get("passive_engagement", 0),
-                    "active_engagement": row.get("active_engagement", 0),
-                    "amplification": row.get("amplification", 0),
-                    "source_campaign_id": row.get("source_campaign_id"),
-                }
-                for row in rows
-            ],
+    return frames
+
+
+@_retry_on_busy
+def fetch_campaign_entries(campaign_id: int) -> Dict[str, pd.DataFrame]:
+    """
+    One campaign's creator, media and community entry rows in a single
+    UNION ALL round-trip, split into the frames fetch_creator_rows /
+    fetch_media_rows / fetch_community_rows return, keyed by table.
+    """
+    all_columns = list(dict.fromkeys(column for columns in ENTRY_COLUMNS.values() for column in columns))
+    selects = []
+    for table, columns in ENTRY_COLUMNS.items():
+        # Each arm yields every entry column, NULL where the table has none.
+        padded = ", ".join(column if column in columns else f"NULL AS {column}" for column in all_columns)
+        selects.append(f"SELECT '{table}' AS entry_table, {padded} FROM {table} WHERE campaign_id = :campaign_id")
+    with get_conn() as conn:
+        rows = conn.execute(
+            " UNION ALL ".join(selects),
+            {"campaign_id": campaign_id},
+        ).fetchall()
+    positions = {column: index + 1 for index, column in enumerate(all_columns)}
+    frames = {}
+    for table, columns in ENTRY_COLUMNS.items():
+        frames[table] = pd.DataFrame.from_records(
+            [tuple(row[positions[column]] for column in columns) for row in rows if row[0] == table],
+            columns=list(columns),
+            coerce_float=True,
         )
+    return frames
+
+
+@_retry_on_busy
+def save_campaign_bundle(payload: Dict[str, Any],
+                         creator_rows: Iterable[Dict[str, Any]],
+                         media_rows: Iterable[Dict[str, Any]],
+                         community_rows: Iterable[Dict[str, Any]],
+                         campaign_id: Optional[int] = None) -> tuple[int, Dict[str, Dict[str, int]]]:
+    """
+    Insert (campaign_id None) or update a campaign and sync all of its
+    creator, media and community entry rows in one transaction, so a failure
+    part-way leaves the previous save intact. `payload` holds campaigns
+    columns (see CAMPAIGN_INSERT_COLUMNS). Only changed entry rows are
+    written.
+
+    Returns the campaign ID and, per entry table, the inserted / updated /
+    deleted / unchanged row counts.
+    """
+    entries = {
+        "creator_echo_entries": list(creator_rows),
+        "media_echo_entries": list(media_rows),
+        "community_echo_entries": list(community_rows),
+    }
+    with get_conn() as conn:
+        if campaign_id:
+            _update_campaign_row(conn, campaign_id, payload)
+        else:
+            campaign_id = _insert_campaign_row(conn, payload)
+        touched = {table: _sync_entry_rows(conn, table, campaign_id, rows) for table, rows in entries.items()}
+    return campaign_id, touched
 
 
+@_retry_on_busy
 def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
     with get_conn() as conn:
         row = conn.execute(
@@ -427,9 +1723,202 @@ def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
         return dict(row) if row else None
 
 
+@_retry_on_busy
 def update_last_login(user_id: int) -> None:
     with get_conn() as conn:
         conn.execute(
             "UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?",
             (user_id,),
         )
+
+
+@_retry_on_busy
+def fetch_rate_card_version() -> int:
+    """
+    Current rate card version. Changes whenever any rate reference table is edited.
+    """
+    with get_conn() as conn:
+        row = conn.execute("SELECT version FROM rate_card_version WHERE id = 1").fetchone()
+        return int(row[0]) if row else 0
+
+
+@_retry_on_busy
+def rebuild_campaign_rollups() -> int:
+    """
+    Recompute campaign_rollups from campaigns in one transaction. Returns
+    the number of rollup rows written.
+    """
+    with get_conn() as conn:
+        conn.execute("DELETE FROM campaign_rollups")
+        cur = conn.execute(f"INSERT INTO campaign_rollups {CAMPAIGN_ROLLUP_QUERY}")
+        return cur.rowcount
+
+
+@_retry_on_busy
+def find_creator_upload(sha256: str, parser_version: int, uploaded_by: int) -> Optional[Dict[str, Any]]:
+    """
+    The latest upload of this file content by `uploaded_by`, parsed by
+    `parser_version`, with its summary and grouped rows decoded, or None.
+    Scoped to the uploader: another user's upload of the same bytes is not
+    shared.
+    """
+    with get_conn() as conn:
+        row = conn.execute(
+            """
+            SELECT id, campaign_id, filename, sha256, uploaded_at, parsed_at, summary_json, grouped_json
+            FROM creator_uploads
+            WHERE sha256 = ? AND status = 'parsed' AND parser_version = ? AND uploaded_by = ?
+            ORDER BY id DESC
+            LIMIT 1
+            """,
+            (sha256, parser_version, uploaded_by),
+        ).fetchone()
+    if row is None:
+        return None
+    upload = dict(row)
+    upload["summary"] = json.loads(upload.pop("summary_json"))
+    upload["grouped"] = json.loads(upload.pop("grouped_json"))
+    return upload
+
+
+@_retry_on_busy
+def start_creator_upload(sha256: str,
+                         filename: str,
+                         uploaded_by: int,
+                         parser_version: int,
+                         source: str = "fanpage_karma",
+                         campaign_id: Optional[int] = None) -> int:
+    """
+    Record an upload about to be parsed (status 'uploaded'). Returns its id.
+    """
+    with get_conn() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO creator_uploads (campaign_id, uploaded_by, filename, source, sha256, parser_version)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (campaign_id, uploaded_by, filename, source, sha256, parser_version),
+        )
+        return int(cur.lastrowid)
+
+
+@_retry_on_busy
+def finish_creator_upload(upload_id: int,
+                          summary: Dict[str, Any],
+                          grouped: list[Dict[str, Any]],
+                          total_value: Optional[float] = None) -> str:
+    """
+    Store the parsed result and mark the upload 'parsed'. Returns parsed_at.
+    """
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            UPDATE creator_uploads
+            SET status = 'parsed', parsed_at = CURRENT_TIMESTAMP, total_posts = ?, total_value = ?,
+                summary_json = ?, grouped_json = ?
+            WHERE id = ?
+            RETURNING parsed_at
+            """,
+            (summary.get("total_posts"), total_value, json.dumps(summary), json.dumps(grouped), upload_id),
+        ).fetchall()
+        return rows[0][0]
+
+
+@_retry_on_busy
+def fail_creator_upload(upload_id: int) -> None:
+    """
+    Mark the upload 'error' and drop any rows stored before the failure.
+    """
+    with get_conn() as conn:
+        conn.execute("DELETE FROM creator_upload_rows WHERE upload_id = ?", (upload_id,))
+        conn.execute("UPDATE creator_uploads SET status = 'error' WHERE id = ?", (upload_id,))
+
+
+UPLOAD_ROW_COLUMNS = (
+    "profile",
+    "platform",
+    "content_type",
+    "tier",
+    "post_date",
+    "impressions",
+    "engagements",
+    "emv",
+    "fee",
+    "currency",
+    "raw_json",
+)
+
+
+@_retry_on_busy
+def insert_creator_upload_rows(upload_id: int, rows: pd.DataFrame) -> int:
+    """
+    Append one batch of an upload's posts in a single transaction. `rows`
+    holds any of UPLOAD_ROW_COLUMNS; absent ones are stored as NULL, and so
+    are NaN cells. Returns the number of rows written.
+    """
+    columns = [column for column in UPLOAD_ROW_COLUMNS if column in rows.columns]
+    values = zip([upload_id] * len(rows), *(rows[column].tolist() for column in columns))
+    with get_conn() as conn:
+        conn.executemany(
+            f"""
+            INSERT INTO creator_upload_rows (upload_id, {", ".join(columns)})
+            VALUES (?{", ?" * len(columns)})
+            """,
+            values,
+        )
+    return len(rows)
+
+
+@_retry_on_busy
+def creator_upload_totals(upload_id: int) -> pd.DataFrame:
+    """
+    One upload's stored posts summed per creator: tier, profile, posts, fee,
+    engagements and emv (TOTAL, so missing metrics count as 0). Read from
+    idx_creator_upload_rows_creator alone, in tier / profile order.
+    """
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        records = cursor.execute(
+            """
+            SELECT tier, profile, COUNT(*), TOTAL(fee), TOTAL(engagements), TOTAL(emv)
+            FROM creator_upload_rows
+            WHERE upload_id = ?
+            GROUP BY tier, profile
+            """,
+            (upload_id,),
+        ).fetchall()
+    return pd.DataFrame.from_records(
+        records, columns=["tier", "profile", "posts", "fee", "engagements", "emv"], coerce_float=True
+    )
+
+
+def schema_version() -> int:
+    """
+    PRAGMA user_version of the database file, without migrating it.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return _schema_version(conn)
+    finally:
+        conn.close()
+
+
+def migrate_schema(progress: Optional[Callable[[dict], None]] = None) -> list[int]:
+    """
+    Apply pending migrations on a dedicated connection, reporting each copied
+    chunk and applied version to `progress`. Lets a deploy run a long online
+    rewrite ahead of the app instead of on the first request. Returns the
+    versions applied.
+    """
+    global _SCHEMA_CURRENT
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON;")
+        _apply_pragmas(conn)
+        applied = _migrate(conn, progress)
+    finally:
+        conn.close()
+    _SCHEMA_CURRENT = True
+    return applied
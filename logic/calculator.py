@@ -1,17 +1,56 @@
+import math
+from dataclasses import dataclass
 from functools import lru_cache
+from typing import Any, Hashable, Iterable, Mapping
 
+import numpy as np
 import pandas as pd
 
-from db import get_conn
+from db import fetch_rate_card_version, get_conn
+
+
+# UI labels -> reference table labels. The aliases are folded into the compiled
+# key codecs, so inputs never have to be rewritten before a lookup.
+MEDIA_TYPE_MAP = {
+    "Major": "Major national media",
+    "Industry": "Industry-specific",
+    "Local/Niche": "Local/niche",
+    "Tier 1": "1",
+    "Tier 2": "2",
+    "Tier 3": "3",
+}
+CREATOR_TYPE_MAP = {
+    "Static Post": "Static/General Post",
+    "Static/General Post": "Static/General Post",
+    "Video Post": "Video Post",
+}
+COMMUNITY_INPUT_COLUMNS = [
+    "content_creation",
+    "passive_engagement",
+    "active_engagement",
+    "amplification",
+]
+COMMUNITY_WEIGHT_COLUMNS = [
+    "weight_content",
+    "weight_passive",
+    "weight_active",
+    "weight_amplification",
+]
 
 
 # ========= LOAD REFERENCE TABLES =========
 
-@lru_cache(maxsize=1)
 def load_reference_tables():
     """
     Load the reference tables from SQLite.
+    Cached per rate card version, so edits to the rate tables are picked up
+    by a running server on the next call.
     """
+    return _load_reference_tables(fetch_rate_card_version())
+
+
+@lru_cache(maxsize=1)
+def _load_reference_tables(version: int):
     with get_conn() as conn:
         media_tier_df = pd.read_sql_query(
             """
@@ -50,95 +89,257 @@ def load_reference_tables():
     return media_tier_df, creator_rate_df, cpe_df
 
 
-# ========= MEDIA ECHO =========
+# ========= COMPILED RATE LOOKUP =========
 
-def _normalize_media_inputs(media_inputs: pd.DataFrame) -> pd.DataFrame:
+class _KeyCodec:
+    """
+    Dense integer codes for one key column of a reference table.
+    Unknown labels encode to -1.
     """
-    Map friendly 'tier_name' values from the UI to the 'Type'
-    values in the media_tier sheet.
-
-    UI values (tier_name):
-        - 'Major', 'Industry', 'Local/Niche'
-        - 'Tier 1', 'Tier 2', 'Tier 3'
 
-    Excel 'media_tier' sheet values:
-        - Category: 'Online Article' / 'Social Media'
-        - Type: 'Major national media', 'Industry-specific', 'Local/niche', '1', '2', '3'
+    # Below this many values a plain dict probe beats building a pandas Index.
+    _DICT_PROBE_LIMIT = 2048
+
+    def __init__(self, labels: Iterable[Any], aliases: dict[str, str] | None = None):
+        codes: dict[Any, int] = {}
+        for label in labels:
+            codes.setdefault(label, len(codes))
+        self.labels = list(codes)
+        for alias, target in (aliases or {}).items():
+            if target in codes and alias not in codes:
+                codes[alias] = codes[target]
+        self._lookup = codes
+        self._index = pd.Index(list(codes), dtype=object)
+        self._codes = np.fromiter(codes.values(), dtype=np.intp, count=len(codes))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def code(self, value: Any) -> int:
+        try:
+            return self._lookup.get(value, -1)
+        except TypeError:  # unhashable cell value
+            return -1
+
+    def encode(self, values: Any) -> np.ndarray:
+        values = np.asarray(values, dtype=object)
+        if len(values) <= self._DICT_PROBE_LIMIT:
+            get = self._lookup.get
+            return np.fromiter((get(v, -1) for v in values), dtype=np.intp, count=len(values))
+        positions = self._index.get_indexer(values)
+        return np.where(positions >= 0, self._codes[positions], -1)
+
+
+@dataclass(frozen=True)
+class RateLookup:
+    """
+    Reference tables compiled into integer-coded keys and dense NumPy rate
+    arrays. Key combinations missing from a reference table hold NaN.
     """
-    df = media_inputs.copy()
 
-    # Map our UI names to the Excel 'Type' values
-    type_map = {
-        "Major": "Major national media",
-        "Industry": "Industry-specific",
-        "Local/Niche": "Local/niche",
-        "Tier 1": "1",
-        "Tier 2": "2",
-        "Tier 3": "3",
-    }
+    version: int
+    media_categories: _KeyCodec
+    media_types: _KeyCodec
+    media_rates: np.ndarray          # (category, type)
+    creator_platforms: _KeyCodec
+    creator_types: _KeyCodec
+    creator_tiers: _KeyCodec
+    creator_rates: np.ndarray        # (platform, type, tier)
+    community_platforms: _KeyCodec
+    community_weights: np.ndarray    # (platform, 4) in COMMUNITY_WEIGHT_COLUMNS order
+
+    def media_rate(self, channel_types: Any, tier_names: Any) -> np.ndarray:
+        return _gather(
+            self.media_rates,
+            self.media_categories.encode(channel_types),
+            self.media_types.encode(tier_names),
+        )
 
-    df["Category"] = df["channel_type"]
-    df["TypeForJoin"] = df["tier_name"].map(type_map).fillna(df["tier_name"])
-    return df
+    def creator_rate(self, platforms: Any, content_types: Any, tiers: Any) -> np.ndarray:
+        return _gather(
+            self.creator_rates,
+            self.creator_platforms.encode(platforms),
+            self.creator_types.encode(content_types),
+            self.creator_tiers.encode(tiers),
+        )
 
+    def community_weight(self, platforms: Any) -> np.ndarray:
+        return _gather(self.community_weights, self.community_platforms.encode(platforms))
 
-def calculate_media_echo(media_inputs: pd.DataFrame) -> float:
+
+def _gather(table: np.ndarray, *codes: np.ndarray) -> np.ndarray:
     """
-    media_inputs columns from Streamlit:
-        - channel_type   ('Online Article' / 'Social Media')
-        - tier_name      ('Major', 'Industry', 'Local/Niche', 'Tier 1', 'Tier 2', 'Tier 3')
-        - mentions
+    table[codes] per row (a row of the table's remaining axes when it has
+    more axes than codes), NaN where a code is unknown (-1) or outside the
+    table, as it is for every row when the reference table is empty.
     """
-    if media_inputs is None or media_inputs.empty:
-        return 0.0
+    matched = np.logical_and.reduce([(code >= 0) & (code < size) for code, size in zip(codes, table.shape)])
+    rates = np.full(matched.shape + table.shape[len(codes):], np.nan)
+    if matched.any():
+        rates[matched] = table[tuple(code[matched] for code in codes)]
+    return rates
+
 
-    media_tier_df, _, _ = load_reference_tables()
+def _dense_table(frame: pd.DataFrame, key_cols: list[str], codecs: list[_KeyCodec], value_col: str) -> np.ndarray:
+    table = np.full(tuple(len(codec) for codec in codecs), np.nan)
+    positions = tuple(codec.encode(frame[col]) for col, codec in zip(key_cols, codecs))
+    table[positions] = frame[value_col].to_numpy(dtype=float)
+    return table
 
-    df_norm = _normalize_media_inputs(media_inputs)
 
-    merged = df_norm.merge(
-        media_tier_df,
-        left_on=["Category", "TypeForJoin"],
-        right_on=["Category", "Type"],
-        how="left",
+def compile_rate_lookup(media_tier_df: pd.DataFrame,
+                        creator_rate_df: pd.DataFrame,
+                        cpe_df: pd.DataFrame,
+                        version: int = 0) -> RateLookup:
+    """
+    Build a RateLookup from the frames returned by load_reference_tables().
+    """
+    media_categories = _KeyCodec(media_tier_df["Category"])
+    media_types = _KeyCodec(media_tier_df["Type"], MEDIA_TYPE_MAP)
+    creator_platforms = _KeyCodec(creator_rate_df["Platform"])
+    creator_types = _KeyCodec(creator_rate_df["Type"], CREATOR_TYPE_MAP)
+    creator_tiers = _KeyCodec(creator_rate_df["Tier"])
+    community_platforms = _KeyCodec(cpe_df["platform"])
+
+    community_weights = np.zeros((len(community_platforms), len(COMMUNITY_WEIGHT_COLUMNS)))
+    community_weights[community_platforms.encode(cpe_df["platform"])] = (
+        cpe_df[COMMUNITY_WEIGHT_COLUMNS].fillna(0).to_numpy(dtype=float)
     )
 
-    rate_col = "tier_value"
+    return RateLookup(
+        version=version,
+        media_categories=media_categories,
+        media_types=media_types,
+        media_rates=_dense_table(
+            media_tier_df, ["Category", "Type"], [media_categories, media_types], "tier_value"
+        ),
+        creator_platforms=creator_platforms,
+        creator_types=creator_types,
+        creator_tiers=creator_tiers,
+        creator_rates=_dense_table(
+            creator_rate_df,
+            ["Platform", "Type", "Tier"],
+            [creator_platforms, creator_types, creator_tiers],
+            "Rate",
+        ),
+        community_platforms=community_platforms,
+        community_weights=community_weights,
+    )
 
-    if rate_col not in merged.columns:
-        return 0.0
 
-    merged["mentions"] = merged["mentions"].fillna(0)
-    merged[rate_col] = merged[rate_col].fillna(0)
+def get_rate_lookup() -> RateLookup:
+    """
+    Compiled lookup for the current reference tables.
+    Costs a single version read unless the rate card has changed.
+    """
+    return _compile_rate_lookup(fetch_rate_card_version())
 
-    merged["value"] = merged["mentions"] * merged[rate_col]
-    return float(merged["value"].sum())
 
+@lru_cache(maxsize=1)
+def _compile_rate_lookup(version: int) -> RateLookup:
+    return compile_rate_lookup(*_load_reference_tables(version), version=version)
+
+
+# Frames up to this many rows are read with one to_numpy() call: each
+# df[column] costs tens of microseconds, which dominates scoring an
+# interactive campaign of a few rows.
+SMALL_FRAME_ROWS = 2048
 
-# ========= CREATOR ECHO =========
 
-def _normalize_creator_inputs(creator_inputs: pd.DataFrame) -> pd.DataFrame:
+def _frame_columns(df: pd.DataFrame, keys: list[str], numbers: list[str] = ()) -> list[np.ndarray | None]:
+    """
+    The `keys` columns of df as NumPy arrays (KeyError when one is absent),
+    then the `numbers` columns, None for an absent one.
+    """
+    missing = [col for col in keys if col not in df.columns]
+    if missing:
+        raise KeyError(missing[0])
+    columns = [*keys, *numbers]
+    if len(df) <= SMALL_FRAME_ROWS:
+        values = df.to_numpy(dtype=object)
+        positions = {column: i for i, column in enumerate(df.columns)}
+        return [values[:, positions[col]] if col in positions else None for col in columns]
+    return [df[col].to_numpy() if col in df.columns else None for col in columns]
+
+
+def _numeric_values(values: np.ndarray | None, size: int) -> np.ndarray:
+    if values is None:
+        return np.zeros(size)
+    try:
+        numbers = np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        numbers = np.asarray(pd.to_numeric(values, errors="coerce"), dtype=float)
+    if np.isfinite(numbers).all():
+        return numbers
+    return np.nan_to_num(numbers, nan=0.0)
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    return _numeric_values(_frame_columns(df, [], [column])[0], len(df))
+
+
+def _unmatched_keys(keys: list[np.ndarray], mask: np.ndarray) -> list[tuple]:
+    """
+    Distinct input keys that found no reference rate but carried activity,
+    i.e. value that would otherwise be zero-filled without notice.
     """
-    Map UI 'content_type' to Excel 'Type'.
+    if not mask.any():
+        return []
+    columns = [np.asarray(values, dtype=object)[mask] for values in keys]
+    return list(dict.fromkeys(tuple(str(v) for v in key) for key in zip(*columns)))
 
-    UI content_type:
-        - 'Static Post'
-        - 'Video Post'
 
-    Excel 'creator_rate' Type:
-        - 'Static/General Post'
-        - 'Video Post'
+# ========= MEDIA ECHO =========
+
+def media_contributions(media_inputs: pd.DataFrame,
+                        lookup: RateLookup | None = None) -> tuple[np.ndarray, list[tuple]]:
+    """
+    Per-row media echo values plus the (channel_type, tier_name) keys that had
+    mentions but no rate in media_rate_reference.
     """
-    df = creator_inputs.copy()
+    if media_inputs is None or media_inputs.empty:
+        return np.zeros(0), []
 
-    type_map = {
-        "Static Post": "Static/General Post",
-        "Static/General Post": "Static/General Post",
-        "Video Post": "Video Post",
-    }
+    lookup = lookup or get_rate_lookup()
+    channel_types, tier_names, mentions = _frame_columns(media_inputs, ["channel_type", "tier_name"], ["mentions"])
+    rates = lookup.media_rate(channel_types, tier_names)
+    mentions = _numeric_values(mentions, len(media_inputs))
+    missing = np.isnan(rates)
+    unmatched = _unmatched_keys([channel_types, tier_names], missing & (mentions != 0))
+    return mentions * np.where(missing, 0.0, rates), unmatched
+
+
+def calculate_media_echo(media_inputs: pd.DataFrame) -> float:
+    """
+    media_inputs columns from Streamlit:
+        - channel_type   ('Online Article' / 'Social Media')
+        - tier_name      ('Major', 'Industry', 'Local/Niche', 'Tier 1', 'Tier 2', 'Tier 3')
+        - mentions
+    """
+    values, _ = media_contributions(media_inputs)
+    return float(values.sum())
+
+
+# ========= CREATOR ECHO =========
+
+def creator_contributions(creator_inputs: pd.DataFrame,
+                          lookup: RateLookup | None = None) -> tuple[np.ndarray, list[tuple]]:
+    """
+    Per-row creator echo values plus the (platform, content_type, tier) keys
+    that had posts but no rate in creator_rate_reference.
+    """
+    if creator_inputs is None or creator_inputs.empty:
+        return np.zeros(0), []
 
-    df["TypeForJoin"] = df["content_type"].map(type_map).fillna(df["content_type"])
-    return df
+    lookup = lookup or get_rate_lookup()
+    platforms, content_types, tiers, posts = _frame_columns(
+        creator_inputs, ["platform", "content_type", "tier"], ["num_posts"]
+    )
+    rates = lookup.creator_rate(platforms, content_types, tiers)
+    posts = _numeric_values(posts, len(creator_inputs))
+    missing = np.isnan(rates)
+    unmatched = _unmatched_keys([platforms, content_types, tiers], missing & (posts != 0))
+    return posts * np.where(missing, 0.0, rates), unmatched
 
 
 def calculate_creator_echo(creator_inputs: pd.DataFrame) -> float:
@@ -149,97 +350,48 @@ def calculate_creator_echo(creator_inputs: pd.DataFrame) -> float:
         - tier           ('Mega', 'Macro', 'Micro', 'Nano')
         - num_posts
     """
-    if creator_inputs is None or creator_inputs.empty:
-        return 0.0
-
-    _, creator_rate_df, _ = load_reference_tables()
+    values, _ = creator_contributions(creator_inputs)
+    return float(values.sum())
 
-    df_norm = _normalize_creator_inputs(creator_inputs)
 
-    merged = df_norm.merge(
-        creator_rate_df,
-        left_on=["platform", "TypeForJoin", "tier"],
-        right_on=["Platform", "Type", "Tier"],
-        how="left",
-    )
-
-    rate_col = "Rate"  # from creator_rate sheet
-
-    if rate_col not in merged.columns:
-        return 0.0
-
-    merged["num_posts"] = merged["num_posts"].fillna(0)
-    merged[rate_col] = merged[rate_col].fillna(0)
+# ========= COMMUNITY ECHO =========
 
-    merged["value"] = merged["num_posts"] * merged[rate_col]
-    return float(merged["value"].sum())
+def community_contributions(comm_inputs: pd.DataFrame,
+                            lookup: RateLookup | None = None) -> tuple[np.ndarray, list[tuple]]:
+    """
+    Per-row community echo values plus the platforms that had engagement but
+    no weights in community_rate_reference.
+    """
+    if comm_inputs is None or comm_inputs.empty:
+        return np.zeros(0), []
 
+    lookup = lookup or get_rate_lookup()
+    platforms, *inputs = _frame_columns(comm_inputs, ["platform"], COMMUNITY_INPUT_COLUMNS)
+    weights = lookup.community_weight(platforms)
+    # content_creation may be absent when the UI doesn't send it yet
+    activity = np.column_stack([_numeric_values(values, len(comm_inputs)) for values in inputs])
+    missing = np.isnan(weights[:, 0])
+    unmatched = _unmatched_keys([platforms], missing & activity.any(axis=1))
+    return np.einsum("ij,ij->i", activity, np.nan_to_num(weights, nan=0.0)), unmatched
 
-# ========= COMMUNITY ECHO =========
 
 def calculate_community_echo(comm_inputs: pd.DataFrame) -> float:
     """
     comm_inputs from Streamlit:
         - platform
-        - content_creation (number of posts/videos by community)  [we'll add this in app.py]
+        - content_creation (number of posts/videos by community)
         - passive_engagement
         - active_engagement
         - amplification
 
-    cpe_df columns (from Excel):
-        - 'Platform'
-        - 'Content Creation (New Posts, Videos)'
-        - 'Passive Engagement (Likes, Reactions)'
-        - 'Active Engagement (Comments, Replies)'
-        - 'Amplification (Shares, Retweets)'
+    Weights come from community_rate_reference:
+        - weight_content        (Content Creation: new posts, videos)
+        - weight_passive        (Passive Engagement: likes, reactions)
+        - weight_active         (Active Engagement: comments, replies)
+        - weight_amplification  (Amplification: shares, retweets)
     """
-    if comm_inputs is None or comm_inputs.empty:
-        return 0.0
-
-    # Make sure the column exists even if UI doesn't send it yet
-    if "content_creation" not in comm_inputs.columns:
-        comm_inputs = comm_inputs.copy()
-        comm_inputs["content_creation"] = 0
-
-    _, _, cpe_df = load_reference_tables()
-
-    merged = comm_inputs.merge(
-        cpe_df,
-        on="platform",
-        how="left",
-    )
-
-    for col in [
-        "content_creation",
-        "passive_engagement",
-        "active_engagement",
-        "amplification",
-        "weight_content",
-        "weight_passive",
-        "weight_active",
-        "weight_amplification",
-    ]:
-        if col not in merged.columns:
-            merged[col] = 0
-
-    merged["content_creation"] = merged["content_creation"].fillna(0)
-    merged["passive_engagement"] = merged["passive_engagement"].fillna(0)
-    merged["active_engagement"] = merged["active_engagement"].fillna(0)
-    merged["amplification"] = merged["amplification"].fillna(0)
-
-    merged["weight_content"] = merged["weight_content"].fillna(0)
-    merged["weight_passive"] = merged["weight_passive"].fillna(0)
-    merged["weight_active"] = merged["weight_active"].fillna(0)
-    merged["weight_amplification"] = merged["weight_amplification"].fillna(0)
-
-    merged["value"] = (
-        merged["content_creation"] * merged["weight_content"]
-        + merged["passive_engagement"] * merged["weight_passive"]
-        + merged["active_engagement"] * merged["weight_active"]
-        + merged["amplification"] * merged["weight_amplification"]
-    )
-
-    return float(merged["value"].sum())
+    values, _ = community_contributions(comm_inputs)
+    return float(values.sum())
 
 
 # ========= MAIN CAMPAIGN CALC =========
@@ -247,9 +399,11 @@ def calculate_community_echo(comm_inputs: pd.DataFrame) -> float:
 def calculate_campaign(inv: float,
                        media_df: pd.DataFrame,
                        creator_df: pd.DataFrame,
-                       comm_df: pd.DataFrame) -> dict:
+                       comm_df: pd.DataFrame,
+                       lookup: RateLookup | None = None) -> dict:
     """
-    Main function used by app.py
+    Main function used by app.py. Scores with `lookup` when given, else the
+    current rate card (one version read per call).
     Returns:
         - media
         - creator
@@ -257,10 +411,18 @@ def calculate_campaign(inv: float,
         - tev
         - roi_m
         - roi_pct
+        - unmatched  (input keys with activity but no reference rate, per echo)
+        - rate_card_version
     """
-    media_val = calculate_media_echo(media_df)
-    creator_val = calculate_creator_echo(creator_df)
-    comm_val = calculate_community_echo(comm_df)
+    if lookup is None:
+        lookup = get_rate_lookup()
+    media_values, media_unmatched = media_contributions(media_df, lookup)
+    creator_values, creator_unmatched = creator_contributions(creator_df, lookup)
+    comm_values, comm_unmatched = community_contributions(comm_df, lookup)
+
+    media_val = float(media_values.sum())
+    creator_val = float(creator_values.sum())
+    comm_val = float(comm_values.sum())
 
     tev = media_val + creator_val + comm_val
 
@@ -278,4 +440,239 @@ def calculate_campaign(inv: float,
         "tev": tev,
         "roi_m": roi_m,
         "roi_pct": roi_pct,
+        "unmatched": {
+            "media": media_unmatched,
+            "creator": creator_unmatched,
+            "community": comm_unmatched,
+        },
+        "rate_card_version": lookup.version,
     }
+
+
+# ========= INCREMENTAL CALC =========
+
+ECHO_ROW_FIELDS = {
+    "media": ["channel_type", "tier_name", "mentions"],
+    "creator": ["platform", "content_type", "tier", "num_posts"],
+    "community": ["platform"] + COMMUNITY_INPUT_COLUMNS,
+}
+
+
+def _to_float(value: Any) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(number) else number
+
+
+def _scalar_rate(table: np.ndarray, *codes: int) -> float | None:
+    """
+    The rate at `codes`, None when a key is unknown or the cell has no rate.
+    """
+    if any(not 0 <= code < size for code, size in zip(codes, table.shape)):
+        return None
+    rate = table[codes]
+    return None if math.isnan(rate) else float(rate)
+
+
+class TevLedger:
+    """
+    Per-row echo contributions for the campaign being edited.
+
+    Rows are addressed by a caller-chosen key (the editor row position in
+    app.py). Setting a row re-scores only that row and moves the totals by
+    its delta, so a running TEV stays O(1) per edit. Each row also keeps its
+    key when it has activity but no reference rate, for the unmatched report.
+    """
+
+    def __init__(self, lookup: RateLookup | None = None):
+        self.lookup = lookup or get_rate_lookup()
+        self._rows: dict[str, dict[Hashable, tuple[tuple, float, tuple | None]]] = {
+            echo: {} for echo in ECHO_ROW_FIELDS
+        }
+        self.totals = {echo: 0.0 for echo in ECHO_ROW_FIELDS}
+
+    @property
+    def version(self) -> int:
+        return self.lookup.version
+
+    @property
+    def tev(self) -> float:
+        return self.totals["media"] + self.totals["creator"] + self.totals["community"]
+
+    def row_value(self, echo: str, row: Mapping[str, Any]) -> float:
+        return self._score(echo, row)[0]
+
+    def _score(self, echo: str, row: Mapping[str, Any]) -> tuple[float, tuple | None]:
+        """
+        The row's echo value, and its key if it has activity but no rate.
+        """
+        lookup = self.lookup
+        if echo == "media":
+            rate = _scalar_rate(
+                lookup.media_rates,
+                lookup.media_categories.code(row.get("channel_type")),
+                lookup.media_types.code(row.get("tier_name")),
+            )
+            quantity = _to_float(row.get("mentions"))
+        elif echo == "creator":
+            rate = _scalar_rate(
+                lookup.creator_rates,
+                lookup.creator_platforms.code(row.get("platform")),
+                lookup.creator_types.code(row.get("content_type")),
+                lookup.creator_tiers.code(row.get("tier")),
+            )
+            quantity = _to_float(row.get("num_posts"))
+        elif echo == "community":
+            code = lookup.community_platforms.code(row.get("platform"))
+            activity = [_to_float(row.get(col)) for col in COMMUNITY_INPUT_COLUMNS]
+            if code < 0:
+                return 0.0, (str(row.get("platform")),) if any(activity) else None
+            weights = lookup.community_weights[code]
+            return float(sum(value * weight for value, weight in zip(activity, weights))), None
+        else:
+            raise ValueError(f"Unknown echo '{echo}'.")
+        if rate is None:
+            key = tuple(str(row.get(field)) for field in ECHO_ROW_FIELDS[echo][:-1])
+            return 0.0, key if quantity else None
+        return quantity * rate, None
+
+    def set_row(self, echo: str, key: Hashable, row: Mapping[str, Any]) -> float:
+        """
+        Insert or update one row and return the change it made to TEV.
+        """
+        rows = self._rows[echo]
+        signature = tuple(row.get(field) for field in ECHO_ROW_FIELDS[echo])
+        previous = rows.get(key)
+        if previous is not None and previous[0] == signature:
+            return 0.0
+        value, unmatched = self._score(echo, row)
+        delta = value - (previous[1] if previous is not None else 0.0)
+        rows[key] = (signature, value, unmatched)
+        self.totals[echo] += delta
+        return delta
+
+    def remove_row(self, echo: str, key: Hashable) -> float:
+        previous = self._rows[echo].pop(key, None)
+        if previous is None:
+            return 0.0
+        self.totals[echo] -= previous[1]
+        return -previous[1]
+
+    def sync(self, echo: str, rows: Iterable[Mapping[str, Any]]) -> float:
+        """
+        Bring one echo in line with the editor rows (keyed by position).
+        Unchanged rows are skipped; returns the net change to TEV.
+        """
+        delta = 0.0
+        seen = set()
+        for key, row in enumerate(rows):
+            seen.add(key)
+            delta += self.set_row(echo, key, row)
+        for key in [key for key in self._rows[echo] if key not in seen]:
+            delta += self.remove_row(echo, key)
+        return delta
+
+    def unmatched(self) -> dict[str, list[tuple]]:
+        """
+        Per echo, the distinct keys of rows with activity but no reference
+        rate, as calculate_campaign reports them.
+        """
+        return {
+            echo: list(dict.fromkeys(entry[2] for entry in rows.values() if entry[2] is not None))
+            for echo, rows in self._rows.items()
+        }
+
+    def result(self, inv: float) -> dict:
+        """
+        Same keys as calculate_campaign.
+        """
+        tev = self.tev
+        if inv and inv > 0:
+            roi_m = tev / inv
+            roi_pct = (tev - inv) / inv * 100
+        else:
+            roi_m = 0.0
+            roi_pct = 0.0
+        return {
+            "media": self.totals["media"],
+            "creator": self.totals["creator"],
+            "community": self.totals["community"],
+            "tev": tev,
+            "roi_m": roi_m,
+            "roi_pct": roi_pct,
+            "unmatched": self.unmatched(),
+            "rate_card_version": self.version,
+        }
+
+
+# ========= PORTFOLIO CALC =========
+
+PORTFOLIO_COLUMNS = ["campaign_id", "media", "creator", "community", "tev", "roi_m", "roi_pct"]
+
+
+def _roi(tev: np.ndarray, inv: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    funded = inv > 0
+    safe_inv = np.where(funded, inv, 1.0)
+    roi_m = np.where(funded, tev / safe_inv, 0.0)
+    roi_pct = np.where(funded, (tev - inv) / safe_inv * 100, 0.0)
+    return roi_m, roi_pct
+
+
+def calculate_campaigns(investment: pd.Series | dict,
+                        media_df: pd.DataFrame | None = None,
+                        creator_df: pd.DataFrame | None = None,
+                        comm_df: pd.DataFrame | None = None,
+                        lookup: RateLookup | None = None) -> pd.DataFrame:
+    """
+    Batch version of calculate_campaign for many campaigns at once.
+
+    investment maps campaign_id -> INV. The entry frames are long format: the
+    same columns calculate_campaign expects plus a campaign_id column.
+    Returns one row per campaign (campaign_id ascending) with
+    media, creator, community, tev, roi_m and roi_pct. Scores with `lookup`
+    when given, else the current rate card.
+    """
+    inv_series = pd.Series(investment, dtype=float)
+    entries = {
+        "media": (media_df, media_contributions),
+        "creator": (creator_df, creator_contributions),
+        "community": (comm_df, community_contributions),
+    }
+    present = {
+        name: (df, contributions)
+        for name, (df, contributions) in entries.items()
+        if df is not None and not df.empty
+    }
+
+    campaign_ids = pd.Index(
+        np.concatenate(
+            [inv_series.index.to_numpy()]
+            + [df["campaign_id"].to_numpy() for df, _ in present.values()]
+        )
+    ).unique().sort_values()
+    size = len(campaign_ids)
+
+    if lookup is None:
+        lookup = get_rate_lookup()
+    totals = {name: np.zeros(size) for name in entries}
+    for name, (df, contributions) in present.items():
+        values, _ = contributions(df, lookup)
+        codes = campaign_ids.get_indexer(df["campaign_id"].to_numpy())
+        totals[name] = np.bincount(codes, weights=values, minlength=size)
+
+    tev = totals["media"] + totals["creator"] + totals["community"]
+    inv = inv_series.reindex(campaign_ids).fillna(0.0).to_numpy()
+    roi_m, roi_pct = _roi(tev, inv)
+
+    return pd.DataFrame(
+        {
+            "campaign_id": campaign_ids.to_numpy(),
+            **totals,
+            "tev": tev,
+            "roi_m": roi_m,
+            "roi_pct": roi_pct,
+        },
+        columns=PORTFOLIO_COLUMNS,
+    )
@@ -0,0 +1,95 @@
+"""
+Cost efficiency of the creators in one Fanpage Karma upload.
+
+Starts from each creator's (profile and tier) summed fee, engagements and
+EMV, which SQLite totals over creator_upload_rows from a covering index, and
+gives each creator's cost per engagement (fee / engagements) and EMV per unit
+of fee. Per tier, the same ratios are reported in aggregate and as
+P10/P50/P90 across that tier's creators.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from db import creator_upload_totals
+
+PERCENTILES = (10, 50, 90)
+# Tier rows come in this order; tiers outside it follow alphabetically.
+TIER_ORDER = ["Mega", "Macro", "Mid-tier", "Micro", "Nano"]
+_SUMS = ["fee", "engagements", "emv"]
+
+
+@dataclass(frozen=True)
+class CreatorEfficiency:
+    """
+    totals: posts, creators, fee, engagements, emv, cpe, emv_per_fee.
+    creators: one row per (tier, profile) with its posts, sums and ratios,
+        best EMV per fee first.
+    tiers: one row per tier with creators, posts, sums, aggregate ratios and
+        cpe_p10..p90 / emv_per_fee_p10..p90 across its creators.
+    """
+
+    totals: dict[str, Any]
+    creators: pd.DataFrame
+    tiers: pd.DataFrame
+
+
+def _ratio(numerator: Any, denominator: Any) -> np.ndarray:
+    """
+    numerator / denominator, NaN where the denominator is not positive.
+    """
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def _with_ratios(frame: pd.DataFrame) -> pd.DataFrame:
+    frame["cpe"] = _ratio(frame["fee"], frame["engagements"])
+    frame["emv_per_fee"] = _ratio(frame["emv"], frame["fee"])
+    return frame
+
+
+def creator_efficiency(creators: pd.DataFrame) -> CreatorEfficiency:
+    """
+    Efficiency from per-creator sums: one row per (tier, profile) with
+    posts, fee, engagements and emv, as creator_upload_totals() returns.
+    """
+    creators = creators[["tier", "profile", "posts", *_SUMS]].copy()
+    creators[_SUMS] = creators[_SUMS].apply(pd.to_numeric, errors="coerce").fillna(0.0)
+    creators = _with_ratios(creators).sort_values("emv_per_fee", ascending=False, kind="stable")
+
+    by_tier = creators.groupby("tier", sort=False)
+    tiers = _with_ratios(
+        by_tier.agg(
+            creators=("profile", "size"), posts=("posts", "sum"), fee=("fee", "sum"),
+            engagements=("engagements", "sum"), emv=("emv", "sum"),
+        )
+    )
+    spread = by_tier[["cpe", "emv_per_fee"]].quantile([p / 100 for p in PERCENTILES]).unstack()
+    spread.columns = [f"{metric}_p{round(q * 100)}" for metric, q in spread.columns]
+    tiers = tiers.join(spread)
+    order = [tier for tier in TIER_ORDER if tier in tiers.index]
+    tiers = tiers.loc[order + sorted(set(tiers.index) - set(order))].rename_axis("tier").reset_index()
+
+    fee, engagements, emv = (float(creators[column].sum()) for column in _SUMS)
+    totals = {
+        "posts": int(creators["posts"].sum()),
+        "creators": int(creators["profile"].nunique()),
+        "fee": fee,
+        "engagements": engagements,
+        "emv": emv,
+        "cpe": float(_ratio(fee, engagements)),
+        "emv_per_fee": float(_ratio(emv, fee)),
+    }
+    return CreatorEfficiency(totals, creators.reset_index(drop=True), tiers)
+
+
+def upload_efficiency(upload_id: int) -> CreatorEfficiency:
+    """
+    creator_efficiency() over one upload's rows in creator_upload_rows.
+    """
+    return creator_efficiency(creator_upload_totals(upload_id))
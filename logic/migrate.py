@@ -0,0 +1,51 @@
+"""
+Apply pending schema migrations ahead of the app.
+
+The app migrates on its first connection anyway; running this first moves a
+long online rewrite (e.g. a large creator_echo_entries) out of a user's
+request and prints its progress. An interrupted run resumes where it left off.
+
+    python -m logic.migrate                      # migrate to the latest version
+    python -m logic.migrate --status             # print versions, change nothing
+    python -m logic.migrate --chunk-size 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Optional
+
+import db
+
+
+def _report(event: dict) -> None:
+    if "version" in event:
+        print(f"Applied migration {event['version']}: {event['description']}.")
+    else:
+        print(f"  {event['table']}: copied through id {event['last_id']:,} of {event['until']:,}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--status", action="store_true", help="Only print the current and latest version.")
+    parser.add_argument("--chunk-size", type=int, default=db.MIGRATION_CHUNK_SIZE,
+                        help="Rows copied per transaction by online rewrites.")
+    args = parser.parse_args(argv)
+
+    current = db.schema_version()
+    print(f"Schema version {current}, latest {db.SCHEMA_VERSION}.")
+    if args.status:
+        for migration in db.MIGRATIONS:
+            state = "applied" if migration.version <= current else "pending"
+            print(f"  {migration.version:>3}  {state:<8} {migration.description}")
+        return 0
+
+    db.MIGRATION_CHUNK_SIZE = args.chunk_size
+    applied = db.migrate_schema(_report)
+    print(f"Applied {len(applied)} migration(s)." if applied else "Nothing to migrate.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Creator budget-mix optimizer.
+
+Maximise creator echo (sum of posts x creator rate) under an investment
+ceiling with per-option min/max post counts. The integer mix is a bounded
+knapsack, solved by dynamic programming over the budget in cost units: each
+option's post range is split into 1, 2, 4, ... post bundles and taken as 0/1
+items. With a single budget constraint the LP optimum is the greedy fill by
+echo-per-baht ratio; it is reported as an upper bound on the integer mix.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from logic.calculator import get_rate_lookup
+from logic.uploads import get_allowed_content_options
+
+CANDIDATE_COLUMNS = ["platform", "content_type", "tier", "cost_per_post", "min_posts", "max_posts"]
+# Most budget cells the knapsack table may have. Past it the cost unit grows
+# and costs round up to it: the mix stays within budget, and whatever the
+# rounding leaves unspent is topped up with whole posts by echo per baht.
+MAX_BUDGET_UNITS = 100_000
+
+
+def _cost_unit(cost: np.ndarray, budget: float) -> float:
+    """
+    The largest whole-baht step every cost is a multiple of, coarsened so
+    `budget` spans at most MAX_BUDGET_UNITS of them.
+    """
+    whole = np.ceil(cost - 1e-9).astype(np.int64)
+    unit = float(np.gcd.reduce(whole))
+    return max(unit, math.ceil(budget / MAX_BUDGET_UNITS))
+
+
+def _knapsack_posts(rates: np.ndarray, weights: np.ndarray, room: np.ndarray, capacity: int) -> np.ndarray:
+    """
+    Whole posts per option, each at most `room`, maximising rates @ posts
+    with weights @ posts <= capacity (weights and capacity in cost units).
+    """
+    posts = np.zeros(len(rates))
+    bundles = []
+    for i in np.flatnonzero(rates > 0):
+        left = int(min(room[i], capacity // weights[i]))
+        size = 1
+        while left > 0:
+            take = min(size, left)
+            bundles.append((i, take))
+            left -= take
+            size *= 2
+    if not bundles or capacity <= 0:
+        return posts
+
+    best = np.zeros(capacity + 1)
+    # Bit-packed: one row per bundle, set where taking it improved the cell.
+    taken = np.zeros((len(bundles), (capacity + 8) // 8), dtype=np.uint8)
+    for j, (i, count) in enumerate(bundles):
+        weight = int(weights[i]) * count
+        improved = np.zeros(capacity + 1, dtype=bool)
+        candidate = best[: capacity + 1 - weight] + rates[i] * count
+        improved[weight:] = candidate > best[weight:]
+        best[weight:] = np.where(improved[weight:], candidate, best[weight:])
+        taken[j] = np.packbits(improved)
+
+    cell = capacity
+    for j in range(len(bundles) - 1, -1, -1):
+        if taken[j, cell // 8] >> (7 - cell % 8) & 1:
+            i, count = bundles[j]
+            posts[i] += count
+            cell -= int(weights[i]) * count
+    return posts
+
+
+def suggest_creator_mix(budget: float, candidates: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """
+    candidates: one row per (platform, content_type, tier) option with
+    cost_per_post and optional min_posts / max_posts (default 0 / unbounded).
+    Options whose content type the platform does not allow (static posts on
+    PLATFORMS_DISALLOW_STATIC) are dropped.
+
+    Returns the remaining candidates with rate, num_posts, spend and value
+    columns, and a summary with tev, spend, remaining and lp_bound (the
+    fractional optimum, an upper bound on any integer mix).
+    """
+    if candidates is None or candidates.empty:
+        raise ValueError("Add at least one creator option to optimise.")
+    allowed = [
+        content_type in get_allowed_content_options(platform)
+        for platform, content_type in zip(candidates["platform"], candidates["content_type"])
+    ]
+    mix = candidates[allowed].reset_index(drop=True)
+    if mix.empty:
+        raise ValueError("None of the creator options is a content type its platform allows.")
+    for column, default in (("min_posts", 0.0), ("max_posts", np.inf)):
+        if column not in mix.columns:
+            mix[column] = default
+        mix[column] = pd.to_numeric(mix[column], errors="coerce").fillna(default)
+    cost = pd.to_numeric(mix["cost_per_post"], errors="coerce").to_numpy(dtype=float)
+    if np.isnan(cost).any() or (cost <= 0).any():
+        raise ValueError("Every option needs a cost per post above 0.")
+
+    rates = get_rate_lookup().creator_rate(
+        mix["platform"].to_numpy(), mix["content_type"].to_numpy(), mix["tier"].to_numpy()
+    )
+    rates = np.nan_to_num(rates, nan=0.0)
+    low = np.floor(mix["min_posts"].to_numpy(dtype=float).clip(min=0))
+    high = np.floor(mix["max_posts"].to_numpy(dtype=float))
+    if (high < low).any():
+        raise ValueError("max_posts must be at least min_posts.")
+
+    remaining = float(budget) - float(cost @ low)
+    if remaining < 0:
+        raise ValueError("The minimum post counts already exceed the investment ceiling.")
+
+    lp_bound = float(rates @ low)
+    lp_remaining = remaining
+    for i in np.argsort(-(rates / cost), kind="stable"):
+        if rates[i] <= 0:
+            break
+        lp_take = min(high[i] - low[i], lp_remaining / cost[i])
+        lp_bound += lp_take * rates[i]
+        lp_remaining -= lp_take * cost[i]
+
+    unit = _cost_unit(cost, remaining)
+    weights = np.ceil(cost / unit - 1e-9)
+    posts = low + _knapsack_posts(rates, weights, high - low, math.floor(remaining / unit + 1e-9))
+    remaining = float(budget) - float(cost @ posts)
+    for i in np.argsort(-(rates / cost), kind="stable"):
+        if rates[i] <= 0:
+            break
+        take = min(high[i] - posts[i], math.floor(remaining / cost[i] + 1e-9))
+        if take > 0:
+            posts[i] += take
+            remaining -= take * cost[i]
+
+    mix["rate"] = rates
+    mix["num_posts"] = posts
+    mix["spend"] = posts * cost
+    mix["value"] = posts * rates
+    summary = {
+        "tev": float(mix["value"].sum()),
+        "spend": float(mix["spend"].sum()),
+        "remaining": float(remaining),
+        "lp_bound": float(lp_bound),
+    }
+    return mix, summary
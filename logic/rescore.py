@@ -0,0 +1,203 @@
+"""
+Bulk re-score of saved campaigns against the current rate card.
+
+Walks `campaigns` in id order, one chunk at a time: the chunk's entry rows are
+streamed from the three *_echo_entries tables, scored with
+calculate_campaigns(), and written back in a single transaction together with
+the job cursor in `rescore_jobs`. An interrupted run picks up after the last
+committed chunk when started again for the same rate card version.
+
+    python -m logic.rescore --chunk-size 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Optional
+
+import pandas as pd
+
+from db import get_conn
+from logic.calculator import RateLookup, calculate_campaigns, get_rate_lookup
+
+DEFAULT_CHUNK_SIZE = 2000
+
+_ENTRY_QUERIES = {
+    "media": """
+        SELECT campaign_id, channel_type, tier_name, mentions
+        FROM media_echo_entries
+        WHERE campaign_id BETWEEN ? AND ?
+    """,
+    "creator": """
+        SELECT campaign_id, platform, content_type, tier, num_posts
+        FROM creator_echo_entries
+        WHERE campaign_id BETWEEN ? AND ?
+    """,
+    "community": """
+        SELECT campaign_id, platform, content_creation, passive_engagement,
+               active_engagement, amplification
+        FROM community_echo_entries
+        WHERE campaign_id BETWEEN ? AND ?
+    """,
+}
+
+
+def _open_job(conn, version: int, resume: bool) -> tuple[int, int, int]:
+    if resume:
+        row = conn.execute(
+            """
+            SELECT id, last_campaign_id, campaigns_processed
+            FROM rescore_jobs
+            WHERE rate_card_version = ? AND finished_at IS NULL
+            ORDER BY id DESC
+            LIMIT 1
+            """,
+            (version,),
+        ).fetchone()
+        if row:
+            return int(row[0]), int(row[1]), int(row[2])
+    cur = conn.execute("INSERT INTO rescore_jobs (rate_card_version) VALUES (?)", (version,))
+    return int(cur.lastrowid), 0, 0
+
+
+def _score_chunk(conn, campaigns: pd.DataFrame, lookup: RateLookup) -> list[dict]:
+    first_id, last_id = int(campaigns["id"].iloc[0]), int(campaigns["id"].iloc[-1])
+    entries = {
+        name: pd.read_sql_query(query, conn, params=(first_id, last_id))
+        for name, query in _ENTRY_QUERIES.items()
+    }
+    scored_ids = pd.Index(
+        pd.concat([df["campaign_id"] for df in entries.values()], ignore_index=True).unique()
+    )
+    # Campaigns without any entry rows were typed in by hand; leave them alone.
+    campaigns = campaigns[campaigns["id"].isin(scored_ids)]
+    if campaigns.empty:
+        return []
+
+    scores = calculate_campaigns(
+        campaigns.set_index("id")["investment"],
+        entries["media"],
+        entries["creator"],
+        entries["community"],
+        lookup=lookup,
+    )
+    scores = scores[scores["campaign_id"].isin(campaigns["id"])]
+    return [
+        {
+            "id": int(row.campaign_id),
+            "media_echo": row.media,
+            "creator_echo": row.creator,
+            "community_echo": row.community,
+            "tev": row.tev,
+            "roi_m": row.roi_m,
+            "roi_pct": row.roi_pct,
+            "rate_card_version": lookup.version,
+        }
+        for row in scores.itertuples(index=False)
+    ]
+
+
+def rescore_campaigns(chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      resume: bool = True,
+                      progress: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Recompute the stored echo values, TEV and ROI of every campaign with
+    entry rows using the current rate card.
+
+    Memory is bounded by `chunk_size` campaigns. Each chunk commits its
+    updates and the job cursor atomically, so re-running with resume=True
+    continues where an interrupted job stopped. `progress` is called with the
+    running stats after every chunk. Returns the final stats.
+
+    Every chunk is scored with the lookup compiled when the job starts, so
+    the whole job matches the rate_card_version it is stamped with even if
+    the rate card changes mid-run.
+    """
+    lookup = get_rate_lookup()
+    version = lookup.version
+    started = time.perf_counter()
+    with get_conn() as conn:
+        job_id, cursor, processed = _open_job(conn, version, resume)
+    stats = {"job_id": job_id, "rate_card_version": version, "campaigns": processed, "updated": 0}
+
+    while True:
+        with get_conn() as conn:
+            campaigns = pd.read_sql_query(
+                """
+                SELECT id, investment
+                FROM campaigns
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+                """,
+                conn,
+                params=(cursor, chunk_size),
+            )
+            if campaigns.empty:
+                conn.execute(
+                    "UPDATE rescore_jobs SET finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    (job_id,),
+                )
+                break
+
+            updates = _score_chunk(conn, campaigns, lookup)
+            conn.executemany(
+                """
+                UPDATE campaigns
+                SET media_echo = :media_echo,
+                    creator_echo = :creator_echo,
+                    community_echo = :community_echo,
+                    tev = :tev,
+                    roi_m = :roi_m,
+                    roi_pct = :roi_pct,
+                    rate_card_version = :rate_card_version
+                WHERE id = :id
+                """,
+                updates,
+            )
+            cursor = int(campaigns["id"].iloc[-1])
+            processed += len(campaigns)
+            conn.execute(
+                """
+                UPDATE rescore_jobs
+                SET last_campaign_id = ?, campaigns_processed = ?
+                WHERE id = ?
+                """,
+                (cursor, processed, job_id),
+            )
+
+        stats["campaigns"] = processed
+        stats["updated"] += len(updates)
+        stats["seconds"] = time.perf_counter() - started
+        stats["campaigns_per_sec"] = stats["updated"] / stats["seconds"] if stats["seconds"] else 0.0
+        if progress:
+            progress(dict(stats))
+
+    stats["seconds"] = time.perf_counter() - started
+    stats["campaigns_per_sec"] = stats["updated"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Re-score saved campaigns with the current rate card.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--restart", action="store_true", help="Ignore an unfinished job and start over.")
+    args = parser.parse_args(argv)
+
+    def _report(stats: dict) -> None:
+        print(
+            f"{stats['campaigns']:>9,} campaigns scanned, {stats['updated']:,} re-scored "
+            f"({stats['campaigns_per_sec']:,.0f}/s)"
+        )
+
+    stats = rescore_campaigns(chunk_size=args.chunk_size, resume=not args.restart, progress=_report)
+    print(
+        f"Done: job {stats['job_id']} at rate card v{stats['rate_card_version']}, "
+        f"{stats['updated']:,} campaigns in {stats['seconds']:.1f}s "
+        f"({stats['campaigns_per_sec']:,.0f}/s)."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Maintenance for `campaign_rollups`, the per-owner client / market / month
+totals behind the library KPI cards.
+
+Triggers on `campaigns` keep the rollups current; this module checks them
+against a fresh aggregation of `campaigns` and rebuilds them when they drift,
+e.g. after rows were written with the triggers dropped:
+
+    python -m logic.rollups            # report differences, exit 1 if any
+    python -m logic.rollups --rebuild  # recompute from campaigns, then check
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from db import CAMPAIGN_ROLLUP_QUERY, ROLLUP_VALUES, get_conn, rebuild_campaign_rollups
+
+ROLLUP_KEY_COLUMNS = ["owner_id", "grain", "client", "market", "month"]
+ROLLUP_VALUE_COLUMNS = ["campaigns", *ROLLUP_VALUES, "roi_pct_sum"]
+# Incremental sums drift from a fresh SUM by float rounding only.
+DEFAULT_TOLERANCE = 1e-9
+
+
+def check_campaign_rollups(tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """
+    Returns one line per rollup row that is missing, extra, or differs from
+    the aggregate of `campaigns` by more than `tolerance` (relative). An empty
+    list means the rollups are consistent.
+    """
+    with get_conn() as conn:
+        expected = pd.read_sql_query(CAMPAIGN_ROLLUP_QUERY, conn)
+        actual = pd.read_sql_query(
+            f"SELECT {', '.join(ROLLUP_KEY_COLUMNS + ROLLUP_VALUE_COLUMNS)} FROM campaign_rollups", conn
+        )
+    merged = expected.merge(
+        actual, on=ROLLUP_KEY_COLUMNS, how="outer", suffixes=("_expected", "_actual"), indicator="found"
+    )
+
+    problems = []
+    for row in merged[merged["found"] != "both"].itertuples(index=False):
+        key = ", ".join(f"{col}={getattr(row, col)!r}" for col in ROLLUP_KEY_COLUMNS)
+        problems.append(f"{'missing' if row.found == 'left_only' else 'extra'} rollup row ({key})")
+
+    both = merged[merged["found"] == "both"]
+    for column in ROLLUP_VALUE_COLUMNS:
+        want = both[f"{column}_expected"].to_numpy(dtype=float)
+        got = both[f"{column}_actual"].to_numpy(dtype=float)
+        off = np.abs(want - got) > tolerance * np.maximum(np.abs(want), 1.0)
+        for row, before, after in zip(both[off].itertuples(index=False), want[off], got[off]):
+            key = ", ".join(f"{col}={getattr(row, col)!r}" for col in ROLLUP_KEY_COLUMNS)
+            problems.append(f"{column} ({key}): expected {before:,.6f}, found {after:,.6f}")
+    return problems
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check or rebuild the campaign rollup table.")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the rollups from campaigns first.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        started = time.perf_counter()
+        rows = rebuild_campaign_rollups()
+        print(f"Rebuilt {rows:,} rollup rows in {time.perf_counter() - started:.1f}s.")
+
+    problems = check_campaign_rollups(args.tolerance)
+    if problems:
+        print(f"{len(problems):,} rollup problem(s):")
+        for line in problems:
+            print(f"  {line}")
+        return 1
+    print("Campaign rollups match the campaigns table.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+What-if sweeps over a base campaign.
+
+TEV is linear in every input cell, so each swept cell contributes
+(new quantity - base quantity) * unit rate, and the whole Cartesian grid is a
+single NumPy broadcast of one 1-D delta vector per axis.
+"""
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from logic.calculator import (
+    COMMUNITY_INPUT_COLUMNS,
+    TevLedger,
+    _roi,
+    calculate_campaign,
+    get_rate_lookup,
+)
+
+ECHO_KEY_COLUMNS = {
+    "media": ["channel_type", "tier_name"],
+    "creator": ["platform", "content_type", "tier"],
+    "community": ["platform"],
+}
+ECHO_QUANTITY_COLUMNS = {
+    "media": ["mentions"],
+    "creator": ["num_posts"],
+    "community": COMMUNITY_INPUT_COLUMNS,
+}
+SWEEP_MODES = ("set", "add", "scale")
+
+
+@dataclass(frozen=True)
+class SweepAxis:
+    """
+    One dimension of a sweep.
+
+    echo is "media", "creator", "community" or "investment". For the echo
+    axes, key is the natural key of the input cell (see ECHO_KEY_COLUMNS) and
+    field the quantity column (defaults to the echo's only quantity column).
+    values are absolute ("set"), added to the base ("add") or multipliers of
+    the base ("scale").
+    """
+
+    echo: str
+    values: Sequence[float]
+    key: tuple = ()
+    field: str | None = None
+    mode: str = "set"
+
+    @property
+    def quantity_field(self) -> str | None:
+        if self.echo == "investment":
+            return None
+        if self.field:
+            return self.field
+        fields = ECHO_QUANTITY_COLUMNS[self.echo]
+        if len(fields) != 1:
+            raise ValueError(f"Pick a field for the {self.echo} axis: {', '.join(fields)}.")
+        return fields[0]
+
+    @property
+    def label(self) -> str:
+        if self.echo == "investment":
+            return "investment"
+        return f"{self.echo}:{' / '.join(map(str, self.key))}:{self.quantity_field}"
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    axes: list[SweepAxis]
+    values: list[np.ndarray]    # swept value per axis, as given
+    tev: np.ndarray             # shape = tuple(len(v) for v in values)
+    roi_m: np.ndarray
+    roi_pct: np.ndarray
+    base: dict
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Long format: one column per axis label plus tev, roi_m and roi_pct.
+        """
+        grids = np.meshgrid(*self.values, indexing="ij")
+        data = {axis.label: grid.ravel() for axis, grid in zip(self.axes, grids)}
+        data.update(tev=self.tev.ravel(), roi_m=self.roi_m.ravel(), roi_pct=self.roi_pct.ravel())
+        return pd.DataFrame(data)
+
+
+def _base_quantity(df: pd.DataFrame | None, axis: SweepAxis) -> float:
+    if df is None or df.empty or axis.quantity_field not in df.columns:
+        return 0.0
+    key_cols = ECHO_KEY_COLUMNS[axis.echo]
+    mask = np.logical_and.reduce(
+        [df[col].to_numpy(dtype=object) == value for col, value in zip(key_cols, axis.key)]
+    )
+    quantities = pd.to_numeric(df[axis.quantity_field], errors="coerce").fillna(0.0).to_numpy()
+    return float(quantities[mask].sum())
+
+
+def _swept_quantity(base: float, values: np.ndarray, mode: str) -> np.ndarray:
+    if mode == "set":
+        swept = values
+    elif mode == "add":
+        swept = base + values
+    elif mode == "scale":
+        swept = base * values
+    else:
+        raise ValueError(f"Unknown sweep mode '{mode}'; use one of {', '.join(SWEEP_MODES)}.")
+    return np.maximum(swept, 0.0)
+
+
+def sweep_campaign(inv: float,
+                   media_df: pd.DataFrame,
+                   creator_df: pd.DataFrame,
+                   comm_df: pd.DataFrame,
+                   axes: Sequence[SweepAxis]) -> SweepResult:
+    """
+    Evaluate TEV and ROI over the Cartesian grid of `axes` around the base
+    campaign. The grid is never materialised per point in Python.
+    """
+    axes = list(axes)
+    targets = [(axis.echo, tuple(axis.key), axis.quantity_field) for axis in axes]
+    if len(set(targets)) != len(targets):
+        raise ValueError("Each input cell (or investment) can only be swept once.")
+
+    base = calculate_campaign(inv, media_df, creator_df, comm_df)
+    ledger = TevLedger(get_rate_lookup())
+    frames = {"media": media_df, "creator": creator_df, "community": comm_df}
+
+    ndim = len(axes)
+    values = [np.asarray(axis.values, dtype=float) for axis in axes]
+    tev = np.full((1,) * ndim, base["tev"])
+    inv_grid = np.full((1,) * ndim, float(inv or 0.0))
+    for dim, (axis, axis_values) in enumerate(zip(axes, values)):
+        shape = [1] * ndim
+        shape[dim] = -1
+        if axis.echo == "investment":
+            inv_grid = _swept_quantity(float(inv or 0.0), axis_values, axis.mode).reshape(shape)
+            continue
+        if axis.echo not in frames:
+            raise ValueError(f"Unknown sweep echo '{axis.echo}'.")
+        key_cols = ECHO_KEY_COLUMNS[axis.echo]
+        if len(axis.key) != len(key_cols):
+            raise ValueError(f"A {axis.echo} key needs {', '.join(key_cols)}.")
+        unit_rate = ledger.row_value(axis.echo, {**dict(zip(key_cols, axis.key)), axis.quantity_field: 1.0})
+        base_quantity = _base_quantity(frames[axis.echo], axis)
+        delta = (_swept_quantity(base_quantity, axis_values, axis.mode) - base_quantity) * unit_rate
+        tev = tev + delta.reshape(shape)
+
+    shape = tuple(len(v) for v in values)
+    tev = np.broadcast_to(tev, shape)
+    inv_grid = np.broadcast_to(inv_grid, shape)
+    roi_m, roi_pct = _roi(tev, inv_grid)
+    return SweepResult(axes=axes, values=values, tev=tev, roi_m=roi_m, roi_pct=roi_pct, base=base)
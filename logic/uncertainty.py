@@ -0,0 +1,213 @@
+"""
+Monte Carlo uncertainty bands for TEV and ROI.
+
+The reference rates are point estimates. Here every rate cell a campaign uses
+gets a distribution (uniform min/max or normal std), N rate vectors are drawn
+in one vectorized pass, and TEV per sample is a matrix-vector product with
+the campaign's quantity per cell. Rows sharing a rate cell share its draw.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from logic.calculator import (
+    COMMUNITY_INPUT_COLUMNS,
+    COMMUNITY_WEIGHT_COLUMNS,
+    RateLookup,
+    _numeric,
+    calculate_campaign,
+    get_rate_lookup,
+)
+
+DEFAULT_SAMPLES = 10_000
+PERCENTILES = (10, 50, 90)
+# Rate vectors drawn per block; keeps peak memory flat for 100k+ samples.
+_SAMPLE_BLOCK = 16_384
+
+
+@dataclass(frozen=True)
+class RateUncertainty:
+    """
+    Distribution of every reference rate.
+
+    By default each rate is uniform on [relative_min * rate, relative_max * rate],
+    or normal with sd relative_std * rate when relative_std is set. `bounds`
+    overrides single rates with absolute values, keyed like the reference
+    tables:
+        ("media", category, type)               -> {"min": .., "max": ..}
+        ("creator", platform, content_type, tier) -> {"std": ..}
+        ("community", platform, weight_column)  -> {"min": .., "max": ..}
+    Normal draws are truncated at 0.
+    """
+
+    relative_min: float = 0.8
+    relative_max: float = 1.2
+    relative_std: float | None = None
+    bounds: dict[tuple, dict[str, float]] = field(default_factory=dict)
+
+
+def _rate_cells(lookup: RateLookup) -> tuple[np.ndarray, dict[str, int]]:
+    """
+    All rates flattened into one vector, with the offset of each echo's block.
+    """
+    blocks = {
+        "media": lookup.media_rates.ravel(),
+        "creator": lookup.creator_rates.ravel(),
+        "community": lookup.community_weights.ravel(),
+    }
+    offsets, start = {}, 0
+    for echo, block in blocks.items():
+        offsets[echo] = start
+        start += block.size
+    return np.concatenate(list(blocks.values())), offsets
+
+
+def _flat_index(shape: tuple[int, ...], codes: list[np.ndarray]) -> np.ndarray:
+    matched = np.logical_and.reduce([(code >= 0) & (code < size) for code, size in zip(codes, shape)])
+    if not matched.any():
+        return np.full(matched.shape, -1)
+    flat = np.ravel_multi_index(tuple(np.where(matched, code, 0) for code in codes), shape)
+    return np.where(matched, flat, -1)
+
+
+def _cell_quantities(lookup: RateLookup,
+                     offsets: dict[str, int],
+                     size: int,
+                     media_df: pd.DataFrame,
+                     creator_df: pd.DataFrame,
+                     comm_df: pd.DataFrame) -> np.ndarray:
+    cells, quantities = [], []
+    if media_df is not None and not media_df.empty:
+        flat = _flat_index(
+            lookup.media_rates.shape,
+            [
+                lookup.media_categories.encode(media_df["channel_type"].to_numpy()),
+                lookup.media_types.encode(media_df["tier_name"].to_numpy()),
+            ],
+        )
+        cells.append(np.where(flat >= 0, flat + offsets["media"], -1))
+        quantities.append(_numeric(media_df, "mentions"))
+    if creator_df is not None and not creator_df.empty:
+        flat = _flat_index(
+            lookup.creator_rates.shape,
+            [
+                lookup.creator_platforms.encode(creator_df["platform"].to_numpy()),
+                lookup.creator_types.encode(creator_df["content_type"].to_numpy()),
+                lookup.creator_tiers.encode(creator_df["tier"].to_numpy()),
+            ],
+        )
+        cells.append(np.where(flat >= 0, flat + offsets["creator"], -1))
+        quantities.append(_numeric(creator_df, "num_posts"))
+    if comm_df is not None and not comm_df.empty:
+        platforms = lookup.community_platforms.encode(comm_df["platform"].to_numpy())
+        width = len(COMMUNITY_WEIGHT_COLUMNS)
+        for position, column in enumerate(COMMUNITY_INPUT_COLUMNS):
+            cells.append(np.where(platforms >= 0, platforms * width + position + offsets["community"], -1))
+            quantities.append(_numeric(comm_df, column))
+
+    per_cell = np.zeros(size)
+    if cells:
+        cells_arr = np.concatenate(cells)
+        quantities_arr = np.concatenate(quantities)
+        keep = cells_arr >= 0
+        per_cell = np.bincount(cells_arr[keep], weights=quantities_arr[keep], minlength=size)
+    return per_cell
+
+
+def _bound_cell(lookup: RateLookup, offsets: dict[str, int], key: tuple) -> int:
+    echo, *labels = key
+    if echo == "media" and len(labels) == 2:
+        codes = [lookup.media_categories.code(labels[0]), lookup.media_types.code(labels[1])]
+        shape = lookup.media_rates.shape
+    elif echo == "creator" and len(labels) == 3:
+        codes = [
+            lookup.creator_platforms.code(labels[0]),
+            lookup.creator_types.code(labels[1]),
+            lookup.creator_tiers.code(labels[2]),
+        ]
+        shape = lookup.creator_rates.shape
+    elif echo == "community" and len(labels) == 2 and labels[1] in COMMUNITY_WEIGHT_COLUMNS:
+        codes = [lookup.community_platforms.code(labels[0]), COMMUNITY_WEIGHT_COLUMNS.index(labels[1])]
+        shape = lookup.community_weights.shape
+    else:
+        raise ValueError(f"Unrecognised rate key {key!r}.")
+    if min(codes) < 0:
+        return -1
+    return int(np.ravel_multi_index(tuple(codes), shape)) + offsets[echo]
+
+
+def _percentiles(values: np.ndarray) -> dict[str, float]:
+    points = np.percentile(values, PERCENTILES)
+    return {f"p{pct}": float(point) for pct, point in zip(PERCENTILES, points)}
+
+
+def calculate_campaign_bands(inv: float,
+                             media_df: pd.DataFrame,
+                             creator_df: pd.DataFrame,
+                             comm_df: pd.DataFrame,
+                             uncertainty: RateUncertainty | None = None,
+                             n_samples: int = DEFAULT_SAMPLES,
+                             seed: int = 0) -> dict[str, Any]:
+    """
+    Uncertainty mode of calculate_campaign.
+
+    Returns the point result under "point" plus P10/P50/P90 of tev, roi_m
+    and roi_pct over `n_samples` seeded draws of the rate card.
+    """
+    uncertainty = uncertainty or RateUncertainty()
+    lookup = get_rate_lookup()
+    point = calculate_campaign(inv, media_df, creator_df, comm_df)
+
+    rates, offsets = _rate_cells(lookup)
+    per_cell = _cell_quantities(lookup, offsets, rates.size, media_df, creator_df, comm_df)
+    active = np.flatnonzero((per_cell != 0) & ~np.isnan(rates))
+    base = rates[active]
+    quantity = per_cell[active]
+
+    low = base * uncertainty.relative_min
+    high = base * uncertainty.relative_max
+    if uncertainty.relative_std is None:
+        std = np.full(base.size, np.nan)
+    else:
+        std = base * uncertainty.relative_std
+    position = {cell: i for i, cell in enumerate(active)}
+    for key, spec in uncertainty.bounds.items():
+        i = position.get(_bound_cell(lookup, offsets, key))
+        if i is None:
+            continue
+        if "std" in spec:
+            std[i] = spec["std"]
+        else:
+            low[i] = spec.get("min", low[i])
+            high[i] = spec.get("max", high[i])
+            std[i] = np.nan
+    normal = ~np.isnan(std)
+
+    rng = np.random.default_rng(seed)
+    tev = np.empty(n_samples)
+    for start in range(0, n_samples, _SAMPLE_BLOCK):
+        stop = min(start + _SAMPLE_BLOCK, n_samples)
+        draws = low + (high - low) * rng.random((stop - start, base.size))
+        if normal.any():
+            gaussian = base[normal] + std[normal] * rng.standard_normal((stop - start, int(normal.sum())))
+            draws[:, normal] = np.maximum(gaussian, 0.0)
+        tev[start:stop] = draws @ quantity
+
+    if inv and inv > 0:
+        roi_m = tev / inv
+        roi_pct = (tev - inv) / inv * 100
+    else:
+        roi_m = np.zeros(n_samples)
+        roi_pct = np.zeros(n_samples)
+
+    return {
+        "point": point,
+        "samples": n_samples,
+        "seed": seed,
+        "tev": _percentiles(tev),
+        "roi_m": _percentiles(roi_m),
+        "roi_pct": _percentiles(roi_pct),
+    }
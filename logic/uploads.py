@@ -0,0 +1,467 @@
+"""
+Fanpage Karma creator uploads: content rules, the workbook parsers, the
+parse cache keyed by file content and the post rows kept in
+creator_upload_rows.
+"""
+
+import hashlib
+from collections import Counter
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Iterator
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from db import (
+    fail_creator_upload,
+    find_creator_upload,
+    finish_creator_upload,
+    insert_creator_upload_rows,
+    start_creator_upload,
+)
+
+CREATOR_CONTENT_OPTIONS = ["Static Post", "Video Post"]
+PLATFORMS_DISALLOW_STATIC = {"TikTok", "YouTube"}
+# Banner rows above the header row in a Fanpage Karma export.
+UPLOAD_BANNER_ROWS = 4
+UPLOAD_COLUMNS = {
+    "Profile": "profile",
+    "Network": "platform",
+    "Creator Tier": "tier",
+    "Content Type": "content_type",
+}
+# Optional per-post metrics, stored with each row when the sheet has them.
+UPLOAD_METRIC_COLUMNS = {
+    "Date": "post_date",
+    "Impressions": "impressions",
+    "Engagement": "engagements",
+    "EMV": "emv",
+    "Fee": "fee",
+    "Currency": "currency",
+}
+# Posts read, normalized and written per transaction when ingesting an upload.
+UPLOAD_BATCH_ROWS = 50_000
+# Bump when parsing or normalization changes, so cached parses are redone.
+UPLOAD_PARSER_VERSION = 2
+HASH_CHUNK_SIZE = 1 << 20
+GROUPED_COLUMNS = ["platform", "content_type", "tier", "num_posts"]
+# Cell text pd.read_excel reads as NaN, so both parsers drop the same rows.
+_MISSING_TEXT = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+
+def get_allowed_content_options(platform: str) -> list[str]:
+    if platform in PLATFORMS_DISALLOW_STATIC:
+        return ["Video Post"]
+    return CREATOR_CONTENT_OPTIONS
+
+
+def _stringify(value: Any) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return str(value).strip()
+
+
+def _normalize_platform(value: Any) -> str:
+    mapping = {
+        "FACEBOOK": "Facebook",
+        "INSTAGRAM": "Instagram",
+        "TIKTOK": "TikTok",
+        "YOUTUBE": "YouTube",
+        "YOUTUBE SHORTS": "YouTube",
+        "X": "X (Twitter)",
+        "TWITTER": "X (Twitter)",
+        "X (TWITTER)": "X (Twitter)",
+        "LEMON 8": "Lemon 8",
+        "LEMON8": "Lemon 8",
+    }
+    raw = _stringify(value).upper()
+    return mapping.get(raw, _stringify(value))
+
+
+def _normalize_content_type(value: Any) -> str:
+    raw = _stringify(value).lower()
+    if "video" in raw or "reel" in raw or "story" in raw:
+        return "Video Post"
+    return "Static Post"
+
+
+def _normalize_tier(value: Any) -> str:
+    mapping = {
+        "MEGA": "Mega",
+        "MACRO": "Macro",
+        "MIDTIER": "Mid-tier",
+        "MID-TIER": "Mid-tier",
+        "MID TIER": "Mid-tier",
+        "MICRO": "Micro",
+        "NANO": "Nano",
+    }
+    raw = _stringify(value).replace("-", "").replace(" ", "").upper()
+    return mapping.get(raw, "Macro")
+
+
+def _factorize_normalized(values: pd.Series, normalize: Callable[[Any], str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-row codes into the distinct normalized values, with -1 for missing
+    cells. normalize() runs once per distinct raw value.
+    """
+    codes, uniques = pd.factorize(values)
+    normalized, names = pd.factorize(np.array([normalize(value) for value in uniques], dtype=object))
+    return np.append(normalized, -1)[codes], np.asarray(names, dtype=object)
+
+
+_NORMALIZERS = {
+    "profile": _stringify,
+    "platform": _normalize_platform,
+    "tier": _normalize_tier,
+    "content_type": _normalize_content_type,
+}
+
+
+def _post_codes(df: pd.DataFrame) -> tuple[np.ndarray, dict[str, tuple[np.ndarray, np.ndarray]]]:
+    """
+    The rows that count as posts (no missing UPLOAD_COLUMNS cell, non-blank
+    profile) and, per column, their codes into the normalized names.
+    """
+    for column in UPLOAD_COLUMNS:
+        if column not in df.columns:
+            raise ValueError(f"Missing column '{column}' in uploaded file.")
+    codes = {
+        name: _factorize_normalized(df[column], _NORMALIZERS[name]) for column, name in UPLOAD_COLUMNS.items()
+    }
+    profile, profiles = codes["profile"]
+    keep = np.append(profiles != "", False)[profile]
+    for name in ("platform", "tier", "content_type"):
+        keep &= codes[name][0] >= 0
+    return keep, {name: (row_codes[keep], names) for name, (row_codes, names) in codes.items()}
+
+
+def summarize_creator_upload(df: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, Any]]:
+    """
+    Posts per platform / content type / tier and the upload summary for a
+    sheet read with its header row. Exports repeat a handful of network,
+    tier and content spellings across every post, so each column is
+    factorized and normalized per distinct value, posts are counted per
+    code combination with bincount, and the content rule is applied to the
+    counted combinations rather than to each post.
+    """
+    keep, codes = _post_codes(df)
+    (profile, profiles), (platform, platforms) = codes["profile"], codes["platform"]
+    (content_type, content_types), (tier, tiers) = codes["content_type"], codes["tier"]
+
+    combos = (platform * len(content_types) + content_type) * len(tiers) + tier
+    posts = np.bincount(combos, minlength=len(platforms) * len(content_types) * len(tiers))
+    present = np.flatnonzero(posts)
+    platform_of, rest = np.divmod(present, len(content_types) * len(tiers))
+    content_of, tier_of = np.divmod(rest, len(tiers))
+    counts = pd.DataFrame(
+        {
+            "platform": platforms[platform_of],
+            "content_type": [
+                name
+                if name in get_allowed_content_options(platform_name)
+                else get_allowed_content_options(platform_name)[0]
+                for platform_name, name in zip(platforms[platform_of], content_types[content_of])
+            ],
+            "tier": tiers[tier_of],
+            "num_posts": posts[present],
+        },
+        columns=["platform", "content_type", "tier", "num_posts"],
+    )
+    grouped = (
+        counts.groupby(["platform", "content_type", "tier"])["num_posts"]
+        .sum()
+        .reset_index()
+        .sort_values(["platform", "tier"])
+        .reset_index(drop=True)
+    )
+    grouped["num_posts"] = grouped["num_posts"].astype(int)
+    summary = {
+        "total_posts": int(keep.sum()),
+        "unique_creators": int(np.count_nonzero(np.bincount(profile, minlength=len(profiles)))),
+        "platform_breakdown": {
+            platforms[code]: int(count) for code, count in pd.Series(platform).value_counts().items()
+        },
+    }
+    return grouped, summary
+
+
+def parse_creator_upload(uploaded_file: BinaryIO) -> tuple[pd.DataFrame, dict[str, Any]]:
+    if uploaded_file is None:
+        raise ValueError("No file provided.")
+    uploaded_file.seek(0)
+    df = pd.read_excel(uploaded_file, skiprows=UPLOAD_BANNER_ROWS)
+    return summarize_creator_upload(df)
+
+
+def _is_missing(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return value != value
+    return isinstance(value, str) and value in _MISSING_TEXT
+
+
+def scan_creator_upload(uploaded_file: BinaryIO) -> tuple[pd.DataFrame, dict[str, Any]]:
+    """
+    Same result as parse_creator_upload, but streams the sheet with openpyxl
+    in read-only mode and touches only the four UPLOAD_COLUMNS. Posts are
+    counted per raw (network, tier, content type) as they are read and each
+    distinct raw combination is normalized once at the end, so memory grows
+    with the number of distinct values and creators, not with posts.
+    """
+    if uploaded_file is None:
+        raise ValueError("No file provided.")
+    uploaded_file.seek(0)
+    workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        rows = islice(workbook.active.iter_rows(values_only=True), UPLOAD_BANNER_ROWS, None)
+        header = list(next(rows, ()))
+        for column in UPLOAD_COLUMNS:
+            if column not in header:
+                raise ValueError(f"Missing column '{column}' in uploaded file.")
+        positions = [header.index(column) for column in UPLOAD_COLUMNS]
+        width = max(positions) + 1
+
+        raw_counts: Counter = Counter()
+        creators: set[str] = set()
+        for row in rows:
+            if len(row) < width:
+                continue
+            profile, platform, tier, content_type = (row[i] for i in positions)
+            if (
+                _is_missing(profile)
+                or _is_missing(platform)
+                or _is_missing(tier)
+                or _is_missing(content_type)
+            ):
+                continue
+            profile = _stringify(profile)
+            if not profile:
+                continue
+            creators.add(profile)
+            raw_counts[platform, tier, content_type] += 1
+    finally:
+        workbook.close()
+
+    counts: Counter = Counter()
+    platform_counts: Counter = Counter()
+    for (platform, tier, content_type), count in raw_counts.items():
+        platform = _normalize_platform(platform)
+        content_type = _normalize_content_type(content_type)
+        allowed = get_allowed_content_options(platform)
+        if content_type not in allowed:
+            content_type = allowed[0]
+        counts[platform, content_type, _normalize_tier(tier)] += count
+        platform_counts[platform] += count
+    return _upload_result(counts, platform_counts, len(creators))
+
+
+def _upload_result(counts: Counter, platform_counts: Counter, creators: int) -> tuple[pd.DataFrame, dict[str, Any]]:
+    """
+    The grouped frame and summary from posts per (platform, content type,
+    tier) and per platform, the latter in order of first appearance.
+    """
+    keys = sorted(counts, key=lambda key: (key[0], key[2], key[1]))
+    grouped = pd.DataFrame(keys, columns=["platform", "content_type", "tier"])
+    grouped["num_posts"] = pd.Series([counts[key] for key in keys], dtype=int)
+    summary = {
+        "total_posts": int(sum(counts.values())),
+        "unique_creators": creators,
+        "platform_breakdown": {
+            platform: int(count)
+            for platform, count in sorted(platform_counts.items(), key=lambda item: -item[1])
+        },
+    }
+    return grouped, summary
+
+
+def iter_upload_batches(uploaded_file: BinaryIO,
+                        batch_rows: int = UPLOAD_BATCH_ROWS,
+                        raw: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Stream the sheet in read-only mode as frames of up to `batch_rows` posts,
+    named by the header row like pd.read_excel. Only UPLOAD_COLUMNS and
+    UPLOAD_METRIC_COLUMNS are read unless `raw`, which keeps every column.
+    Cells pd.read_excel would read as NaN come back as None.
+    """
+    uploaded_file.seek(0)
+    workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        rows = islice(workbook.active.iter_rows(values_only=True), UPLOAD_BANNER_ROWS, None)
+        header = list(next(rows, ()))
+        for column in UPLOAD_COLUMNS:
+            if column not in header:
+                raise ValueError(f"Missing column '{column}' in uploaded file.")
+        wanted = [
+            position
+            for position, column in enumerate(header)
+            if column is not None and (raw or column in UPLOAD_COLUMNS or column in UPLOAD_METRIC_COLUMNS)
+        ]
+        names = [header[position] for position in wanted]
+        while True:
+            batch = [
+                [None if position >= len(row) or _is_missing(row[position]) else row[position] for position in wanted]
+                for row in islice(rows, batch_rows)
+            ]
+            if not batch:
+                return
+            yield pd.DataFrame.from_records(batch, columns=names)
+    finally:
+        workbook.close()
+
+
+def normalize_upload_posts(df: pd.DataFrame, raw: bool = False) -> pd.DataFrame:
+    """
+    One row per post in the creator_upload_rows layout: the same rows and
+    normalization as summarize_creator_upload, plus the metric columns
+    (NULL where the sheet lacks them). With `raw`, the remaining sheet
+    columns are kept per row as compact JSON in raw_json.
+    """
+    keep, codes = _post_codes(df)
+    (profile, profiles), (platform, platforms) = codes["profile"], codes["platform"]
+    (content_type, content_types), (tier, tiers) = codes["content_type"], codes["tier"]
+    # The content rule per (platform, content type) pair, looked up per post.
+    allowed = np.empty((len(platforms), len(content_types)), dtype=object)
+    for i, platform_name in enumerate(platforms):
+        options = get_allowed_content_options(platform_name)
+        for j, name in enumerate(content_types):
+            allowed[i, j] = name if name in options else options[0]
+
+    kept = df[keep]
+    posts = pd.DataFrame(
+        {
+            "profile": profiles[profile],
+            "platform": platforms[platform],
+            "content_type": allowed[platform, content_type],
+            "tier": tiers[tier],
+        }
+    )
+    posts["post_date"] = _map_distinct_dates(kept["Date"]) if "Date" in kept.columns else None
+    for column in ("Impressions", "Engagement", "EMV", "Fee"):
+        values = kept[column] if column in kept.columns else None
+        posts[UPLOAD_METRIC_COLUMNS[column]] = (
+            pd.to_numeric(values, errors="coerce").to_numpy(dtype=float) if values is not None else np.nan
+        )
+    posts["currency"] = (
+        _map_distinct_text(kept["Currency"]) if "Currency" in kept.columns else None
+    )
+    if raw:
+        extra = kept.drop(columns=[*UPLOAD_COLUMNS, *UPLOAD_METRIC_COLUMNS], errors="ignore")
+        posts["raw_json"] = (
+            extra.to_json(orient="records", lines=True, date_format="iso").splitlines() if len(extra.columns) else None
+        )
+    return posts
+
+
+def _map_distinct_text(values: pd.Series) -> np.ndarray:
+    codes, uniques = pd.factorize(values)
+    names = np.array([_stringify(value) or None for value in uniques] + [None], dtype=object)
+    return names[codes]
+
+
+def _map_distinct_dates(values: pd.Series) -> np.ndarray:
+    """
+    ISO dates per row, None where the cell is not a date. Each distinct cell
+    is parsed on its own ("mixed"), so datetimes and date strings in
+    different formats can share a sheet.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object)
+    try:
+        parsed = pd.to_datetime(uniques, format="mixed", errors="coerce")
+    except ValueError:
+        # Offsets that differ between cells: keep each cell's own local date.
+        parsed = pd.Series([pd.to_datetime(value, format="mixed", errors="coerce") for value in uniques], dtype=object)
+    names = np.array([None if pd.isna(day) else day.strftime("%Y-%m-%d") for day in parsed] + [None], dtype=object)
+    return names[codes]
+
+
+def ingest_creator_upload(uploaded_file: BinaryIO,
+                          upload_id: int,
+                          raw: bool = False,
+                          batch_rows: int = UPLOAD_BATCH_ROWS) -> tuple[pd.DataFrame, dict[str, Any], float]:
+    """
+    Stream the upload into creator_upload_rows, one transaction per batch,
+    and tally the grouped frame and summary (the same as
+    scan_creator_upload's) along the way. Returns them with the total EMV.
+    """
+    counts: Counter = Counter()
+    platform_counts: Counter = Counter()
+    creators: set[str] = set()
+    total_value = 0.0
+    for batch in iter_upload_batches(uploaded_file, batch_rows, raw):
+        posts = normalize_upload_posts(batch, raw)
+        insert_creator_upload_rows(upload_id, posts)
+        counts.update(posts.groupby(["platform", "content_type", "tier"]).size().to_dict())
+        for platform, count in posts["platform"].value_counts(sort=False).items():
+            platform_counts[platform] += count
+        creators.update(posts["profile"].unique())
+        total_value += float(np.nansum(posts["emv"].to_numpy()))
+    grouped, summary = _upload_result(counts, platform_counts, len(creators))
+    return grouped, summary, total_value
+
+
+@dataclass(frozen=True)
+class CreatorUpload:
+    upload_id: int
+    sha256: str
+    parsed_at: str
+    cached: bool
+    grouped: pd.DataFrame
+    summary: dict[str, Any]
+
+
+def hash_upload(uploaded_file: BinaryIO) -> str:
+    """
+    SHA-256 of the file; leaves it rewound. In-memory uploads (Streamlit's
+    UploadedFile is a BytesIO) are hashed from their buffer without a copy,
+    others are read in HASH_CHUNK_SIZE blocks.
+    """
+    if hasattr(uploaded_file, "getbuffer"):
+        uploaded_file.seek(0)
+        with uploaded_file.getbuffer() as buffer:
+            return hashlib.sha256(buffer).hexdigest()
+    digest = hashlib.sha256()
+    uploaded_file.seek(0)
+    for block in iter(lambda: uploaded_file.read(HASH_CHUNK_SIZE), b""):
+        digest.update(block)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def load_creator_upload(uploaded_file: BinaryIO,
+                        filename: str,
+                        uploaded_by: int,
+                        raw: bool = False) -> CreatorUpload:
+    """
+    ingest_creator_upload() through the creator_uploads cache: a file whose
+    content `uploaded_by` had parsed before (by this UPLOAD_PARSER_VERSION)
+    returns the stored result without opening the workbook. The hash is
+    taken before the parse, which needs the whole file anyway: an .xlsx is a
+    zip that openpyxl reads from its central directory at the end. Otherwise the upload is
+    recorded as 'uploaded', its posts are stored in creator_upload_rows, and
+    it is marked 'parsed' (or 'error', with its rows removed, if parsing
+    fails).
+    """
+    if uploaded_file is None:
+        raise ValueError("No file provided.")
+    sha256 = hash_upload(uploaded_file)
+    cached = find_creator_upload(sha256, UPLOAD_PARSER_VERSION, uploaded_by)
+    if cached:
+        grouped = pd.DataFrame.from_records(cached["grouped"], columns=GROUPED_COLUMNS)
+        grouped["num_posts"] = grouped["num_posts"].astype(int)
+        return CreatorUpload(cached["id"], sha256, cached["parsed_at"], True, grouped, cached["summary"])
+
+    upload_id = start_creator_upload(sha256, filename, uploaded_by, UPLOAD_PARSER_VERSION)
+    try:
+        grouped, summary, total_value = ingest_creator_upload(uploaded_file, upload_id, raw)
+    except Exception:
+        fail_creator_upload(upload_id)
+        raise
+    parsed_at = finish_creator_upload(upload_id, summary, grouped.to_dict("records"), round(total_value, 2))
+    return CreatorUpload(upload_id, sha256, parsed_at, False, grouped, summary)
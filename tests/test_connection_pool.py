@@ -0,0 +1,51 @@
+"""
+Nested `with get_conn()` blocks: only the outermost one commits.
+"""
+
+import pytest
+
+import db
+from benchmarks.harness import use_database
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path):
+    with use_database(tmp_path / "pool.db") as path:
+        yield path
+
+
+def _user_emails() -> list[str]:
+    with db.get_conn() as conn:
+        return [row[0] for row in conn.execute("SELECT email FROM users ORDER BY email")]
+
+
+def _add_user(conn, email: str) -> None:
+    conn.execute("INSERT INTO users (email, password_hash, name) VALUES (?, 'x', 'Test')", (email,))
+
+
+def test_inner_read_does_not_commit_outer_writes():
+    with pytest.raises(RuntimeError):
+        with db.get_conn() as conn:
+            _add_user(conn, "outer@example.com")
+            db.fetch_rate_card_version()
+            raise RuntimeError("outer block fails after an inner read")
+    assert _user_emails() == []
+
+
+def test_failed_inner_block_undoes_only_its_writes():
+    with db.get_conn() as conn:
+        _add_user(conn, "outer@example.com")
+        with pytest.raises(RuntimeError):
+            with db.get_conn() as inner:
+                _add_user(inner, "inner@example.com")
+                raise RuntimeError("inner block fails")
+    assert _user_emails() == ["outer@example.com"]
+
+
+def test_inner_writes_commit_with_the_outer_block():
+    with db.get_conn() as conn:
+        with db.get_conn() as inner:
+            _add_user(inner, "inner@example.com")
+        assert conn.in_transaction
+        _add_user(conn, "outer@example.com")
+    assert _user_emails() == ["inner@example.com", "outer@example.com"]
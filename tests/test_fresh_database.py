@@ -0,0 +1,66 @@
+"""
+A fresh database has empty reference tables: every row counts as unmatched.
+"""
+
+import pandas as pd
+import pytest
+
+from benchmarks.harness import use_database
+from logic.calculator import TevLedger, calculate_campaign, calculate_campaigns
+from logic.optimizer import suggest_creator_mix
+from logic.sweep import SweepAxis, sweep_campaign
+from logic.uncertainty import calculate_campaign_bands
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path):
+    with use_database(tmp_path / "fresh.db") as path:
+        yield path
+
+
+def _inputs() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    media = pd.DataFrame([{"channel_type": "Online Article", "tier_name": "Major", "mentions": 3}])
+    creator = pd.DataFrame([{"platform": "TikTok", "content_type": "Video Post", "tier": "Nano", "num_posts": 2}])
+    community = pd.DataFrame([{
+        "platform": "TikTok", "content_creation": 1, "passive_engagement": 4,
+        "active_engagement": 2, "amplification": 1,
+    }])
+    return media, creator, community
+
+
+def test_calculate_campaign_reports_every_row_unmatched():
+    result = calculate_campaign(100_000, *_inputs())
+    assert result["tev"] == 0.0
+    assert result["unmatched"] == {
+        "media": [("Online Article", "Major")],
+        "creator": [("TikTok", "Video Post", "Nano")],
+        "community": [("TikTok",)],
+    }
+
+
+def test_tev_ledger_matches_calculate_campaign():
+    media, creator, community = _inputs()
+    ledger = TevLedger()
+    for echo, frame in (("media", media), ("creator", creator), ("community", community)):
+        ledger.sync(echo, frame.to_dict("records"))
+    result = ledger.result(100_000)
+    expected = calculate_campaign(100_000, media, creator, community)
+    assert result["tev"] == expected["tev"] == 0.0
+    assert result["unmatched"] == expected["unmatched"]
+
+
+def test_batch_sweep_bands_and_optimizer_run():
+    media, creator, community = _inputs()
+    batch = calculate_campaigns({1: 100_000}, *(frame.assign(campaign_id=1) for frame in (media, creator, community)))
+    assert batch["tev"].tolist() == [0.0]
+
+    sweep = sweep_campaign(100_000, media, creator, community,
+                           [SweepAxis("media", [0, 5], key=("Online Article", "Major"))])
+    assert sweep.tev.tolist() == [0.0, 0.0]
+
+    bands = calculate_campaign_bands(100_000, media, creator, community, n_samples=16)
+    assert bands["tev"] == {"p10": 0.0, "p50": 0.0, "p90": 0.0}
+
+    mix, summary = suggest_creator_mix(10_000, creator.assign(cost_per_post=1_000.0))
+    assert summary["tev"] == 0.0
+    assert mix["rate"].tolist() == [0.0]
@@ -0,0 +1,40 @@
+"""
+suggest_creator_mix applies the per-platform content rule itself.
+"""
+
+import pandas as pd
+import pytest
+
+from benchmarks.harness import use_database
+from logic.optimizer import suggest_creator_mix
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path):
+    with use_database(tmp_path / "optimizer.db") as path:
+        yield path
+
+
+def _candidates(rows: list[tuple[str, str]]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [{"platform": platform, "content_type": content_type, "tier": "Nano", "cost_per_post": 1_000.0}
+         for platform, content_type in rows]
+    )
+
+
+def test_static_posts_on_video_only_platforms_are_dropped():
+    mix, _ = suggest_creator_mix(10_000, _candidates([
+        ("TikTok", "Static Post"),
+        ("TikTok", "Video Post"),
+        ("YouTube", "Static Post"),
+        ("Instagram", "Static Post"),
+    ]))
+    assert list(zip(mix["platform"], mix["content_type"])) == [
+        ("TikTok", "Video Post"),
+        ("Instagram", "Static Post"),
+    ]
+
+
+def test_no_allowed_option_is_an_error():
+    with pytest.raises(ValueError, match="allows"):
+        suggest_creator_mix(10_000, _candidates([("TikTok", "Static Post"), ("YouTube", "Static Post")]))
@@ -0,0 +1,114 @@
+"""
+Fanpage Karma upload parsing on small hand-made workbooks.
+"""
+
+import datetime
+import io
+import warnings
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import db
+from benchmarks.harness import use_database
+from logic.uploads import (
+    UPLOAD_BANNER_ROWS,
+    UPLOAD_PARSER_VERSION,
+    ingest_creator_upload,
+    iter_upload_batches,
+    normalize_upload_posts,
+    parse_creator_upload,
+    scan_creator_upload,
+)
+
+HEADER = ["Profile", "Network", "Creator Tier", "Content Type", "Date", "Engagement", "EMV", "Fee"]
+
+# Missing and blank cells, numeric cells, spelling variants, an unknown tier
+# and static posts on platforms that only allow video.
+MESSY_ROWS = [
+    ["@alpha", "TikTok", "Nano", "Photo", "2025-03-01", 10, 100.5, 50],
+    ["@alpha", "tiktok", "nano", "Video", None, "n/a", None, None],
+    ["@beta", "YOUTUBE SHORTS", "Mid Tier", "Image", "2025-03-02", 5, 40, "1,200"],
+    ["@gamma", "Instagram", "Giga", "Carousel", "garbage", 8, 80, 30],
+    [12345, "Facebook", "MICRO", "Reel", datetime.datetime(2025, 3, 3), 1, 2, 3],
+    ["   ", "Facebook", "Micro", "Reel", None, 1, 1, 1],
+    [None, "Facebook", "Micro", "Reel", None, 1, 1, 1],
+    ["@delta", None, "Micro", "Reel", None, 1, 1, 1],
+    ["@delta", "Instagram", "N/A", "Photo", None, 1, 1, 1],
+    ["@delta", "twitter", 3, 7, None, 2, 20, 10],
+    ["@gamma", "Instagram", "Macro", "photo", "2025-03-04", 3, 30, 15],
+]
+MESSY_GROUPED = [
+    ("Facebook", "Video Post", "Micro", 1),
+    ("Instagram", "Static Post", "Macro", 2),
+    ("TikTok", "Video Post", "Nano", 2),
+    ("X (Twitter)", "Static Post", "Macro", 1),
+    ("YouTube", "Video Post", "Mid-tier", 1),
+]
+MESSY_SUMMARY = {
+    "total_posts": 7,
+    "unique_creators": 5,
+    "platform_breakdown": {"Instagram": 2, "TikTok": 2, "Facebook": 1, "X (Twitter)": 1, "YouTube": 1},
+}
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path):
+    with use_database(tmp_path / "uploads.db") as path:
+        yield path
+
+
+def _workbook(rows: list[list]) -> io.BytesIO:
+    """
+    An export as Fanpage Karma lays it out: banner rows, the header, posts.
+    """
+    workbook = Workbook()
+    sheet = workbook.active
+    for banner in range(UPLOAD_BANNER_ROWS):
+        sheet.append([f"Banner {banner + 1}"])
+    sheet.append(HEADER)
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_mixed_date_cells_parse_per_cell():
+    upload = _workbook([
+        ["@a", "TikTok", "Nano", "Video", datetime.datetime(2025, 3, 1, 18, 30), 10, 100, 50],
+        ["@b", "Instagram", "Micro", "Photo", "2025-03-02", 20, 200, 60],
+        ["@c", "Facebook", "Macro", "Reel", "03/04/2025", 30, 300, 70],
+        ["@d", "YouTube", "Mega", "Video", "5 Mar 2025", 40, 400, 80],
+        ["@e", "X", "Nano", "Post", "2025-03-06T23:15:00+07:00", 50, 500, 90],
+        ["@f", "TikTok", "Nano", "Video", "not a date", 60, 600, 100],
+        ["@g", "TikTok", "Nano", "Video", None, 70, 700, 110],
+        ["@h", "Instagram", "Micro", "Photo", "2025-03-02", 80, 800, 120],
+    ])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        posts = normalize_upload_posts(next(iter_upload_batches(upload)))
+    assert [None if pd.isna(day) else day for day in posts["post_date"]] == [
+        "2025-03-01", "2025-03-02", "2025-03-04", "2025-03-05", "2025-03-06", None, None, "2025-03-02",
+    ]
+
+
+def _ingest(upload: io.BytesIO) -> tuple[pd.DataFrame, dict]:
+    user_id = db.create_user("uploader@example.com", "x")
+    upload_id = db.start_creator_upload("0" * 64, "messy.xlsx", user_id, UPLOAD_PARSER_VERSION)
+    grouped, summary, _ = ingest_creator_upload(upload, upload_id, batch_rows=3)
+    assert db.creator_upload_totals(upload_id)["posts"].sum() == summary["total_posts"]
+    return grouped, summary
+
+
+@pytest.mark.parametrize(
+    "parse",
+    [parse_creator_upload, scan_creator_upload, _ingest],
+    ids=["summarize", "scan", "ingest"],
+)
+def test_parsers_agree_on_a_messy_sheet(parse):
+    grouped, summary = parse(_workbook(MESSY_ROWS))
+    assert list(grouped.itertuples(index=False, name=None)) == MESSY_GROUPED
+    assert summary == MESSY_SUMMARY